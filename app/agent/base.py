@@ -1,12 +1,23 @@
+import asyncio
 from abc import ABC, abstractmethod
-from contextlib import asynccontextmanager
-from typing import List, Optional
-
-from pydantic import BaseModel, Field, model_validator
-
+from contextlib import aclosing, asynccontextmanager, suppress
+from typing import AsyncIterator, List, Optional
+
+from pydantic import BaseModel, Field, PrivateAttr, model_validator
+
+from app.agent.events import (
+    AgentEvent,
+    EventSink,
+    MaxStepsReached,
+    StateChanged,
+    StepCompleted,
+    StepStarted,
+    transcript_line,
+)
 from app.llm import LLM
 from app.logger import logger
-from app.sandbox.client import SANDBOX_CLIENT
+from app.output import OutputSink, resolve_sink
+from app.sandbox.client import get_sandbox_client
 from app.schema import ROLE_TYPE, AgentState, Memory, Message
 
 
@@ -39,8 +50,24 @@ class BaseAgent(BaseModel, ABC):
     # Execution control
     max_steps: int = Field(default=10, description="Maximum steps before termination")
     current_step: int = Field(default=0, description="Current step in execution")
+    output_sink: Optional[OutputSink] = Field(
+        None,
+        exclude=True,
+        description="Where streamed tokens and progress banners go (default sink if None)",
+    )
 
     duplicate_threshold: int = 2
+    near_duplicate_similarity: Optional[float] = Field(
+        None,
+        ge=0,
+        le=1,
+        description="Opt-in word-set similarity (e.g. 0.9) at which paraphrased "
+        "responses count as duplicates for stuck detection (None: identical "
+        "responses only)",
+    )
+
+    # Set while a run_stream consumer is attached
+    _event_sink: Optional[EventSink] = PrivateAttr(default=None)
 
     class Config:
         arbitrary_types_allowed = True
@@ -55,6 +82,25 @@ class BaseAgent(BaseModel, ABC):
             self.memory = Memory()
         return self
 
+    def emit(self, text: str) -> None:
+        """Write progress output to the agent's sink instead of stdout."""
+        resolve_sink(self.output_sink).write(text)
+
+    @property
+    def token_sink(self) -> Optional[OutputSink]:
+        """Sink for streamed LLM tokens; feeds the event stream during run_stream."""
+        return self._event_sink or self.output_sink
+
+    async def publish(self, event: AgentEvent) -> None:
+        """Send an event to the run_stream consumer, waiting while it lags behind.
+
+        Does nothing when the agent is not being streamed.
+        """
+        sink = self._event_sink
+        if sink is not None:
+            await sink.drain()
+            await sink.queue.put(event)
+
     @asynccontextmanager
     async def state_context(self, new_state: AgentState):
         """Context manager for safe agent state transitions.
@@ -122,37 +168,131 @@ class BaseAgent(BaseModel, ABC):
         Returns:
             A string summarizing the execution results.
 
+        Raises:
+            RuntimeError: If the agent is not in IDLE state at start.
+        """
+        results: List[str] = []
+        async with aclosing(self.run_stream(request, include_deltas=False)) as events:
+            async for event in events:
+                line = transcript_line(event)
+                if line is not None:
+                    results.append(line)
+        return "\n".join(results) if results else "No steps executed"
+
+    async def run_stream(
+        self,
+        request: Optional[str] = None,
+        include_deltas: bool = True,
+        max_queued: int = 64,
+    ) -> AsyncIterator[AgentEvent]:
+        """Execute the agent's main loop, yielding events as it progresses.
+
+        The loop runs in its own task and waits whenever `max_queued` events
+        are pending, so a slow consumer applies backpressure instead of
+        events piling up. Closing the generator cancels the run; consume it
+        with `contextlib.aclosing` so leaving the iteration early (or an
+        error in the consumer) closes it right away rather than whenever it
+        is garbage collected.
+
+        Args:
+            request: Optional initial user request to process.
+            include_deltas: Also yield ThinkingDelta events for streamed
+                LLM text.
+            max_queued: Events buffered before the loop waits for the consumer.
+
+        Yields:
+            StateChanged, StepStarted, ThinkingDelta, ToolCallStarted,
+            ToolCallFinished, StepCompleted and MaxStepsReached events.
+
         Raises:
             RuntimeError: If the agent is not in IDLE state at start.
         """
         if self.state != AgentState.IDLE:
             raise RuntimeError(f"Cannot run agent from state: {self.state}")
 
+        queue: asyncio.Queue = asyncio.Queue(maxsize=max_queued)
+        downstream = resolve_sink(self.output_sink)
+        sink = EventSink(queue, self, downstream, deltas=include_deltas)
+        done = object()
+
+        async def produce() -> None:
+            cancelled = False
+            try:
+                await self._run_loop(request)
+            except asyncio.CancelledError:
+                cancelled = True
+                raise
+            finally:
+                # Once cancelled the consumer is gone and the queue may be
+                # full; waiting to deliver the rest would block its close
+                if not cancelled:
+                    await sink.drain()
+                    await queue.put(done)
+
+        self._event_sink = sink
+        task = asyncio.create_task(produce())
+        try:
+            while True:
+                event = await queue.get()
+                if event is done:
+                    break
+                yield event
+            await task  # Re-raise errors from the loop
+        finally:
+            self._event_sink = None
+            if not task.done():
+                task.cancel()
+                with suppress(asyncio.CancelledError):
+                    await task
+
+    async def _run_loop(self, request: Optional[str]) -> None:
+        """The step loop behind run_stream, publishing its progress."""
         if request:
             self.update_memory("user", request)
 
-        results: List[str] = []
-        async with self.state_context(AgentState.RUNNING):
-            while (
-                self.current_step < self.max_steps and self.state != AgentState.FINISHED
-            ):
-                self.current_step += 1
-                logger.info(f"Executing step {self.current_step}/{self.max_steps}")
-                step_result = await self.step()
-
-                # Check for stuck state
-                if self.is_stuck():
-                    self.handle_stuck_state()
-
-                results.append(f"Step {self.current_step}: {step_result}")
-
-            if self.current_step >= self.max_steps:
-                self.current_step = 0
-                self.state = AgentState.IDLE
-                results.append(f"Terminated: Reached max steps ({self.max_steps})")
-        await SANDBOX_CLIENT.cleanup()
+        # Nested runs share the lease, so the sandbox outlives inner agent runs
+        async with get_sandbox_client().lease():
+            async with self.state_context(AgentState.RUNNING):
+                state = self.state
+                await self.publish(
+                    StateChanged(self.name, self.current_step, state, AgentState.IDLE)
+                )
+                while (
+                    self.current_step < self.max_steps
+                    and self.state != AgentState.FINISHED
+                ):
+                    self.current_step += 1
+                    logger.info(f"Executing step {self.current_step}/{self.max_steps}")
+                    await self.publish(
+                        StepStarted(self.name, self.current_step, self.max_steps)
+                    )
+                    step_result = await self.step()
+
+                    # Check for stuck state
+                    if self.is_stuck():
+                        self.handle_stuck_state()
+
+                    await self.publish(
+                        StepCompleted(self.name, self.current_step, step_result)
+                    )
+                    if self.state != state:
+                        await self.publish(
+                            StateChanged(
+                                self.name, self.current_step, self.state, state
+                            )
+                        )
+                        state = self.state
+
+                if self.current_step >= self.max_steps:
+                    self.current_step = 0
+                    self.state = AgentState.IDLE
+                    await self.publish(
+                        MaxStepsReached(self.name, self.max_steps, self.max_steps)
+                    )
+                await self.publish(
+                    StateChanged(self.name, self.current_step, AgentState.IDLE, state)
+                )
         self.state = AgentState.IDLE  # Reset state after execution
-        return "\n".join(results) if results else "No steps executed"
 
     @abstractmethod
     async def step(self) -> str:
@@ -173,17 +313,11 @@ class BaseAgent(BaseModel, ABC):
         if len(self.memory.messages) < 2:
             return False
 
-        last_message = self.memory.messages[-1]
-        if not last_message.content:
-            return False
-
-        # Count identical content occurrences
-        duplicate_count = sum(
-            1
-            for msg in reversed(self.memory.messages[:-1])
-            if msg.role == "assistant" and msg.content == last_message.content
+        # Counted from the memory's content index rather than a scan
+        duplicate_count = self.memory.count_duplicates(
+            similarity=self.near_duplicate_similarity,
+            limit=self.duplicate_threshold,
         )
-
         return duplicate_count >= self.duplicate_threshold
 
     @property
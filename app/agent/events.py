@@ -0,0 +1,154 @@
+import asyncio
+from typing import Any, Optional
+
+from app.output import OutputSink
+from app.schema import AgentState
+
+
+class AgentEvent:
+    """Base class of the events yielded by `BaseAgent.run_stream`."""
+
+    __slots__ = ("agent", "step")
+
+    def __init__(self, agent: str, step: int):
+        self.agent = agent
+        self.step = step
+
+    def __repr__(self) -> str:
+        fields = ", ".join(
+            f"{name}={getattr(self, name)!r}"
+            for cls in type(self).__mro__
+            for name in getattr(cls, "__slots__", ())
+        )
+        return f"{type(self).__name__}({fields})"
+
+
+class StateChanged(AgentEvent):
+    """The agent moved to a new state."""
+
+    __slots__ = ("state", "previous")
+
+    def __init__(self, agent: str, step: int, state: AgentState, previous: AgentState):
+        super().__init__(agent, step)
+        self.state = state
+        self.previous = previous
+
+
+class StepStarted(AgentEvent):
+    """A step of the agent loop is starting."""
+
+    __slots__ = ("max_steps",)
+
+    def __init__(self, agent: str, step: int, max_steps: int):
+        super().__init__(agent, step)
+        self.max_steps = max_steps
+
+
+class ThinkingDelta(AgentEvent):
+    """Text streamed by the LLM while the agent thinks."""
+
+    __slots__ = ("text",)
+
+    def __init__(self, agent: str, step: int, text: str):
+        super().__init__(agent, step)
+        self.text = text
+
+
+class ToolCallStarted(AgentEvent):
+    """A tool call is about to be executed."""
+
+    __slots__ = ("call_id", "name", "arguments")
+
+    def __init__(
+        self, agent: str, step: int, call_id: str, name: str, arguments: Any
+    ):
+        super().__init__(agent, step)
+        self.call_id = call_id
+        self.name = name
+        self.arguments = arguments
+
+
+class ToolCallFinished(AgentEvent):
+    """A tool call returned; `result` is its observation."""
+
+    __slots__ = ("call_id", "name", "result")
+
+    def __init__(self, agent: str, step: int, call_id: str, name: str, result: Any):
+        super().__init__(agent, step)
+        self.call_id = call_id
+        self.name = name
+        self.result = result
+
+
+class StepCompleted(AgentEvent):
+    """A step finished with the given result."""
+
+    __slots__ = ("result",)
+
+    def __init__(self, agent: str, step: int, result: Any):
+        super().__init__(agent, step)
+        self.result = result
+
+
+class MaxStepsReached(AgentEvent):
+    """The run stopped because it used all its steps."""
+
+    __slots__ = ("max_steps",)
+
+    def __init__(self, agent: str, step: int, max_steps: int):
+        super().__init__(agent, step)
+        self.max_steps = max_steps
+
+
+def transcript_line(event: AgentEvent) -> Optional[str]:
+    """The line an event adds to a run's text transcript (see `BaseAgent.run`)."""
+    if isinstance(event, StepCompleted):
+        return f"Step {event.step}: {event.result}"
+    if isinstance(event, MaxStepsReached):
+        return f"Terminated: Reached max steps ({event.max_steps})"
+    return None
+
+
+class EventSink(OutputSink):
+    """Output sink turning streamed LLM text into ThinkingDelta events.
+
+    Text is still passed on to `downstream` (e.g. the console). `write`
+    cannot wait, so when the event queue is full the text is held back and
+    merged into the next delta, which `drain` publishes once there is room.
+    The sink also carries the queue other events are published to.
+    """
+
+    def __init__(
+        self,
+        queue: asyncio.Queue,
+        agent: Any,
+        downstream: Optional[OutputSink],
+        deltas: bool = True,
+    ):
+        self.queue = queue
+        self.agent = agent
+        self.downstream = downstream
+        self.deltas = deltas
+        self._pending = ""
+
+    def write(self, text: str) -> None:
+        if self.downstream is not None:
+            self.downstream.write(text)
+        if not text or not self.deltas:
+            return
+        self._pending += text
+        if not self.queue.full():
+            self.queue.put_nowait(self._take())
+
+    def flush(self) -> None:
+        if self.downstream is not None:
+            self.downstream.flush()
+
+    async def drain(self) -> None:
+        """Publishes held-back text, waiting for room in the queue."""
+        if self._pending:
+            await self.queue.put(self._take())
+
+    def _take(self) -> ThinkingDelta:
+        text, self._pending = self._pending, ""
+        return ThinkingDelta(self.agent.name, self.agent.current_step, text)
@@ -1,12 +1,14 @@
 import asyncio
 import json
-from typing import Any, List, Optional, Union, Tuple
+from contextlib import aclosing
+from typing import Any, AsyncIterator, List, Optional, Union, Tuple
 
 from pydantic import Field
 
+from app.agent.events import AgentEvent, ToolCallFinished, ToolCallStarted
 from app.agent.react import ReActAgent
 from app.exceptions import TokenLimitExceeded
-from app.logger import logger
+from app.logger import hot_logger, logger
 from app.agent.prompt.toolcall import SYSTEM_PROMPT, NEXT_STEP_PROMPT
 from app.schema import TOOL_CHOICE_TYPE, AgentState, Message, ToolCall, ToolChoice
 from app.tool import CreateChatCompletion, Terminate, ToolCollection
@@ -44,7 +46,7 @@ class ToolCallAgent(ReActAgent):
 
         try:
             # Get response with tool options
-            print(f"\n[{self.name}] ------- Think ------- \n", flush=True)
+            self.emit(f"\n[{self.name}] ------- Think ------- \n\n")
 
             response = await self.llm.ask_tool(
                 messages=self.messages,
@@ -55,6 +57,7 @@ class ToolCallAgent(ReActAgent):
                 ),
                 tools=self.available_tools.to_params(),
                 tool_choice=self.tool_choices,
+                output_sink=self.token_sink,
             )
         except ValueError:
             raise
@@ -80,7 +83,7 @@ class ToolCallAgent(ReActAgent):
         content = response.content if response and response.content else ""
 
         # Log response info
-        logger.info(f"✨ {self.name}'s thoughts: {content}")
+        hot_logger.info("✨ {}'s thoughts: {}", self.name, content)
         logger.info(
             f"🛠️ {self.name} selected {len(tool_calls) if tool_calls else 0} tools to use"
         )
@@ -88,7 +91,7 @@ class ToolCallAgent(ReActAgent):
             logger.info(
                 f"🧰 Tools being prepared: {[call.function.name for call in tool_calls]}"
             )
-            logger.info(f"🔧 Tool arguments: {tool_calls[0].function.arguments}")
+            hot_logger.info("🔧 Tool arguments: {}", tool_calls[0].function.arguments)
 
         try:
             if response is None:
@@ -144,13 +147,34 @@ class ToolCallAgent(ReActAgent):
             # Reset base64_image for each tool call
             self._current_base64_image = None
 
+            await self.publish(
+                ToolCallStarted(
+                    self.name,
+                    self.current_step,
+                    command.id,
+                    command.function.name,
+                    command.function.arguments,
+                )
+            )
             result = await self.execute_tool(command)
 
             if self.max_observe:
                 result = result[: self.max_observe]
 
-            logger.info(
-                f"🎯 Tool '{command.function.name}' completed its mission! Result: {result}"
+            await self.publish(
+                ToolCallFinished(
+                    self.name,
+                    self.current_step,
+                    command.id,
+                    command.function.name,
+                    result,
+                )
+            )
+
+            hot_logger.info(
+                "🎯 Tool '{}' completed its mission! Result: {}",
+                command.function.name,
+                result,
             )
 
             # Add tool response to memory
@@ -165,7 +189,7 @@ class ToolCallAgent(ReActAgent):
         
         if self.state != AgentState.FINISHED:
             # take action (not tool call), request to llm
-            print(f"\n[{self.name}] ------- Act ------- \n", flush=True)
+            self.emit(f"\n[{self.name}] ------- Act ------- \n\n")
 
             response = await self.llm.ask(
                 messages=self.messages,
@@ -174,6 +198,7 @@ class ToolCallAgent(ReActAgent):
                     if self.system_prompt
                     else None
                 ),
+                output_sink=self.token_sink,
             )
             self.memory.add_message(Message.assistant_message(response))
             results.append(response)
@@ -195,7 +220,7 @@ class ToolCallAgent(ReActAgent):
 
             # Execute the tool
             logger.info(f"🔧 Activating tool: '{name}'...")
-            print(f"🔧 Activating tool: '{name}'...")
+            self.emit(f"🔧 Activating tool: '{name}'...\n")
             result = await self.available_tools.execute(name=name, tool_input=args)
 
             # Handle special tools
@@ -260,9 +285,14 @@ class ToolCallAgent(ReActAgent):
                     )
         logger.info(f"✨ Cleanup complete for agent '{self.name}'.")
 
-    async def run(self, request: Optional[str] = None) -> str:
-        """Run the agent with cleanup when done."""
+    async def run_stream(
+        self, request: Optional[str] = None, **kwargs
+    ) -> AsyncIterator[AgentEvent]:
+        """Run the agent with cleanup when done (run() goes through here too)."""
         try:
-            return await super().run(request)
+            # Close the inner stream first so its run is cancelled before cleanup
+            async with aclosing(super().run_stream(request, **kwargs)) as events:
+                async for event in events:
+                    yield event
         finally:
             await self.cleanup()
@@ -58,6 +58,44 @@ class SearchSettings(BaseModel):
         default="us",
         description="Country code for search results (e.g., us, cn, uk)",
     )
+    race_engines: int = Field(
+        default=1,
+        description="Number of engines to query concurrently (1 = try engines one at a time)",
+    )
+    cache_ttl: int = Field(
+        default=600,
+        description="Seconds to cache search results per query/lang/country (0 disables)",
+    )
+    content_cache_ttl: int = Field(
+        default=3600,
+        description="Seconds before cached page content is revalidated (0 disables)",
+    )
+    cache_max_entries: int = Field(
+        default=1000, description="Maximum entries per search cache"
+    )
+    cache_max_bytes: int = Field(
+        default=50 * 1024 * 1024, description="Maximum size in bytes per search cache"
+    )
+    cache_path: Optional[str] = Field(
+        default=None,
+        description="SQLite file to persist search caches across processes (None = memory only)",
+    )
+    cache_max_disk_entries: int = Field(
+        default=10000, description="Maximum rows per search cache in the SQLite file"
+    )
+    fetch_max_bytes: int = Field(
+        default=2 * 1024 * 1024,
+        description="Maximum bytes downloaded per page when fetching content",
+    )
+    fetch_max_chars: int = Field(
+        default=10000, description="Maximum characters of text extracted per page"
+    )
+    fetch_max_connections: int = Field(
+        default=20, description="Size of the shared connection pool for page fetches"
+    )
+    fetch_per_host_limit: int = Field(
+        default=4, description="Maximum concurrent page fetches per host"
+    )
 
 
 class RunflowSettings(BaseModel):
@@ -66,6 +104,57 @@ class RunflowSettings(BaseModel):
     )
 
 
+class LogSettings(BaseModel):
+    console_level: str = Field(default="ERROR", description="Level printed to stderr")
+    file_level: str = Field(default="DEBUG", description="Level written to log files")
+    format: str = Field(
+        default="jsonl",
+        description="Log file format: 'jsonl' (one JSON record per line) or 'text'",
+    )
+    enqueue: bool = Field(
+        default=True,
+        description="Write log files from a background thread instead of the caller",
+    )
+    max_field_chars: int = Field(
+        default=4000,
+        ge=0,
+        description="Truncate log messages and extra fields to this many characters (0 = no limit)",
+    )
+    hot_sample_rate: int = Field(
+        default=1,
+        ge=1,
+        description="Keep 1 in N records of each hot-path log call (tool results, thoughts)",
+    )
+    rotation_bytes: int = Field(
+        default=50 * 1024 * 1024,
+        ge=0,
+        description="Start a new log file past this size (0 = no size limit)",
+    )
+    rotation_interval: float = Field(
+        default=24 * 60 * 60,
+        ge=0,
+        description="Start a new log file after this many seconds (0 = no time limit)",
+    )
+    retention: int = Field(
+        default=20, ge=1, description="Number of rotated log files to keep"
+    )
+
+
+class PlanningSettings(BaseModel):
+    backend: str = Field(
+        default="sqlite",
+        description="Plan store backend: 'sqlite' persists plans, 'memory' keeps them in-process",
+    )
+    path: Optional[str] = Field(
+        default=None,
+        description="SQLite plan database (defaults to workspace/.plans.sqlite)",
+    )
+    resume: bool = Field(
+        default=False,
+        description="Resume the stored plan whose plan_id a flow is given instead of creating a new one",
+    )
+
+
 class BrowserSettings(BaseModel):
     headless: bool = Field(False, description="Whether to run browser in headless mode")
     disable_security: bool = Field(
@@ -89,12 +178,40 @@ class BrowserSettings(BaseModel):
     max_content_length: int = Field(
         2000, description="Maximum length for content retrieval operations"
     )
+    extract_token_budget: int = Field(
+        1000,
+        description="Token budget for page text sent to the LLM by extract_content",
+    )
+    screenshot_mode: str = Field(
+        "full_page",
+        description="Screenshot in browser state: full_page, viewport or none",
+    )
+    screenshot_quality: int = Field(80, description="JPEG quality of screenshots")
+    screenshot_max_tokens: int = Field(
+        1445,
+        description="Image token budget per screenshot; taller pages are cropped (0 = unlimited)",
+    )
+    screenshot_dedup: bool = Field(
+        True,
+        description="Skip re-sending screenshots of an unchanged page (same URL, elements and pixels)",
+    )
+    max_contexts: int = Field(
+        8, description="Maximum browser contexts (one per agent) kept open at once"
+    )
+    max_tabs: int = Field(8, description="Maximum open tabs per browser context")
+    context_idle_timeout: int = Field(
+        600, description="Seconds after which an unused browser context is closed"
+    )
 
 
 class SandboxSettings(BaseModel):
     """Configuration for the execution sandbox"""
 
     use_sandbox: bool = Field(False, description="Whether to use the sandbox")
+    backend: str = Field(
+        "docker",
+        description="Sandbox backend: docker, or process for trusted workloads without docker",
+    )
     image: str = Field("python:3.12-slim", description="Base image")
     work_dir: str = Field("/workspace", description="Container working directory")
     memory_limit: str = Field("512m", description="Memory limit")
@@ -103,6 +220,19 @@ class SandboxSettings(BaseModel):
     network_enabled: bool = Field(
         False, description="Whether network access is allowed"
     )
+    idle_timeout: int = Field(
+        0,
+        description="Seconds to keep the sandbox after its last lease ends (0 = clean up immediately)",
+    )
+    warm_pool_size: int = Field(
+        0,
+        ge=0,
+        description="Pre-created docker sandboxes kept ready per profile (0 = create on demand)",
+    )
+    max_output_bytes: Optional[int] = Field(
+        1024 * 1024,
+        description="Maximum command output kept per command, oldest lines are dropped first (None = unbounded)",
+    )
 
 
 class MCPServerConfig(BaseModel):
@@ -114,6 +244,18 @@ class MCPServerConfig(BaseModel):
     args: List[str] = Field(
         default_factory=list, description="Arguments for stdio command"
     )
+    max_in_flight: int = Field(
+        4, ge=1, description="Maximum concurrent tool calls to this server"
+    )
+    timeout: Optional[float] = Field(
+        60.0, description="Deadline in seconds for a single tool call (None to disable)"
+    )
+    reconnect_attempts: int = Field(
+        5, ge=0, description="Reconnect attempts after a dropped connection (0 to disable)"
+    )
+    reconnect_delay: float = Field(
+        1.0, description="Initial reconnect backoff in seconds, doubled per attempt"
+    )
 
 
 class MCPSettings(BaseModel):
@@ -146,6 +288,16 @@ class MCPSettings(BaseModel):
                         url=server_config.get("url"),
                         command=server_config.get("command"),
                         args=server_config.get("args", []),
+                        **{
+                            key: server_config[key]
+                            for key in (
+                                "max_in_flight",
+                                "timeout",
+                                "reconnect_attempts",
+                                "reconnect_delay",
+                            )
+                            if key in server_config
+                        },
                     )
                 return servers
         except Exception as e:
@@ -167,6 +319,10 @@ class AppConfig(BaseModel):
     run_flow_config: Optional[RunflowSettings] = Field(
         None, description="Run flow configuration"
     )
+    planning_config: Optional[PlanningSettings] = Field(
+        None, description="Planning configuration"
+    )
+    log_config: Optional[LogSettings] = Field(None, description="Logging configuration")
 
     class Config:
         arbitrary_types_allowed = True
@@ -283,6 +439,18 @@ class Config:
             run_flow_settings = RunflowSettings(**run_flow_config)
         else:
             run_flow_settings = RunflowSettings()
+
+        planning_config = raw_config.get("planning")
+        if planning_config:
+            planning_settings = PlanningSettings(**planning_config)
+        else:
+            planning_settings = PlanningSettings()
+
+        log_config = raw_config.get("log")
+        if log_config:
+            log_settings = LogSettings(**log_config)
+        else:
+            log_settings = LogSettings()
         config_dict = {
             "llm": {
                 "default": default_settings,
@@ -296,6 +464,8 @@ class Config:
             "search_config": search_settings,
             "mcp_config": mcp_settings,
             "run_flow_config": run_flow_settings,
+            "planning_config": planning_settings,
+            "log_config": log_settings,
         }
 
         self._config = AppConfig(**config_dict)
@@ -326,6 +496,16 @@ class Config:
         """Get the Run Flow configuration"""
         return self._config.run_flow_config
 
+    @property
+    def planning_config(self) -> PlanningSettings:
+        """Get the planning configuration"""
+        return self._config.planning_config
+
+    @property
+    def log_config(self) -> LogSettings:
+        """Get the logging configuration"""
+        return self._config.log_config
+
     @property
     def workspace_root(self) -> Path:
         """Get the workspace root directory"""
@@ -1,13 +1,15 @@
 import json
 
 from abc import ABC, abstractmethod
-from typing import Optional, Tuple, List, Any
+from contextlib import aclosing
+from typing import Any, AsyncIterator, List, Optional, Tuple
 
 from pydantic import Field
 
+from app.agent.events import AgentEvent, ToolCallFinished, ToolCallStarted
 from app.agent.react import ReActAgent
 from app.llm import LLM
-from app.logger import logger
+from app.logger import hot_logger, logger
 from app.schema import AgentState, Memory
 from app.schema import TOOL_CHOICE_TYPE, Message, ToolCall, ToolChoice
 from app.tool import ToolCollection, Terminate
@@ -47,7 +49,7 @@ class SimpleGenericAgent(ReActAgent):
         #     return True, "Need to execute all tool calls before thinking again."
 
         """Process current state and decide next action"""
-        print(f"\n[{self.name}] ------- Think ------- \n", flush=True)
+        self.emit(f"\n[{self.name}] ------- Think ------- \n\n")
 
         messages = self.messages
         if self.think_next_hint_prompt:
@@ -97,16 +99,34 @@ class SimpleGenericAgent(ReActAgent):
 
     async def act(self) -> str:
         """Execute decided actions"""
-        print(f"\n[{self.name}] ------- Act ------- \n", flush=True)
+        self.emit(f"\n[{self.name}] ------- Act ------- \n\n")
 
         results = []
         for command in self.tool_calls:
             # Reset base64_image for each tool call
             self._current_base64_image = None
 
+            await self.publish(
+                ToolCallStarted(
+                    self.name,
+                    self.current_step,
+                    command.id,
+                    command.function.name,
+                    command.function.arguments,
+                )
+            )
             result = await self.execute_tool(command)
+            await self.publish(
+                ToolCallFinished(
+                    self.name,
+                    self.current_step,
+                    command.id,
+                    command.function.name,
+                    result,
+                )
+            )
 
-            logger.info(f"🎯 Tool '{command.function.name}' completed its mission! Result: {result}")
+            hot_logger.info("🎯 Tool '{}' completed its mission! Result: {}", command.function.name, result)
 
             # Add tool response to memory
             tool_msg = Message.tool_message(
@@ -185,7 +205,7 @@ class SimpleGenericAgent(ReActAgent):
     async def handle_llm_ask_tool(self, **kwargs) -> Tuple[bool, str]:
         """Call LLM ask and handle exception."""
         try:
-            response = await self.llm.ask_tool(**kwargs)
+            response = await self.llm.ask_tool(output_sink=self.token_sink, **kwargs)
         except ValueError:
             raise
         except Exception as e:
@@ -232,7 +252,7 @@ class SimpleGenericAgent(ReActAgent):
     async def handle_llm_ask(self, **kwargs) -> Tuple[bool, str]:
         """Call LLM ask and handle exception."""
         try:
-            response = await self.llm.ask(**kwargs)
+            response = await self.llm.ask(output_sink=self.token_sink, **kwargs)
         except ValueError:
             raise
         except Exception as e:
@@ -272,7 +292,7 @@ class SimpleGenericAgent(ReActAgent):
 
             # Execute the tool
             logger.info(f"🔧 Activating tool: '{name}'...")
-            print(f"🔧 Activating tool: '{name}'...")
+            self.emit(f"🔧 Activating tool: '{name}'...\n")
             result = await self.available_tools.execute(name=name, tool_input=args)
 
             # Handle special tools
@@ -337,9 +357,14 @@ class SimpleGenericAgent(ReActAgent):
                     )
         logger.info(f"✨ Cleanup complete for agent '{self.name}'.")
     
-    async def run(self, request: Optional[str] = None) -> str:
-        """Run the agent with cleanup when done."""
+    async def run_stream(
+        self, request: Optional[str] = None, **kwargs
+    ) -> AsyncIterator[AgentEvent]:
+        """Run the agent with cleanup when done (run() goes through here too)."""
         try:
-            return await super().run(request)
+            # Close the inner stream first so its run is cancelled before cleanup
+            async with aclosing(super().run_stream(request, **kwargs)) as events:
+                async for event in events:
+                    yield event
         finally:
             await self.cleanup()
\ No newline at end of file
@@ -1,7 +1,22 @@
-from typing import Any, Dict, Optional
+import json
+import uuid
+from collections import OrderedDict
+from contextlib import aclosing
+from typing import Any, ClassVar, Dict, List, Literal, Optional
 
+from pydantic import Field
+
+from app.agent.base import BaseAgent
+from app.agent.events import MaxStepsReached, ToolCallFinished, transcript_line
 from app.tool import BaseTool
 from app.agent_manager import AgentManager
+from app.logger import hot_logger
+from app.output import get_default_sink
+
+
+# Full transcripts by id, kept out of the caller's memory; shared by every
+# MsgToAgent instance so an id can be looked up from any of them
+_transcripts: "OrderedDict[str, str]" = OrderedDict()
 
 
 class MsgToAgent(BaseTool):
@@ -28,6 +43,17 @@ class MsgToAgent(BaseTool):
         "required": ["agent_name", "message"],
     }
 
+    reply_mode: Literal["final", "structured", "transcript"] = Field(
+        default="final",
+        description=(
+            "What the caller gets back: the callee's final answer, a JSON reply "
+            "object, or the callee's full step transcript. The tool used to "
+            'always return the transcript; set "transcript" to keep that'
+        ),
+    )
+    # Size of the shared transcript store behind get_transcript
+    max_transcripts: ClassVar[int] = 20
+
     def to_param(self) -> Dict:
         params = super().to_param()
         params["function"]["description"] = self.description.format(agent_list=AgentManager.list_agents())
@@ -40,9 +66,71 @@ class MsgToAgent(BaseTool):
             return f"Agent {agent_name} not found."
 
         request: str = f"Agent {your_name} send message for you, and you have to response that: {message}\n"
-        response = await agent.run(request)
 
-        print(f"\n[{self.name}] ------- Continue ------- \n", flush=True)
+        # Same run as agent.run(), but the pieces of the reply are kept apart
+        steps: List[str] = []
+        tool_calls: List[str] = []
+        max_steps_reached = False
+        async with aclosing(agent.run_stream(request, include_deltas=False)) as events:
+            async for event in events:
+                line = transcript_line(event)
+                if line is not None:
+                    steps.append(line)
+                if isinstance(event, ToolCallFinished):
+                    tool_calls.append(event.name)
+                elif isinstance(event, MaxStepsReached):
+                    max_steps_reached = True
+        transcript = "\n".join(steps) if steps else "No steps executed"
+
+        # Banner goes to the sender's sink, since the sender resumes now
+        sender = AgentManager.get_agent(your_name)
+        if sender is not None:
+            sender.emit(f"\n[{self.name}] ------- Continue ------- \n\n")
+        else:
+            get_default_sink().write(f"\n[{self.name}] ------- Continue ------- \n\n")
+
+        if self.reply_mode == "transcript":
+            return f"Agent {agent_name} response: {transcript}"
+
+        transcript_id = self._keep_transcript(agent_name, transcript)
+        reply = self._final_reply(agent, request) or transcript
+        if self.reply_mode == "structured":
+            return json.dumps(
+                {
+                    "agent": agent_name,
+                    "reply": reply,
+                    "steps": len(steps) - max_steps_reached,
+                    "tool_calls": tool_calls,
+                    "max_steps_reached": max_steps_reached,
+                    "transcript_id": transcript_id,
+                },
+                ensure_ascii=False,
+            )
+        return f"Agent {agent_name} response: {reply}"
+
+    @staticmethod
+    def _final_reply(agent: BaseAgent, request: str) -> Optional[str]:
+        """The callee's last non-empty assistant message after the request."""
+        for msg in reversed(agent.memory.messages):
+            if msg.role == "user" and msg.content == request:
+                break
+            if msg.role == "assistant" and msg.content:
+                return msg.content
+        return None
+
+    def _keep_transcript(self, agent_name: str, transcript: str) -> str:
+        """Store a full transcript for debugging and return its id."""
+        transcript_id = f"{agent_name}-{uuid.uuid4().hex[:8]}"
+        _transcripts[transcript_id] = transcript
+        while len(_transcripts) > MsgToAgent.max_transcripts:
+            _transcripts.popitem(last=False)
+        hot_logger.debug(
+            "Transcript {} of {}:\n{}", transcript_id, agent_name, transcript
+        )
+        return transcript_id
 
-        return f"Agent {agent_name} response: {response}"
+    @staticmethod
+    def get_transcript(transcript_id: str) -> Optional[str]:
+        """Full step transcript of a recent sub-agent run, if still kept."""
+        return _transcripts.get(transcript_id)
 
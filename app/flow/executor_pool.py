@@ -0,0 +1,230 @@
+import asyncio
+import copy
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+from pydantic import BaseModel
+
+from app.agent.base import BaseAgent
+from app.logger import logger
+from app.schema import AgentState
+from app.tool.base import BaseTool
+from app.tool.tool_collection import ToolCollection
+
+
+class _PooledExecutor:
+    """An agent instance in the pool and what it needs to be reset."""
+
+    __slots__ = ("agent", "busy", "next_step_prompt")
+
+    def __init__(self, agent: BaseAgent, next_step_prompt: Optional[str] = None):
+        self.agent = agent
+        self.busy = False
+        # handle_stuck_state prepends to the prompt, so keep the original
+        self.next_step_prompt = next_step_prompt or agent.next_step_prompt
+
+
+class ExecutorPool:
+    """Leases executor agents to plan steps, cloning them when all are busy.
+
+    Each executor key starts with the configured agent; when a step needs
+    that key while every instance is busy, an equivalent instance is cloned,
+    up to `max_instances` per key. Steps that could run on several keys go
+    to the one expected to free up first, judged by queue depth and recent
+    step latency. Between steps an instance is reset in place (step counter,
+    state, and optionally memory) instead of being rebuilt.
+
+    Clones get their own copy of every tool. An agent whose tools cannot be
+    copied (a ToolCollection subclass such as MCPClients holding live
+    connections, or a tool that is not a pydantic model) is never cloned, so
+    its key runs one step at a time.
+    """
+
+    def __init__(
+        self,
+        agents: Dict[str, BaseAgent],
+        max_instances: int = 4,
+        reset_memory: bool = False,
+        alpha: float = 0.3,
+    ):
+        """Initializes the pool with one instance per executor key.
+
+        Args:
+            agents: Configured executor agents by key; used as clone templates.
+            max_instances: Maximum instances per key.
+            reset_memory: Clear an instance's memory before each step; by
+                default an executor keeps its conversation across steps.
+            alpha: Smoothing factor of the step latency estimates.
+        """
+        self.max_instances = max_instances
+        self.reset_memory = reset_memory
+        self.alpha = alpha
+        self._instances: Dict[str, List[_PooledExecutor]] = {
+            key: [_PooledExecutor(agent)] for key, agent in agents.items()
+        }
+        self._waiting: Dict[str, int] = {key: 0 for key in agents}
+        self._latency: Dict[str, Optional[float]] = {key: None for key in agents}
+        self._limits: Dict[str, int] = {}
+        for key, agent in agents.items():
+            self._limits[key] = max_instances if self._can_clone(agent) else 1
+            if self._limits[key] < max_instances:
+                logger.info(
+                    f"Executor {key} cannot be cloned; it runs one step at a time"
+                )
+        self._condition = asyncio.Condition()
+
+    def _has_capacity(self, key: str) -> bool:
+        """Whether a lease on the key can start without waiting."""
+        instances = self._instances[key]
+        return any(not entry.busy for entry in instances) or (
+            len(instances) < self._limits[key]
+        )
+
+    def _expected_wait(self, key: str) -> Tuple[int, float]:
+        """Ranks a key for a new step; lower is better.
+
+        Keys with an idle instance come first, then keys that can clone one,
+        then the rest by the estimated time until their queue drains.
+        """
+        instances = self._instances[key]
+        latency = self._latency[key] or 0.0
+        if any(not entry.busy for entry in instances):
+            return 0, latency
+        if len(instances) < self._limits[key]:
+            return 1, latency
+        queued = self._waiting[key] + 1
+        return 2, latency * queued / len(instances)
+
+    def _choose(self, keys: Sequence[str]) -> str:
+        """Picks the least loaded of the candidate keys."""
+        candidates = [key for key in keys if key in self._instances]
+        if not candidates:
+            raise ValueError(f"No executor available for keys: {list(keys)}")
+        return min(candidates, key=self._expected_wait)
+
+    @asynccontextmanager
+    async def lease(self, keys: Sequence[str]) -> AsyncIterator[BaseAgent]:
+        """Leases an idle, freshly reset executor for one step.
+
+        Args:
+            keys: Executor keys that can run the step, in order of preference.
+
+        Yields:
+            The leased agent.
+        """
+        async with self._condition:
+            key = self._choose(keys)
+            self._waiting[key] += 1
+            try:
+                await self._condition.wait_for(lambda: self._has_capacity(key))
+            finally:
+                self._waiting[key] -= 1
+            entry = self._acquire(key)
+
+        start = time.monotonic()
+        try:
+            yield entry.agent
+        finally:
+            self._record(key, time.monotonic() - start)
+            async with self._condition:
+                entry.busy = False
+                self._condition.notify_all()
+
+    def _acquire(self, key: str) -> _PooledExecutor:
+        """Marks an idle instance busy, cloning one if none is idle."""
+        entry = next((entry for entry in self._instances[key] if not entry.busy), None)
+        if entry is None:
+            template = self._instances[key][0]
+            entry = _PooledExecutor(
+                self._clone(template.agent), template.next_step_prompt
+            )
+            self._instances[key].append(entry)
+            logger.info(
+                f"Cloned executor {key} ({len(self._instances[key])}/{self._limits[key]} instances)"
+            )
+        self._reset(entry)
+        entry.busy = True
+        return entry
+
+    def _reset(self, entry: _PooledExecutor) -> None:
+        """Prepares an instance for its next step without rebuilding it."""
+        agent = entry.agent
+        if self.reset_memory:
+            agent.memory.clear()
+        agent.current_step = 0
+        agent.state = AgentState.IDLE
+        agent.next_step_prompt = entry.next_step_prompt
+        if hasattr(agent, "tool_calls"):
+            agent.tool_calls = []
+
+    @staticmethod
+    def _can_clone(agent: BaseAgent) -> bool:
+        """Whether every tool the agent was given can be copied for a clone.
+
+        Tools left at their defaults are fine: a clone builds fresh ones.
+        """
+        for name in agent.model_fields_set:
+            value = getattr(agent, name)
+            if isinstance(value, BaseTool):
+                return False
+            if not isinstance(value, ToolCollection):
+                continue
+            if type(value) is not ToolCollection:
+                return False
+            for tool in value:
+                if not isinstance(tool, BaseModel):
+                    return False
+                try:
+                    ExecutorPool._copy_fields(tool)
+                except Exception:
+                    return False
+        return True
+
+    @staticmethod
+    def _copy_fields(tool: BaseModel) -> Dict[str, Any]:
+        """Deep copies of the fields explicitly set on a tool."""
+        return {
+            name: copy.deepcopy(getattr(tool, name)) for name in tool.model_fields_set
+        }
+
+    @staticmethod
+    def _clone(agent: BaseAgent) -> BaseAgent:
+        """Creates an equivalent agent with its own memory and tool state.
+
+        The clone is built from the fields set on the template, so everything
+        else (memory, default tools) comes from fresh defaults. Tools passed
+        explicitly are rebuilt one by one from deep copies of their fields,
+        so no tool state is shared with the template.
+        """
+        fields: Dict[str, Any] = {
+            name: getattr(agent, name)
+            for name in agent.model_fields_set
+            if name not in ("memory", "state", "current_step")
+        }
+        for name, value in fields.items():
+            if isinstance(value, ToolCollection):
+                fields[name] = ToolCollection(
+                    *(type(tool)(**ExecutorPool._copy_fields(tool)) for tool in value)
+                )
+        return type(agent)(**fields)
+
+    def _record(self, key: str, latency: float) -> None:
+        """Updates the key's smoothed step latency."""
+        previous = self._latency[key]
+        if previous is None:
+            self._latency[key] = latency
+        else:
+            self._latency[key] = previous + self.alpha * (latency - previous)
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Returns instances, load and latency per executor key."""
+        return {
+            key: {
+                "instances": len(instances),
+                "busy": sum(1 for entry in instances if entry.busy),
+                "waiting": self._waiting[key],
+                "latency": self._latency[key],
+            }
+            for key, instances in self._instances.items()
+        }
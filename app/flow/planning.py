@@ -1,14 +1,23 @@
+import asyncio
 import json
+import re
 import time
 from enum import Enum
-from typing import Dict, List, Optional, Union
+from typing import Dict, List, Optional, Tuple, Union
 
-from pydantic import Field
+from pydantic import Field, PrivateAttr
 
 from app.agent.base import BaseAgent
+from app.config import config
 from app.flow.base import BaseFlow
+from app.flow.executor_pool import ExecutorPool
 from app.llm import LLM
 from app.logger import logger
+from app.sandbox.client import (
+    current_sandbox_session,
+    get_sandbox_client,
+    sandbox_session,
+)
 from app.schema import AgentState, Message, ToolChoice
 from app.tool import PlanningTool
 
@@ -50,6 +59,23 @@ class PlanningFlow(BaseFlow):
     executor_keys: List[str] = Field(default_factory=list)
     active_plan_id: str = Field(default_factory=lambda: f"plan_{int(time.time())}")
     current_step_index: Optional[int] = None
+    max_concurrency: int = Field(
+        default=4, ge=1, description="Maximum number of plan steps running at once"
+    )
+
+    executor_instances: int = Field(
+        default=4, ge=1, description="Maximum instances per executor agent"
+    )
+    resume: bool = Field(
+        default_factory=lambda: config.planning_config.resume,
+        description="Continue the stored plan with the given plan_id if there is one",
+    )
+
+    # Serializes plan status updates between concurrently running steps
+    _plan_lock: asyncio.Lock = PrivateAttr(default_factory=asyncio.Lock)
+    _executor_pool: Optional[ExecutorPool] = PrivateAttr(default=None)
+    # Plan version each executor instance last saw, for incremental plan views
+    _plan_views: Dict[int, int] = PrivateAttr(default_factory=dict)
 
     def __init__(
         self, agents: Union[BaseAgent, List[BaseAgent], Dict[str, BaseAgent]], **data
@@ -61,6 +87,11 @@ class PlanningFlow(BaseFlow):
         # Set plan ID if provided
         if "plan_id" in data:
             data["active_plan_id"] = data.pop("plan_id")
+        # A generated plan ID never matches a stored plan, so resuming
+        # needs the ID of the plan to continue
+        if data.get("resume") and "active_plan_id" not in data:
+            raise ValueError("Resuming a plan requires an explicit plan_id")
+        explicit_plan_id = "active_plan_id" in data
 
         # Initialize the planning tool if not provided
         if "planning_tool" not in data:
@@ -69,6 +100,8 @@ class PlanningFlow(BaseFlow):
 
         # Call parent's init with the processed data
         super().__init__(agents, **data)
+        if not explicit_plan_id:
+            self.resume = False
 
         # Set executor_keys to all agent keys if not specified
         if not self.executor_keys:
@@ -79,59 +112,188 @@ class PlanningFlow(BaseFlow):
         Get an appropriate executor agent for the current step.
         Can be extended to select agents based on step type/requirements.
         """
+        keys = self._get_executor_keys(step_type)
+        return self.agents[keys[0]] if keys else self.primary_agent
+
+    def _get_executor_keys(self, step_type: Optional[str] = None) -> List[str]:
+        """Keys of the agents that can run a step, in order of preference."""
         # If step type is provided and matches an agent key, use that agent
         if step_type and step_type in self.agents:
-            return self.agents[step_type]
+            return [step_type]
+
+        # Otherwise use any executor or fall back to primary agent
+        keys = [key for key in self.executor_keys if key in self.agents]
+        if not keys and self.primary_agent_key in self.agents:
+            keys = [self.primary_agent_key]
+        return keys
+
+    @property
+    def executor_pool(self) -> ExecutorPool:
+        """Pool leasing executor instances to steps, created on first use."""
+        if self._executor_pool is None:
+            # Executors keep their conversation between steps, so their prompts
+            # only need the plan changes since their previous step
+            self._executor_pool = ExecutorPool(
+                self.agents, max_instances=self.executor_instances
+            )
+        return self._executor_pool
 
-        # Otherwise use the first available executor or fall back to primary agent
-        for key in self.executor_keys:
-            if key in self.agents:
-                return self.agents[key]
+    async def execute(self, input_text: str) -> str:
+        """Execute the planning flow with agents.
 
-        # Fallback to primary agent
-        return self.primary_agent
+        The flow holds a sandbox lease for its whole duration, so the sandbox
+        is shared by every step instead of being recreated per agent run.
+        Outside of an enclosing sandbox session, the flow runs in its own
+        session keyed by its plan ID, so concurrent flows do not share one.
+        """
+        session = current_sandbox_session() or self.active_plan_id
+        with sandbox_session(session):
+            async with get_sandbox_client().lease():
+                return await self._execute(input_text)
 
-    async def execute(self, input_text: str) -> str:
-        """Execute the planning flow with agents."""
+    async def _execute(self, input_text: str) -> str:
+        """Create the plan and run its steps until completion."""
         try:
             if not self.primary_agent:
                 raise ValueError("No primary agent available")
 
+            result = ""
+            if self.resume and self.planning_tool.has_plan(self.active_plan_id):
+                result = self._resume_plan()
             # Create initial plan if input provided
-            if input_text:
+            elif input_text:
+                if self.planning_tool.has_plan(self.active_plan_id):
+                    return (
+                        f"Plan {self.active_plan_id} already exists; "
+                        "set resume to continue it"
+                    )
                 await self._create_initial_plan(input_text)
 
                 # Verify plan was created successfully
-                if self.active_plan_id not in self.planning_tool.plans:
+                if not self.planning_tool.has_plan(self.active_plan_id):
                     logger.error(
                         f"Plan creation failed. Plan ID {self.active_plan_id} not found in planning tool."
                     )
                     return f"Failed to create plan for: {input_text}"
 
-            result = ""
-            while True:
-                # Get current step to execute
-                self.current_step_index, step_info = await self._get_current_step_info()
+            return result + await self._run_steps()
+        except Exception as e:
+            logger.error(f"Error in PlanningFlow: {str(e)}")
+            return f"Execution failed: {str(e)}"
 
-                # Exit if no more steps or plan completed
-                if self.current_step_index is None:
-                    result += await self._finalize_plan()
-                    break
+    def _resume_plan(self) -> str:
+        """Pick up a stored plan where it stopped.
 
-                # Execute current step with appropriate agent
-                step_type = step_info.get("type") if step_info else None
-                executor = self.get_executor(step_type)
-                step_result = await self._execute_step(executor, step_info)
-                result += step_result + "\n"
+        Completed steps are kept along with their stored results; steps that
+        were in progress when the previous run stopped are started again.
 
-                # Check if agent wants to terminate
-                if hasattr(executor, "state") and executor.state == AgentState.FINISHED:
+        Returns:
+            The stored results of the completed steps.
+        """
+        plan = self.planning_tool.get_plan(self.active_plan_id)
+        logger.info(
+            f"Resuming plan {self.active_plan_id}: "
+            f"{plan.counts['completed']}/{len(plan.steps)} steps completed"
+        )
+        result = ""
+        for index, step in enumerate(plan.steps):
+            if step.status == PlanStepStatus.COMPLETED.value:
+                cached = self.planning_tool.get_step_result(self.active_plan_id, index)
+                if cached is not None:
+                    result += cached + "\n"
+        return result
+
+    async def _run_steps(self) -> str:
+        """Run plan steps until the plan is done, starting each as soon as it is ready.
+
+        Every ready step (see PlanningTool.get_ready_steps) is started on an
+        executor leased from the pool, up to `max_concurrency` steps at once.
+        Plans without step dependencies therefore still run one step at a
+        time, in order.
+        """
+        result = ""
+        running: Dict[asyncio.Task, int] = {}
+        stopping = False
+        try:
+            while True:
+                if not stopping:
+                    for index, step_info in await self._claim_ready_steps(running):
+                        running[asyncio.create_task(self._run_step(step_info))] = index
+
+                # Exit if no more steps are running or ready
+                if not running:
+                    if not stopping:
+                        result += await self._finalize_plan()
                     break
 
+                done, _ = await asyncio.wait(
+                    running, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    running.pop(task)
+                    step_result, finished = task.result()
+                    result += step_result + "\n"
+
+                    # Check if agent wants to terminate
+                    if finished:
+                        stopping = True
             return result
-        except Exception as e:
-            logger.error(f"Error in PlanningFlow: {str(e)}")
-            return f"Execution failed: {str(e)}"
+        finally:
+            for task in running:
+                task.cancel()
+            # Let cancelled steps unwind and return their executors to the pool
+            await asyncio.gather(*running, return_exceptions=True)
+
+    async def _run_step(self, step_info: dict) -> Tuple[str, bool]:
+        """Run a step on a leased executor.
+
+        Returns:
+            The step result and whether the executor asked to terminate.
+        """
+        keys = self._get_executor_keys(step_info.get("type"))
+        async with self.executor_pool.lease(keys) as executor:
+            step_result = await self._execute_step(executor, step_info)
+            finished = (
+                hasattr(executor, "state") and executor.state == AgentState.FINISHED
+            )
+        return step_result, finished
+
+    async def _claim_ready_steps(
+        self, running: Dict[asyncio.Task, int]
+    ) -> List[Tuple[int, dict]]:
+        """Mark ready steps as in progress, up to the free concurrency slots.
+
+        Returns:
+            (step index, step info) for each claimed step.
+        """
+        capacity = self.max_concurrency - len(running)
+        if capacity <= 0:
+            return []
+
+        claimed = []
+        async with self._plan_lock:
+            if not self.planning_tool.has_plan(self.active_plan_id):
+                logger.error(f"Plan with ID {self.active_plan_id} not found")
+                return []
+
+            plan = self.planning_tool.get_plan(self.active_plan_id)
+            for index in plan.ready_steps(set(running.values()))[:capacity]:
+                await self._set_step_status(index, PlanStepStatus.IN_PROGRESS.value)
+                step_info = self._get_step_info(index, plan.steps[index].text)
+                claimed.append((index, step_info))
+
+        if claimed:
+            self.current_step_index = claimed[-1][0]
+        return claimed
+
+    @staticmethod
+    def _get_step_info(index: int, step: str) -> dict:
+        """Build the info of a step, extracting its type (e.g. [SEARCH] or [CODE])."""
+        step_info = {"index": index, "text": step}
+        type_match = re.search(r"\[([A-Z_]+)\]", step)
+        if type_match:
+            step_info["type"] = type_match.group(1).lower()
+        return step_info
 
     async def _create_initial_plan(self, request: str) -> None:
         """Create an initial plan based on the request using the flow's LLM and PlanningTool."""
@@ -158,6 +320,11 @@ class PlanningFlow(BaseFlow):
                 f"The infomation of them are below: {json.dumps(agents_description)}\n"
                 "When creating steps in the planning tool, please specify the agent names using the format '[agent_name]'."
             )
+        if self.max_concurrency > 1:
+            system_message_content += (
+                "\nSteps that do not depend on each other can run in parallel: "
+                "declare each step's prerequisites with `step_dependencies`."
+            )
 
         # Create a system message for plan creation
         system_message = Message.system_message(system_message_content)
@@ -215,58 +382,25 @@ class PlanningFlow(BaseFlow):
         Parse the current plan to identify the first non-completed step's index and info.
         Returns (None, None) if no active step is found.
         """
-        if (
-            not self.active_plan_id
-            or self.active_plan_id not in self.planning_tool.plans
+        if not self.active_plan_id or not self.planning_tool.has_plan(
+            self.active_plan_id
         ):
             logger.error(f"Plan with ID {self.active_plan_id} not found")
             return None, None
 
         try:
             # Direct access to plan data from planning tool storage
-            plan_data = self.planning_tool.plans[self.active_plan_id]
-            steps = plan_data.get("steps", [])
-            step_statuses = plan_data.get("step_statuses", [])
+            plan = self.planning_tool.get_plan(self.active_plan_id)
 
             # Find first non-completed step
-            for i, step in enumerate(steps):
-                if i >= len(step_statuses):
-                    status = PlanStepStatus.NOT_STARTED.value
-                else:
-                    status = step_statuses[i]
-
-                if status in PlanStepStatus.get_active_statuses():
-                    # Extract step type/category if available
-                    step_info = {"text": step}
-
-                    # Try to extract step type from the text (e.g., [SEARCH] or [CODE])
-                    import re
-
-                    type_match = re.search(r"\[([A-Z_]+)\]", step)
-                    if type_match:
-                        step_info["type"] = type_match.group(1).lower()
-
+            for i, step in enumerate(plan.steps):
+                if step.status in PlanStepStatus.get_active_statuses():
                     # Mark current step as in_progress
-                    try:
-                        await self.planning_tool.execute(
-                            command="mark_step",
-                            plan_id=self.active_plan_id,
-                            step_index=i,
-                            step_status=PlanStepStatus.IN_PROGRESS.value,
+                    async with self._plan_lock:
+                        await self._set_step_status(
+                            i, PlanStepStatus.IN_PROGRESS.value
                         )
-                    except Exception as e:
-                        logger.warning(f"Error marking step as in_progress: {e}")
-                        # Update step status directly if needed
-                        if i < len(step_statuses):
-                            step_statuses[i] = PlanStepStatus.IN_PROGRESS.value
-                        else:
-                            while len(step_statuses) < i:
-                                step_statuses.append(PlanStepStatus.NOT_STARTED.value)
-                            step_statuses.append(PlanStepStatus.IN_PROGRESS.value)
-
-                        plan_data["step_statuses"] = step_statuses
-
-                    return i, step_info
+                    return i, self._get_step_info(i, step.text)
 
             return None, None  # No active step found
 
@@ -275,10 +409,19 @@ class PlanningFlow(BaseFlow):
             return None, None
 
     async def _execute_step(self, executor: BaseAgent, step_info: dict) -> str:
-        """Execute the current step with the specified agent using agent.run()."""
+        """Execute a step with the specified agent using agent.run()."""
+        step_index = step_info.get("index", self.current_step_index)
+
+        # A result stored by an earlier run means the work is already done
+        cached = self._get_cached_result(step_index)
+        if cached is not None:
+            logger.info(f"Reusing stored result of step {step_index}")
+            await self._mark_step_completed(step_index)
+            return cached
+
         # Prepare context for the agent with current plan status
-        plan_status = await self._get_plan_text()
-        step_text = step_info.get("text", f"Step {self.current_step_index}")
+        plan_status = self._get_plan_view(executor)
+        step_text = step_info.get("text", f"Step {step_index}")
 
         # Create a prompt for the agent to execute the current step
         step_prompt = f"""
@@ -286,7 +429,7 @@ class PlanningFlow(BaseFlow):
         {plan_status}
 
         YOUR CURRENT TASK:
-        You are now working on step {self.current_step_index}: "{step_text}"
+        You are now working on step {step_index}: "{step_text}"
 
         Please only execute this current step using the appropriate tools. When you're done, provide a summary of what you accomplished.
         """
@@ -295,44 +438,60 @@ class PlanningFlow(BaseFlow):
         try:
             step_result = await executor.run(step_prompt)
 
-            # Mark the step as completed after successful execution
-            await self._mark_step_completed()
+            # Store the result before marking the step completed, so a crash
+            # in between never loses finished work
+            self._save_result(step_index, step_result)
+            await self._mark_step_completed(step_index)
 
             return step_result
         except Exception as e:
-            logger.error(f"Error executing step {self.current_step_index}: {e}")
-            return f"Error executing step {self.current_step_index}: {str(e)}"
+            logger.error(f"Error executing step {step_index}: {e}")
+            return f"Error executing step {step_index}: {str(e)}"
 
-    async def _mark_step_completed(self) -> None:
-        """Mark the current step as completed."""
-        if self.current_step_index is None:
-            return
+    def _get_cached_result(self, step_index: Optional[int]) -> Optional[str]:
+        """Stored result of a step from a previous run, if any."""
+        if step_index is None:
+            return None
+        try:
+            return self.planning_tool.get_step_result(self.active_plan_id, step_index)
+        except Exception as e:
+            logger.warning(f"Failed to read stored result of step {step_index}: {e}")
+            return None
 
+    def _save_result(self, step_index: Optional[int], result: str) -> None:
+        if step_index is None:
+            return
         try:
-            # Mark the step as completed
-            await self.planning_tool.execute(
-                command="mark_step",
-                plan_id=self.active_plan_id,
-                step_index=self.current_step_index,
-                step_status=PlanStepStatus.COMPLETED.value,
-            )
-            logger.info(
-                f"Marked step {self.current_step_index} as completed in plan {self.active_plan_id}"
-            )
+            self.planning_tool.save_step_result(self.active_plan_id, step_index, result)
         except Exception as e:
-            logger.warning(f"Failed to update plan status: {e}")
-            # Update step status directly in planning tool storage
-            if self.active_plan_id in self.planning_tool.plans:
-                plan_data = self.planning_tool.plans[self.active_plan_id]
-                step_statuses = plan_data.get("step_statuses", [])
+            logger.warning(f"Failed to store result of step {step_index}: {e}")
 
-                # Ensure the step_statuses list is long enough
-                while len(step_statuses) <= self.current_step_index:
-                    step_statuses.append(PlanStepStatus.NOT_STARTED.value)
+    async def _mark_step_completed(self, step_index: Optional[int] = None) -> None:
+        """Mark a step (by default the current one) as completed."""
+        if step_index is None:
+            step_index = self.current_step_index
+        if step_index is None:
+            return
 
-                # Update the status
-                step_statuses[self.current_step_index] = PlanStepStatus.COMPLETED.value
-                plan_data["step_statuses"] = step_statuses
+        async with self._plan_lock:
+            if await self._set_step_status(step_index, PlanStepStatus.COMPLETED.value):
+                logger.info(
+                    f"Marked step {step_index} as completed in plan {self.active_plan_id}"
+                )
+
+    async def _set_step_status(self, step_index: int, status: str) -> bool:
+        """Set a step's status without rendering the plan; O(1).
+
+        The update is written to the plan store first (see
+        PlanningTool.set_step_status). Callers hold `_plan_lock`. Returns
+        whether the update was applied.
+        """
+        try:
+            self.planning_tool.set_step_status(self.active_plan_id, step_index, status)
+            return True
+        except Exception as e:
+            logger.warning(f"Failed to update plan status: {e}")
+            return False
 
     async def _get_plan_text(self) -> str:
         """Get the current plan as formatted text."""
@@ -348,61 +507,28 @@ class PlanningFlow(BaseFlow):
     def _generate_plan_text_from_storage(self) -> str:
         """Generate plan text directly from storage if the planning tool fails."""
         try:
-            if self.active_plan_id not in self.planning_tool.plans:
+            if not self.planning_tool.has_plan(self.active_plan_id):
                 return f"Error: Plan with ID {self.active_plan_id} not found"
-
-            plan_data = self.planning_tool.plans[self.active_plan_id]
-            title = plan_data.get("title", "Untitled Plan")
-            steps = plan_data.get("steps", [])
-            step_statuses = plan_data.get("step_statuses", [])
-            step_notes = plan_data.get("step_notes", [])
-
-            # Ensure step_statuses and step_notes match the number of steps
-            while len(step_statuses) < len(steps):
-                step_statuses.append(PlanStepStatus.NOT_STARTED.value)
-            while len(step_notes) < len(steps):
-                step_notes.append("")
-
-            # Count steps by status
-            status_counts = {status: 0 for status in PlanStepStatus.get_all_statuses()}
-
-            for status in step_statuses:
-                if status in status_counts:
-                    status_counts[status] += 1
-
-            completed = status_counts[PlanStepStatus.COMPLETED.value]
-            total = len(steps)
-            progress = (completed / total) * 100 if total > 0 else 0
-
-            plan_text = f"Plan: {title} (ID: {self.active_plan_id})\n"
-            plan_text += "=" * len(plan_text) + "\n\n"
-
-            plan_text += (
-                f"Progress: {completed}/{total} steps completed ({progress:.1f}%)\n"
-            )
-            plan_text += f"Status: {status_counts[PlanStepStatus.COMPLETED.value]} completed, {status_counts[PlanStepStatus.IN_PROGRESS.value]} in progress, "
-            plan_text += f"{status_counts[PlanStepStatus.BLOCKED.value]} blocked, {status_counts[PlanStepStatus.NOT_STARTED.value]} not started\n\n"
-            plan_text += "Steps:\n"
-
-            status_marks = PlanStepStatus.get_status_marks()
-
-            for i, (step, status, notes) in enumerate(
-                zip(steps, step_statuses, step_notes)
-            ):
-                # Use status marks to indicate step status
-                status_mark = status_marks.get(
-                    status, status_marks[PlanStepStatus.NOT_STARTED.value]
-                )
-
-                plan_text += f"{i}. {status_mark} {step}\n"
-                if notes:
-                    plan_text += f"   Notes: {notes}\n"
-
-            return plan_text
+            return self.planning_tool.get_plan(self.active_plan_id).render()
         except Exception as e:
             logger.error(f"Error generating plan text from storage: {e}")
             return f"Error: Unable to retrieve plan with ID {self.active_plan_id}"
 
+    def _get_plan_view(self, executor: BaseAgent) -> str:
+        """Plan text for an executor's prompt: only what changed since its last view.
+
+        An executor that has not seen the plan yet, or whose memory no longer
+        holds it, gets the whole plan.
+        """
+        if not self.planning_tool.has_plan(self.active_plan_id):
+            return self._generate_plan_text_from_storage()
+        plan = self.planning_tool.get_plan(self.active_plan_id)
+
+        key = id(executor)
+        last_seen = self._plan_views.get(key) if executor.memory.messages else None
+        self._plan_views[key] = plan.version
+        return plan.render_delta(last_seen)
+
     async def _finalize_plan(self) -> str:
         """Finalize the plan and provide a summary using the flow's LLM directly."""
         plan_text = await self._get_plan_text()
@@ -1,5 +1,5 @@
 import math, json
-from typing import Dict, List, Optional, Union
+from typing import Dict, List, Optional, Tuple, Union
 
 import tiktoken
 from openai import (
@@ -22,6 +22,7 @@ from tenacity import (
 from app.config import LLMSettings, config
 from app.exceptions import TokenLimitExceeded
 from app.logger import logger  # Assuming a logger is set up in your app
+from app.output import OutputSink, resolve_sink
 from app.schema import (
     ROLE_VALUES,
     TOOL_CHOICE_TYPE,
@@ -92,28 +93,59 @@ class TokenCounter:
             self._calculate_high_detail_tokens(1024, 1024) if detail == "high" else 1024
         )
 
-    def _calculate_high_detail_tokens(self, width: int, height: int) -> int:
+    @classmethod
+    def _calculate_high_detail_tokens(cls, width: int, height: int) -> int:
         """Calculate tokens for high detail images based on dimensions"""
         # Step 1: Scale to fit in MAX_SIZE x MAX_SIZE square
-        if width > self.MAX_SIZE or height > self.MAX_SIZE:
-            scale = self.MAX_SIZE / max(width, height)
+        if width > cls.MAX_SIZE or height > cls.MAX_SIZE:
+            scale = cls.MAX_SIZE / max(width, height)
             width = int(width * scale)
             height = int(height * scale)
 
         # Step 2: Scale so shortest side is HIGH_DETAIL_TARGET_SHORT_SIDE
-        scale = self.HIGH_DETAIL_TARGET_SHORT_SIDE / min(width, height)
+        scale = cls.HIGH_DETAIL_TARGET_SHORT_SIDE / min(width, height)
         scaled_width = int(width * scale)
         scaled_height = int(height * scale)
 
         # Step 3: Count number of 512px tiles
-        tiles_x = math.ceil(scaled_width / self.TILE_SIZE)
-        tiles_y = math.ceil(scaled_height / self.TILE_SIZE)
+        tiles_x = math.ceil(scaled_width / cls.TILE_SIZE)
+        tiles_y = math.ceil(scaled_height / cls.TILE_SIZE)
         total_tiles = tiles_x * tiles_y
 
         # Step 4: Calculate final token count
         return (
-            total_tiles * self.HIGH_DETAIL_TILE_TOKENS
-        ) + self.LOW_DETAIL_IMAGE_TOKENS
+            total_tiles * cls.HIGH_DETAIL_TILE_TOKENS
+        ) + cls.LOW_DETAIL_IMAGE_TOKENS
+
+    @classmethod
+    def plan_image_capture(
+        cls, width: int, height: int, max_tokens: Optional[int] = None
+    ) -> Tuple[int, float]:
+        """
+        Plan a screenshot so that no pixels are wasted and it fits a token budget
+
+        Returns the height to capture (cropping from the top while the high
+        detail cost exceeds max_tokens) and the scale factor at which the
+        model would see the capture anyway (never upscaling).
+        """
+        capture_height = height
+        if max_tokens:
+            step = cls.TILE_SIZE // 2
+            tokens = cls._calculate_high_detail_tokens(width, capture_height)
+            while tokens > max_tokens and capture_height > step:
+                cropped_tokens = cls._calculate_high_detail_tokens(
+                    width, capture_height - step
+                )
+                # Once the crop is shorter than it is wide, cropping stops paying off
+                if cropped_tokens > tokens:
+                    break
+                capture_height -= step
+                tokens = cropped_tokens
+
+        fit = min(1.0, cls.MAX_SIZE / max(width, capture_height))
+        short_side = min(width, capture_height) * fit
+        scale = min(1.0, fit * cls.HIGH_DETAIL_TARGET_SHORT_SIDE / short_side)
+        return capture_height, scale
 
     def count_content(self, content: Union[str, List[Union[str, dict]]]) -> int:
         """Calculate tokens for message content"""
@@ -366,6 +398,7 @@ class LLM:
         system_msgs: Optional[List[Union[dict, Message]]] = None,
         stream: bool = True,
         temperature: Optional[float] = None,
+        output_sink: Optional[OutputSink] = None,
     ) -> str:
         """
         Send a prompt to the LLM and get the response.
@@ -375,6 +408,7 @@ class LLM:
             system_msgs: Optional system messages to prepend
             stream (bool): Whether to stream the response
             temperature (float): Sampling temperature for the response
+            output_sink: Where to stream tokens (defaults to the scoped sink)
 
         Returns:
             str: The generated response
@@ -442,15 +476,17 @@ class LLM:
 
             response = await self.client.chat.completions.create(**params, stream=True)
 
+            sink = resolve_sink(output_sink)
             collected_messages = []
             completion_text = ""
             async for chunk in response:
                 chunk_message = chunk.choices[0].delta.content or ""
                 collected_messages.append(chunk_message)
                 completion_text += chunk_message
-                print(chunk_message, end="", flush=True)
+                sink.write(chunk_message)
 
-            print()  # Newline after streaming
+            sink.write("\n")  # Newline after streaming
+            sink.flush()
             full_response = "".join(collected_messages).strip()
             if not full_response:
                 raise ValueError("Empty response from streaming LLM")
@@ -497,6 +533,7 @@ class LLM:
         system_msgs: Optional[List[Union[dict, Message]]] = None,
         stream: bool = False,
         temperature: Optional[float] = None,
+        output_sink: Optional[OutputSink] = None,
     ) -> str:
         """
         Send a prompt with images to the LLM and get the response.
@@ -507,6 +544,7 @@ class LLM:
             system_msgs: Optional system messages to prepend
             stream (bool): Whether to stream the response
             temperature (float): Sampling temperature for the response
+            output_sink: Where to stream tokens (defaults to the scoped sink)
 
         Returns:
             str: The generated response
@@ -607,13 +645,15 @@ class LLM:
             self.update_token_count(input_tokens)
             response = await self.client.chat.completions.create(**params)
 
+            sink = resolve_sink(output_sink)
             collected_messages = []
             async for chunk in response:
                 chunk_message = chunk.choices[0].delta.content or ""
                 collected_messages.append(chunk_message)
-                print(chunk_message, end="", flush=True)
+                sink.write(chunk_message)
 
-            print()  # Newline after streaming
+            sink.write("\n")  # Newline after streaming
+            sink.flush()
             full_response = "".join(collected_messages).strip()
 
             if not full_response:
@@ -647,13 +687,16 @@ class LLM:
         ),  # Don't retry TokenLimitExceeded
     )
 
-    async def stream_to_chatcompletion_with_tool(self, **params) -> ChatCompletionMessage:
+    async def stream_to_chatcompletion_with_tool(
+        self, output_sink: Optional[OutputSink] = None, **params
+    ) -> ChatCompletionMessage:
         """
-        调用带工具的流式接口，把每个 delta 实时打印
+        调用带工具的流式接口，把每个 delta 实时写入 output_sink
         并按增量更新 ChatCompletionMessage 结构，最后返回完整消息。
 
         返回类型: openai.types.chat.ChatCompletionMessage
         """
+        sink = resolve_sink(output_sink)
         response = await self.client.chat.completions.create(**params, stream=True)
 
         # 初始化一个 ChatCompletionMessage，默认 role 为 'assistant' 避免校验错误
@@ -679,7 +722,7 @@ class LLM:
             if delta.content:
                 if message.content is None:
                     message.content = ""
-                print(delta.content, end="", flush=True)
+                sink.write(delta.content)
                 message.content += delta.content
 
             # 更新 role（尽管一般是 'assistant'）
@@ -706,13 +749,13 @@ class LLM:
                     if tc.function:
                         if tc.function.name is not None:
                             entry.function.name = tc.function.name
-                            print(f"\nTool call name: {tc.function.name} with args:", end="", flush=True)
+                            sink.write(f"\nTool call name: {tc.function.name} with args:")
                         if tc.function.arguments is not None:
                             entry.function.arguments += tc.function.arguments
-                            print(tc.function.arguments, end="", flush=True)
+                            sink.write(tc.function.arguments)
 
-        print() # 确保最后有一个换行
-        print() # 确保最后有一个换行
+        sink.write("\n\n")  # 确保最后有一个换行
+        sink.flush()
         return message
 
     async def ask_tool(
@@ -724,6 +767,7 @@ class LLM:
         tool_choice: TOOL_CHOICE_TYPE = ToolChoice.AUTO,  # type: ignore
         stream = True,
         temperature: Optional[float] = None,
+        output_sink: Optional[OutputSink] = None,
         **kwargs,
     ) -> ChatCompletionMessage | None:
         """
@@ -736,6 +780,7 @@ class LLM:
             tools: List of tools to use
             tool_choice: Tool choice strategy
             temperature: Sampling temperature for the response
+            output_sink: Where to stream tokens (defaults to the scoped sink)
             **kwargs: Additional completion arguments
 
         Returns:
@@ -807,7 +852,9 @@ class LLM:
                 )
             
             if stream:
-                return await self.stream_to_chatcompletion_with_tool(**params)
+                return await self.stream_to_chatcompletion_with_tool(
+                    output_sink, **params
+                )
 
             params["stream"] = False  # Always use non-streaming for tool requests
             response: ChatCompletion = await self.client.chat.completions.create(
@@ -816,7 +863,7 @@ class LLM:
 
             # Check if response is valid
             if not response.choices or not response.choices[0].message:
-                print(response)
+                logger.error(f"Invalid or empty response from LLM: {response}")
                 # raise ValueError("Invalid or empty response from LLM")
                 return None
 
@@ -1,33 +1,165 @@
 import sys
+import time
+from collections import defaultdict
 from datetime import datetime
+from typing import Dict, Optional, Tuple
 
 from loguru import logger as _logger
 
-from app.config import PROJECT_ROOT
+from app.config import PROJECT_ROOT, LogSettings, config
 
 
 _print_level = "INFO"
+_settings = LogSettings()
 
 
-def define_log_level(print_level="INFO", logfile_level="DEBUG", name: str = None):
-    """Adjust the log level to above level"""
-    global _print_level
+class _FieldCap:
+    """Patcher truncating the message and extra fields of every record.
+
+    Runs before the record is formatted or queued, so multi-KB tool
+    results cost a bounded amount whatever sinks are configured.
+    """
+
+    def __init__(self, max_chars: int):
+        self.max_chars = max_chars
+
+    def _cap(self, value: str) -> str:
+        if len(value) <= self.max_chars:
+            return value
+        return f"{value[:self.max_chars]}... [{len(value) - self.max_chars} chars truncated]"
+
+    def __call__(self, record) -> None:
+        if not self.max_chars:
+            return
+        record["message"] = self._cap(record["message"])
+        extra = record["extra"]
+        for key, value in extra.items():
+            if isinstance(value, str):
+                extra[key] = self._cap(value)
+
+
+class _HotLogger:
+    """Logger for per-step messages carrying large payloads (tool results, thoughts).
+
+    Each call site keeps 1 in `hot_sample_rate` of its records below WARNING
+    (settings of the last `define_log_level` call).
+    The decision is made once per call, before anything is formatted, so a
+    skipped record costs a counter update and every sink sees the same
+    records. String arguments are capped at `max_field_chars` before they
+    are formatted into the message.
+    """
+
+    _LEVELS = {"debug": 10, "info": 20, "success": 25, "warning": 30, "error": 40}
+
+    def __init__(self, logger):
+        # depth=2 attributes records to the caller, not to _log
+        self._logger = logger.opt(depth=2).bind(hot=True)
+        self._counts: Dict[Tuple[str, int], int] = defaultdict(int)
+
+    def _cap(self, value):
+        max_chars = _settings.max_field_chars
+        if not max_chars or not isinstance(value, str) or len(value) <= max_chars:
+            return value
+        return f"{value[:max_chars]}... [{len(value) - max_chars} chars truncated]"
+
+    def _log(self, level: str, message: str, args: tuple, kwargs: dict) -> None:
+        rate = _settings.hot_sample_rate
+        if rate > 1 and self._LEVELS[level] < 30:
+            caller = sys._getframe(2)
+            key = (caller.f_globals.get("__name__", ""), caller.f_lineno)
+            count = self._counts[key]
+            self._counts[key] = count + 1
+            if count % rate:
+                return
+        getattr(self._logger, level)(
+            message,
+            *(self._cap(arg) for arg in args),
+            **{name: self._cap(value) for name, value in kwargs.items()},
+        )
+
+    def debug(self, message: str, *args, **kwargs) -> None:
+        self._log("debug", message, args, kwargs)
+
+    def info(self, message: str, *args, **kwargs) -> None:
+        self._log("info", message, args, kwargs)
+
+    def success(self, message: str, *args, **kwargs) -> None:
+        self._log("success", message, args, kwargs)
+
+    def warning(self, message: str, *args, **kwargs) -> None:
+        self._log("warning", message, args, kwargs)
+
+    def error(self, message: str, *args, **kwargs) -> None:
+        self._log("error", message, args, kwargs)
+
+
+class _Rotation:
+    """Rotates a log file once it exceeds a size or an age, whichever is first."""
+
+    def __init__(self, max_bytes: int, interval: float):
+        self.max_bytes = max_bytes
+        self.interval = interval
+        self._opened = time.monotonic()
+
+    def __call__(self, message, file) -> bool:
+        now = time.monotonic()
+        if (self.max_bytes and file.tell() + len(message) > self.max_bytes) or (
+            self.interval and now - self._opened >= self.interval
+        ):
+            self._opened = now
+            return True
+        return False
+
+
+def define_log_level(
+    print_level="INFO",
+    logfile_level="DEBUG",
+    name: str = None,
+    settings: Optional[LogSettings] = None,
+):
+    """Adjust the log level to above level
+
+    Log files are written from a background thread (`enqueue`), as JSONL
+    records by default, with messages capped, hot-path calls sampled (see
+    `hot_logger`) and files rotated as configured in the [log] section.
+    """
+    global _print_level, _settings
     _print_level = print_level
+    settings = settings or LogSettings()
+    _settings = settings
 
     current_date = datetime.now()
     formatted_date = current_date.strftime("%Y%m%d%H%M%S")
     log_name = (
         f"{name}_{formatted_date}" if name else formatted_date
     )  # name a log with prefix name
+    serialize = settings.format == "jsonl"
+    suffix = "jsonl" if serialize else "log"
 
     _logger.remove()
+    _logger.configure(patcher=_FieldCap(settings.max_field_chars))
     _logger.add(sys.stderr, level=print_level)
-    _logger.add(PROJECT_ROOT / f"logs/{log_name}.log", level=logfile_level)
+    _logger.add(
+        PROJECT_ROOT / f"logs/{log_name}.{suffix}",
+        level=logfile_level,
+        serialize=serialize,
+        enqueue=settings.enqueue,
+        rotation=_Rotation(settings.rotation_bytes, settings.rotation_interval),
+        retention=settings.retention,
+    )
     return _logger
 
 
 # logger = define_log_level(print_level="INFO")
-logger = define_log_level(print_level="ERROR")
+logger = define_log_level(
+    print_level=config.log_config.console_level,
+    logfile_level=config.log_config.file_level,
+    settings=config.log_config,
+)
+
+# For per-step messages carrying large payloads (tool results, thoughts):
+# pass the payload as a `{}` argument so it is capped before formatting
+hot_logger = _HotLogger(logger)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,163 @@
+import asyncio
+import sys
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Iterator, Optional, TextIO
+
+
+class OutputSink:
+    """Destination for streamed LLM tokens and agent progress banners.
+
+    LLM streaming and agents write through a sink instead of `print()`, so
+    where that output goes (nowhere, the console, a per-session file, an
+    async subscriber) is chosen per agent or per process. This base class
+    discards everything.
+    """
+
+    def write(self, text: str) -> None:
+        """Queue text for output; must not block on I/O."""
+
+    def flush(self) -> None:
+        """Emit any buffered text."""
+
+    def close(self) -> None:
+        """Flush and release the sink's resources."""
+        self.flush()
+
+
+class NullSink(OutputSink):
+    """Discards all output; for batch runs with no console I/O."""
+
+
+class ConsoleSink(OutputSink):
+    """Writes to the console, buffered so streaming is not a write per token.
+
+    Text is written out at each line break or once `buffer_chars` pile up,
+    which keeps streaming live while cutting the number of blocking writes.
+    """
+
+    def __init__(self, stream: Optional[TextIO] = None, buffer_chars: int = 80):
+        self.stream = stream
+        self.buffer_chars = buffer_chars
+        self._buffer = []
+        self._size = 0
+
+    def write(self, text: str) -> None:
+        if not text:
+            return
+        self._buffer.append(text)
+        self._size += len(text)
+        if self._size >= self.buffer_chars or "\n" in text:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._buffer:
+            return
+        # Resolved at write time so redirected stdout is honored
+        stream = self.stream or sys.stdout
+        stream.write("".join(self._buffer))
+        stream.flush()
+        self._buffer.clear()
+        self._size = 0
+
+
+class FileSink(OutputSink):
+    """Appends output to a per-session transcript file.
+
+    The file is opened on first write and written through Python's own
+    buffer, so tokens reach the disk in blocks rather than one by one.
+    """
+
+    def __init__(self, path: str, encoding: str = "utf-8"):
+        self.path = path
+        self.encoding = encoding
+        self._file: Optional[TextIO] = None
+
+    def write(self, text: str) -> None:
+        if self._file is None:
+            self._file = open(self.path, "a", encoding=self.encoding)
+        self._file.write(text)
+
+    def flush(self) -> None:
+        if self._file is not None:
+            self._file.flush()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class QueueSink(OutputSink):
+    """Publishes output to an asyncio queue for an async subscriber.
+
+    `write` never waits: when the subscriber falls behind by `maxsize`
+    chunks, the oldest chunk is dropped.
+    """
+
+    def __init__(self, maxsize: int = 1000):
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def write(self, text: str) -> None:
+        if text:
+            self._put(text)
+
+    def close(self) -> None:
+        self._put(None)
+
+    def _put(self, item: Optional[str]) -> None:
+        if self._queue.full():
+            self._queue.get_nowait()
+            self.dropped += 1
+        self._queue.put_nowait(item)
+
+    async def subscribe(self) -> AsyncIterator[str]:
+        """Yields output chunks until the sink is closed."""
+        while True:
+            text = await self._queue.get()
+            if text is None:
+                return
+            yield text
+
+
+_default_sink: OutputSink = ConsoleSink()
+
+# Per-task fallback sink; LLM instances are shared, so they cannot hold one
+_scoped_sink: ContextVar[Optional[OutputSink]] = ContextVar(
+    "output_sink", default=None
+)
+
+
+def get_default_sink() -> OutputSink:
+    """Return the sink used when neither the caller nor the scope sets one."""
+    return _default_sink
+
+
+@contextmanager
+def use_sink(sink: OutputSink) -> Iterator[OutputSink]:
+    """Route output without an explicit sink to `sink` in the current task.
+
+    Tasks started inside the block inherit the sink; concurrent tasks
+    outside it are unaffected.
+    """
+    token = _scoped_sink.set(sink)
+    try:
+        yield sink
+    finally:
+        _scoped_sink.reset(token)
+
+
+def set_default_sink(sink: OutputSink) -> None:
+    """Replace the process-wide default sink, e.g. with NullSink for batch runs."""
+    global _default_sink
+    _default_sink.flush()
+    _default_sink = sink
+
+
+def resolve_sink(*sinks: Optional[OutputSink]) -> OutputSink:
+    """Return the first sink that is set, else the scoped or default sink."""
+    for sink in sinks:
+        if sink is not None:
+            return sink
+    return _scoped_sink.get() or _default_sink
@@ -3,28 +3,64 @@ Docker Sandbox Module
 
 Provides secure containerized execution environment with resource limits
 and isolation for running untrusted code.
+
+Exports are imported on first access, so using the sandbox client does not
+import the Docker SDK unless the Docker backend is actually used.
 """
-from app.sandbox.client import (
-    BaseSandboxClient,
-    LocalSandboxClient,
-    create_sandbox_client,
-)
-from app.sandbox.core.exceptions import (
-    SandboxError,
-    SandboxResourceError,
-    SandboxTimeoutError,
-)
-from app.sandbox.core.manager import SandboxManager
-from app.sandbox.core.sandbox import DockerSandbox
+from typing import TYPE_CHECKING
+
+from app.utils.lazy import lazy_module
+
+
+if TYPE_CHECKING:
+    from app.sandbox.client import (
+        BaseSandboxClient,
+        LocalSandboxClient,
+        ProcessSandboxClient,
+        create_sandbox_client,
+        get_sandbox_client,
+        sandbox_session,
+    )
+    from app.sandbox.core.exceptions import (
+        SandboxError,
+        SandboxResourceError,
+        SandboxTimeoutError,
+    )
+    from app.sandbox.core.manager import SandboxManager
+    from app.sandbox.core.process import ProcessSandbox
+    from app.sandbox.core.sandbox import DockerSandbox
+
+
+_LAZY_IMPORTS = {
+    "DockerSandbox": "app.sandbox.core.sandbox",
+    "ProcessSandbox": "app.sandbox.core.process",
+    "SandboxManager": "app.sandbox.core.manager",
+    "BaseSandboxClient": "app.sandbox.client",
+    "LocalSandboxClient": "app.sandbox.client",
+    "ProcessSandboxClient": "app.sandbox.client",
+    "create_sandbox_client": "app.sandbox.client",
+    "get_sandbox_client": "app.sandbox.client",
+    "sandbox_session": "app.sandbox.client",
+    "SandboxError": "app.sandbox.core.exceptions",
+    "SandboxTimeoutError": "app.sandbox.core.exceptions",
+    "SandboxResourceError": "app.sandbox.core.exceptions",
+}
 
 
 __all__ = [
     "DockerSandbox",
+    "ProcessSandbox",
     "SandboxManager",
     "BaseSandboxClient",
     "LocalSandboxClient",
+    "ProcessSandboxClient",
     "create_sandbox_client",
+    "get_sandbox_client",
+    "sandbox_session",
     "SandboxError",
     "SandboxTimeoutError",
     "SandboxResourceError",
 ]
+
+
+__getattr__, __dir__ = lazy_module(__name__, _LAZY_IMPORTS)
@@ -1,8 +1,25 @@
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Dict, Optional, Protocol
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Dict,
+    Iterator,
+    Optional,
+    Protocol,
+)
 
-from app.config import SandboxSettings
-from app.sandbox.core.sandbox import DockerSandbox
+from app.config import SandboxSettings, config
+from app.logger import logger
+
+
+if TYPE_CHECKING:
+    from app.sandbox.core.manager import SandboxManager
+    from app.sandbox.core.process import ProcessSandbox
+    from app.sandbox.core.sandbox import DockerSandbox
 
 
 class SandboxFileOperations(Protocol):
@@ -48,7 +65,92 @@ class SandboxFileOperations(Protocol):
 
 
 class BaseSandboxClient(ABC):
-    """Base sandbox client interface."""
+    """Base sandbox client interface.
+
+    Each sandbox session (see `sandbox_session`) has its own client, whose
+    sandbox lifetime is reference counted. Agent runs, flows and games of
+    the session hold a lease while they need the sandbox; it is cleaned up
+    once the last lease is released, or `idle_timeout` seconds later if
+    that is set, and at the latest when the event loop shuts down.
+    """
+
+    def __init__(self, idle_timeout: float = 0):
+        """Initializes lease tracking.
+
+        Args:
+            idle_timeout: Seconds to keep the sandbox alive after the last
+                lease is released. 0 cleans up immediately.
+        """
+        self.idle_timeout = idle_timeout
+        self.session_id: Optional[str] = None
+        self._leases = 0
+        self._idle_task: Optional[asyncio.Task] = None
+
+    @asynccontextmanager
+    async def lease(self) -> AsyncIterator["BaseSandboxClient"]:
+        """Holds the sandbox alive for the duration of the context.
+
+        Nested leases (e.g. an agent run started from another agent's tool
+        call) share the same sandbox instead of tearing it down on exit.
+
+        Yields:
+            The sandbox client.
+        """
+        self._leases += 1
+        self._cancel_idle_cleanup()
+        try:
+            yield self
+        finally:
+            self._leases -= 1
+            if self._leases == 0:
+                await self._release_idle()
+
+    @property
+    def active_leases(self) -> int:
+        """Number of leases currently held."""
+        return self._leases
+
+    async def _release_idle(self) -> None:
+        """Cleans up now, or schedules cleanup after the idle timeout."""
+        if self.idle_timeout <= 0:
+            await self._cleanup_released()
+            return
+        self._idle_task = asyncio.create_task(self._cleanup_after_idle())
+
+    async def _cleanup_after_idle(self) -> None:
+        """Idle timer task: cleans up unless a lease is taken meanwhile.
+
+        A new lease clears `_idle_task` before cancelling the timer. Any
+        other cancellation comes from the event loop shutting down (e.g. the
+        end of `asyncio.run`), and the sandbox is cleaned up right away so
+        that it does not outlive the loop.
+        """
+        task = asyncio.current_task()
+        try:
+            await asyncio.sleep(self.idle_timeout)
+        except asyncio.CancelledError:
+            if self._idle_task is task:
+                self._idle_task = None
+                await self._cleanup_released()
+            raise
+        self._idle_task = None
+        logger.info("Sandbox idle timeout reached, cleaning up")
+        await self._cleanup_released()
+
+    async def _cleanup_released(self) -> None:
+        """Cleans up after the last lease, logging errors instead of raising."""
+        try:
+            await self.cleanup()
+        except Exception as e:
+            logger.error(f"Error cleaning up sandbox: {e}")
+        if self._leases == 0:
+            _forget_sandbox_client(self)
+
+    def _cancel_idle_cleanup(self) -> None:
+        """Cancels a pending idle cleanup."""
+        task, self._idle_task = self._idle_task, None
+        if task is not None:
+            task.cancel()
 
     @abstractmethod
     async def create(
@@ -84,11 +186,30 @@ class BaseSandboxClient(ABC):
 
 
 class LocalSandboxClient(BaseSandboxClient):
-    """Local sandbox client implementation."""
+    """Local sandbox client implementation.
+
+    With a warm pool configured, sandboxes are leased from the shared
+    SandboxManager and handed back to its pool on cleanup. The client holds
+    its sandbox with the manager until then, so the manager's idle cleanup
+    does not reclaim it between calls.
+    """
 
-    def __init__(self):
-        """Initializes local sandbox client."""
-        self.sandbox: Optional[DockerSandbox] = None
+    def __init__(self, idle_timeout: float = 0, warm_pool_size: int = 0):
+        """Initializes local sandbox client.
+
+        Args:
+            idle_timeout: Seconds to keep the sandbox alive after the last
+                lease is released.
+            warm_pool_size: Pre-created sandboxes kept ready per profile
+                (0 creates every sandbox on demand).
+        """
+        super().__init__(idle_timeout)
+        self.warm_pool_size = warm_pool_size
+        self.sandbox: Optional["DockerSandbox"] = None
+        self._manager: Optional["SandboxManager"] = None
+        self._sandbox_id: Optional[str] = None
+        self._config: Optional[SandboxSettings] = None
+        self._lease_lock = asyncio.Lock()
 
     async def create(
         self,
@@ -104,9 +225,55 @@ class LocalSandboxClient(BaseSandboxClient):
         Raises:
             RuntimeError: If sandbox creation fails.
         """
+        if self.warm_pool_size > 0 and not volume_bindings:
+            # Imported here so the docker SDK only loads when a sandbox is created
+            from app.sandbox.core.manager import get_sandbox_manager
+
+            self._manager = get_sandbox_manager(self.warm_pool_size)
+            self._config = config
+            await self._lease_from_manager()
+            return
+
+        from app.sandbox.core.sandbox import DockerSandbox
+
         self.sandbox = DockerSandbox(config, volume_bindings)
         await self.sandbox.create()
 
+    async def _lease_from_manager(self) -> None:
+        """Leases a sandbox from the manager and holds it for this client."""
+        self._sandbox_id = await self._manager.create_sandbox(self._config)
+        self._manager.hold_sandbox(self._sandbox_id)
+        self.sandbox = await self._manager.get_sandbox(self._sandbox_id)
+
+    @asynccontextmanager
+    async def _use(self) -> AsyncIterator[Any]:
+        """Yields the sandbox, marked in use with the manager when pooled.
+
+        A pooled sandbox the manager no longer has (e.g. it was deleted
+        while the manager was shutting down or after its container died)
+        is replaced by a fresh one from the same profile. Files written to
+        the old sandbox are lost in that case.
+
+        Raises:
+            RuntimeError: If sandbox not initialized, or a replacement
+                sandbox cannot be created.
+        """
+        if not self.sandbox:
+            raise RuntimeError("Sandbox not initialized")
+        if self._manager is None:
+            yield self.sandbox
+            return
+        async with self._lease_lock:
+            if not self._manager.has_sandbox(self._sandbox_id):
+                logger.warning(
+                    f"Sandbox {self._sandbox_id} was reclaimed by the sandbox "
+                    "manager, leasing a new one"
+                )
+                self.sandbox = None
+                await self._lease_from_manager()
+        async with self._manager.sandbox_operation(self._sandbox_id) as sandbox:
+            yield sandbox
+
     async def run_command(self, command: str, timeout: Optional[int] = None) -> str:
         """Runs command in sandbox.
 
@@ -120,9 +287,8 @@ class LocalSandboxClient(BaseSandboxClient):
         Raises:
             RuntimeError: If sandbox not initialized.
         """
-        if not self.sandbox:
-            raise RuntimeError("Sandbox not initialized")
-        return await self.sandbox.run_command(command, timeout)
+        async with self._use() as sandbox:
+            return await sandbox.run_command(command, timeout)
 
     async def copy_from(self, container_path: str, local_path: str) -> None:
         """Copies file from container to local.
@@ -134,9 +300,8 @@ class LocalSandboxClient(BaseSandboxClient):
         Raises:
             RuntimeError: If sandbox not initialized.
         """
-        if not self.sandbox:
-            raise RuntimeError("Sandbox not initialized")
-        await self.sandbox.copy_from(container_path, local_path)
+        async with self._use() as sandbox:
+            await sandbox.copy_from(container_path, local_path)
 
     async def copy_to(self, local_path: str, container_path: str) -> None:
         """Copies file from local to container.
@@ -148,9 +313,8 @@ class LocalSandboxClient(BaseSandboxClient):
         Raises:
             RuntimeError: If sandbox not initialized.
         """
-        if not self.sandbox:
-            raise RuntimeError("Sandbox not initialized")
-        await self.sandbox.copy_to(local_path, container_path)
+        async with self._use() as sandbox:
+            await sandbox.copy_to(local_path, container_path)
 
     async def read_file(self, path: str) -> str:
         """Reads file from container.
@@ -164,9 +328,8 @@ class LocalSandboxClient(BaseSandboxClient):
         Raises:
             RuntimeError: If sandbox not initialized.
         """
-        if not self.sandbox:
-            raise RuntimeError("Sandbox not initialized")
-        return await self.sandbox.read_file(path)
+        async with self._use() as sandbox:
+            return await sandbox.read_file(path)
 
     async def write_file(self, path: str, content: str) -> None:
         """Writes file to container.
@@ -178,24 +341,137 @@ class LocalSandboxClient(BaseSandboxClient):
         Raises:
             RuntimeError: If sandbox not initialized.
         """
-        if not self.sandbox:
-            raise RuntimeError("Sandbox not initialized")
-        await self.sandbox.write_file(path, content)
+        async with self._use() as sandbox:
+            await sandbox.write_file(path, content)
 
     async def cleanup(self) -> None:
-        """Cleans up resources."""
+        """Cleans up resources, returning a pooled sandbox to the pool."""
+        if self._manager is not None:
+            manager, sandbox_id = self._manager, self._sandbox_id
+            self._manager = self._sandbox_id = self.sandbox = self._config = None
+            await manager.release_sandbox(sandbox_id)
+            return
         if self.sandbox:
             await self.sandbox.cleanup()
             self.sandbox = None
 
 
-def create_sandbox_client() -> LocalSandboxClient:
-    """Creates a sandbox client.
+class ProcessSandboxClient(LocalSandboxClient):
+    """Sandbox client backed by local subprocesses instead of docker.
+
+    Intended for trusted workloads and hosts without a docker daemon.
+    """
+
+    def __init__(self, idle_timeout: float = 0):
+        """Initializes process sandbox client.
+
+        Args:
+            idle_timeout: Seconds to keep the sandbox alive after the last
+                lease is released.
+        """
+        super().__init__(idle_timeout)
+        self.sandbox: Optional["ProcessSandbox"] = None
+
+    async def create(
+        self,
+        config: Optional[SandboxSettings] = None,
+        volume_bindings: Optional[Dict[str, str]] = None,
+    ) -> None:
+        """Creates a sandbox.
+
+        Args:
+            config: Sandbox configuration.
+            volume_bindings: Volume mappings.
+        """
+        from app.sandbox.core.process import ProcessSandbox
+
+        self.sandbox = ProcessSandbox(config, volume_bindings)
+        await self.sandbox.create()
+
+
+def create_sandbox_client() -> BaseSandboxClient:
+    """Creates a sandbox client for the configured backend.
 
     Returns:
-        LocalSandboxClient: Sandbox client instance.
+        BaseSandboxClient: Sandbox client instance.
+
+    Raises:
+        ValueError: If the configured backend is unknown.
     """
-    return LocalSandboxClient()
+    settings = config.sandbox
+    if settings.backend == "docker":
+        return LocalSandboxClient(
+            idle_timeout=settings.idle_timeout,
+            warm_pool_size=settings.warm_pool_size,
+        )
+    if settings.backend == "process":
+        return ProcessSandboxClient(idle_timeout=settings.idle_timeout)
+    raise ValueError(f"Unknown sandbox backend: {settings.backend}")
+
+
+DEFAULT_SESSION = "default"
+
+_current_session: ContextVar[Optional[str]] = ContextVar(
+    "sandbox_session", default=None
+)
+_sandbox_clients: Dict[str, BaseSandboxClient] = {}
+
+
+@contextmanager
+def sandbox_session(session_id: str) -> Iterator[str]:
+    """Scopes `get_sandbox_client()` to a session's own sandbox.
+
+    Applies to the current context and to tasks started from it, so every
+    agent run of a game or flow leases the same, session-specific sandbox.
 
+    Args:
+        session_id: Session key, e.g. a game or plan ID.
 
-SANDBOX_CLIENT = create_sandbox_client()
+    Yields:
+        The session ID.
+    """
+    token = _current_session.set(session_id)
+    try:
+        yield session_id
+    finally:
+        _current_session.reset(token)
+
+
+def current_sandbox_session() -> Optional[str]:
+    """Returns the session set by the enclosing `sandbox_session`, if any."""
+    return _current_session.get()
+
+
+def get_sandbox_client(session_id: Optional[str] = None) -> BaseSandboxClient:
+    """Returns the sandbox client of a session, creating it on first use.
+
+    Args:
+        session_id: Session key. Defaults to the enclosing `sandbox_session`,
+            or the shared default session outside of one.
+
+    Returns:
+        BaseSandboxClient: The session's sandbox client.
+    """
+    session_id = session_id or _current_session.get() or DEFAULT_SESSION
+    client = _sandbox_clients.get(session_id)
+    if client is None:
+        client = create_sandbox_client()
+        client.session_id = session_id
+        _sandbox_clients[session_id] = client
+    return client
+
+
+def _forget_sandbox_client(client: BaseSandboxClient) -> None:
+    """Drops a non-default session's client once its sandbox is cleaned up."""
+    if (
+        client.session_id != DEFAULT_SESSION
+        and _sandbox_clients.get(client.session_id) is client
+    ):
+        del _sandbox_clients[client.session_id]
+
+
+def __getattr__(name: str):
+    # SANDBOX_CLIENT is kept for compatibility; it is created on first access
+    if name == "SANDBOX_CLIENT":
+        return get_sandbox_client()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
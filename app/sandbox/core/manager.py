@@ -1,7 +1,8 @@
 import asyncio
 import uuid
+from collections import deque
 from contextlib import asynccontextmanager
-from typing import Dict, Optional, Set
+from typing import Deque, Dict, Optional, Set
 
 import docker
 from docker.errors import APIError, ImageNotFound
@@ -18,12 +19,20 @@ class SandboxManager:
     monitoring, and cleanup. Provides concurrent access control and automatic
     cleanup mechanisms for sandbox resources.
 
+    Sandboxes without custom volume bindings can be served from a warm pool
+    of pre-created containers, kept per image and SandboxSettings profile and
+    refilled in the background. Pooled containers count against
+    `max_sandboxes` and are health-checked before being leased and on every
+    cleanup pass.
+
     Attributes:
         max_sandboxes: Maximum allowed number of sandboxes.
         idle_timeout: Sandbox idle timeout in seconds.
         cleanup_interval: Cleanup check interval in seconds.
+        warm_pool_size: Default number of pre-created sandboxes per profile.
         _sandboxes: Active sandbox instance mapping.
         _last_used: Last used time record for sandboxes.
+        _warm_pools: Pre-created sandboxes ready to be leased, per profile.
     """
 
     def __init__(
@@ -31,6 +40,7 @@ class SandboxManager:
         max_sandboxes: int = 100,
         idle_timeout: int = 3600,
         cleanup_interval: int = 300,
+        warm_pool_size: int = 0,
     ):
         """Initializes sandbox manager.
 
@@ -38,10 +48,13 @@ class SandboxManager:
             max_sandboxes: Maximum sandbox count limit.
             idle_timeout: Idle timeout in seconds.
             cleanup_interval: Cleanup check interval in seconds.
+            warm_pool_size: Default warm pool size per profile (0 disables
+                pooling unless a profile is warmed explicitly).
         """
         self.max_sandboxes = max_sandboxes
         self.idle_timeout = idle_timeout
         self.cleanup_interval = cleanup_interval
+        self.warm_pool_size = warm_pool_size
 
         # Docker client
         self._client = docker.from_env()
@@ -54,6 +67,18 @@ class SandboxManager:
         self._locks: Dict[str, asyncio.Lock] = {}
         self._global_lock = asyncio.Lock()
         self._active_operations: Set[str] = set()
+        self._held: Set[str] = set()
+
+        # Warm pool, keyed by sandbox profile
+        self._warm_pools: Dict[str, Deque[DockerSandbox]] = {}
+        self._pool_configs: Dict[str, SandboxSettings] = {}
+        self._pool_sizes: Dict[str, int] = {}
+        self._refill_tasks: Dict[str, asyncio.Task] = {}
+        self._sandbox_profiles: Dict[str, str] = {}
+        self._pool_hits = 0
+        self._pool_misses = 0
+        self._pool_recycled = 0
+        self._creating = 0
 
         # Cleanup task
         self._cleanup_task: Optional[asyncio.Task] = None
@@ -118,6 +143,10 @@ class SandboxManager:
     ) -> str:
         """Creates a new sandbox instance.
 
+        A pre-created sandbox is leased from the warm pool when one is
+        available for the requested profile; otherwise a new container is
+        created on demand.
+
         Args:
             config: Sandbox configuration.
             volume_bindings: Volume mapping configuration.
@@ -129,23 +158,35 @@ class SandboxManager:
             RuntimeError: If max sandbox count reached or creation fails.
         """
         async with self._global_lock:
-            if len(self._sandboxes) >= self.max_sandboxes:
+            config = config or SandboxSettings()
+            profile = None if volume_bindings else self._profile_key(config)
+
+            sandbox_id = str(uuid.uuid4())
+            if profile is not None:
+                sandbox = await self._lease_pooled(profile, config)
+                if sandbox is not None:
+                    self._register(sandbox_id, sandbox, profile)
+                    logger.info(f"Leased pooled sandbox {sandbox_id}")
+                    return sandbox_id
+
+            # Pooled containers count too; one is given up to make room
+            if (
+                self._total_sandboxes() >= self.max_sandboxes
+                and not await self._evict_pooled()
+            ):
                 raise RuntimeError(
                     f"Maximum number of sandboxes ({self.max_sandboxes}) reached"
                 )
 
-            config = config or SandboxSettings()
             if not await self.ensure_image(config.image):
                 raise RuntimeError(f"Failed to ensure Docker image: {config.image}")
 
-            sandbox_id = str(uuid.uuid4())
+            self._creating += 1
             try:
                 sandbox = DockerSandbox(config, volume_bindings)
                 await sandbox.create()
 
-                self._sandboxes[sandbox_id] = sandbox
-                self._last_used[sandbox_id] = asyncio.get_event_loop().time()
-                self._locks[sandbox_id] = asyncio.Lock()
+                self._register(sandbox_id, sandbox, profile)
 
                 logger.info(f"Created sandbox {sandbox_id}")
                 return sandbox_id
@@ -155,6 +196,287 @@ class SandboxManager:
                 if sandbox_id in self._sandboxes:
                     await self.delete_sandbox(sandbox_id)
                 raise RuntimeError(f"Failed to create sandbox: {e}")
+            finally:
+                self._creating -= 1
+
+    def has_sandbox(self, sandbox_id: str) -> bool:
+        """Checks whether a sandbox is still leased out under the given ID.
+
+        Args:
+            sandbox_id: Sandbox ID.
+
+        Returns:
+            bool: False once the sandbox was released, deleted or reclaimed.
+        """
+        return sandbox_id in self._sandboxes
+
+    def hold_sandbox(self, sandbox_id: str) -> None:
+        """Keeps a sandbox from being reclaimed while idle.
+
+        Session clients hold their sandbox for as long as they have a lease
+        on it; they release it themselves once the last lease is gone.
+
+        Args:
+            sandbox_id: Sandbox ID.
+        """
+        if sandbox_id in self._sandboxes:
+            self._held.add(sandbox_id)
+
+    def unhold_sandbox(self, sandbox_id: str) -> None:
+        """Lets idle cleanup reclaim a sandbox again.
+
+        Args:
+            sandbox_id: Sandbox ID.
+        """
+        self._held.discard(sandbox_id)
+
+    def _total_sandboxes(self) -> int:
+        """Counts active, pooled and in-creation sandboxes.
+
+        Returns:
+            int: Number of containers held against `max_sandboxes`.
+        """
+        pooled = sum(len(pool) for pool in self._warm_pools.values())
+        return len(self._sandboxes) + pooled + self._creating
+
+    async def _evict_pooled(self) -> bool:
+        """Deletes one pooled sandbox to free room for another profile.
+
+        Returns:
+            bool: Whether a pooled sandbox was deleted.
+        """
+        for pool in self._warm_pools.values():
+            if pool:
+                await pool.pop().cleanup()
+                return True
+        return False
+
+    def _register(
+        self, sandbox_id: str, sandbox: DockerSandbox, profile: Optional[str]
+    ) -> None:
+        """Records a sandbox as active under the given ID.
+
+        Args:
+            sandbox_id: Sandbox ID.
+            sandbox: Sandbox instance.
+            profile: Warm pool profile key, or None if not poolable.
+        """
+        self._sandboxes[sandbox_id] = sandbox
+        self._last_used[sandbox_id] = asyncio.get_event_loop().time()
+        self._locks[sandbox_id] = asyncio.Lock()
+        if profile is not None:
+            self._sandbox_profiles[sandbox_id] = profile
+
+    @staticmethod
+    def _profile_key(config: SandboxSettings) -> str:
+        """Builds the warm pool key for a sandbox configuration.
+
+        Args:
+            config: Sandbox configuration.
+
+        Returns:
+            str: Key identifying sandboxes that are interchangeable.
+        """
+        return config.model_dump_json()
+
+    async def _lease_pooled(
+        self, profile: str, config: SandboxSettings
+    ) -> Optional[DockerSandbox]:
+        """Takes a healthy pre-created sandbox from the warm pool.
+
+        Pooled sandboxes whose container stopped are deleted on the way.
+        Records a hit or miss and schedules a background refill.
+
+        Args:
+            profile: Warm pool profile key.
+            config: Sandbox configuration of the profile.
+
+        Returns:
+            Optional[DockerSandbox]: Pooled sandbox, or None on a miss.
+        """
+        if profile not in self._pool_sizes:
+            if self.warm_pool_size <= 0:
+                return None
+            self._add_profile(profile, config, self.warm_pool_size)
+
+        pool = self._warm_pools[profile]
+        sandbox = None
+        while pool and sandbox is None:
+            candidate = pool.popleft()
+            if await candidate.is_healthy():
+                sandbox = candidate
+            else:
+                logger.warning("Dropping unhealthy pooled sandbox")
+                await candidate.cleanup()
+        if sandbox is None:
+            self._pool_misses += 1
+        else:
+            self._pool_hits += 1
+        self._schedule_refill(profile)
+        return sandbox
+
+    def _add_profile(self, profile: str, config: SandboxSettings, size: int) -> None:
+        """Registers a warm pool profile.
+
+        Args:
+            profile: Warm pool profile key.
+            config: Sandbox configuration of the profile.
+            size: Number of sandboxes to keep ready.
+        """
+        self._pool_configs[profile] = config
+        self._pool_sizes[profile] = size
+        self._warm_pools.setdefault(profile, deque())
+
+    async def warm_pool(
+        self, config: Optional[SandboxSettings] = None, size: Optional[int] = None
+    ) -> None:
+        """Starts keeping pre-created sandboxes ready for a profile.
+
+        Refilling happens in the background; this call does not wait for
+        the containers to be created.
+
+        Args:
+            config: Sandbox configuration of the profile.
+            size: Pool size. Defaults to `warm_pool_size`.
+        """
+        config = config or SandboxSettings()
+        profile = self._profile_key(config)
+        self._add_profile(
+            profile, config, self.warm_pool_size if size is None else size
+        )
+        self._schedule_refill(profile)
+
+    def _schedule_refill(self, profile: str) -> None:
+        """Starts a refill task for a profile unless one is running.
+
+        Args:
+            profile: Warm pool profile key.
+        """
+        if self._is_shutting_down:
+            return
+        task = self._refill_tasks.get(profile)
+        if task is None or task.done():
+            self._refill_tasks[profile] = asyncio.create_task(
+                self._refill_pool(profile)
+            )
+
+    async def _refill_pool(self, profile: str) -> None:
+        """Creates sandboxes until the profile's pool is full.
+
+        Args:
+            profile: Warm pool profile key.
+        """
+        config = self._pool_configs[profile]
+        pool = self._warm_pools[profile]
+        try:
+            if not await self.ensure_image(config.image):
+                logger.error(f"Cannot refill warm pool, image missing: {config.image}")
+                return
+
+            while (
+                not self._is_shutting_down
+                and len(pool) < self._pool_sizes[profile]
+                and self._total_sandboxes() < self.max_sandboxes
+            ):
+                self._creating += 1
+                try:
+                    sandbox = DockerSandbox(config)
+                    await sandbox.create()
+                finally:
+                    self._creating -= 1
+                if self._is_shutting_down:
+                    await sandbox.cleanup()
+                    return
+                pool.append(sandbox)
+        except Exception as e:
+            logger.error(f"Error refilling warm pool: {e}")
+
+    async def release_sandbox(self, sandbox_id: str) -> None:
+        """Releases a leased sandbox back to the warm pool.
+
+        The working directory is reset before the sandbox is reused. Sandboxes
+        that cannot be pooled or reset are deleted instead.
+
+        Args:
+            sandbox_id: Sandbox ID.
+        """
+        self._held.discard(sandbox_id)
+        if sandbox_id not in self._sandboxes:
+            return
+
+        profile = self._sandbox_profiles.get(sandbox_id)
+        pool = self._warm_pools.get(profile) if profile is not None else None
+        if (
+            pool is None
+            or self._is_shutting_down
+            or len(pool) >= self._pool_sizes[profile]
+        ):
+            await self.delete_sandbox(sandbox_id)
+            return
+
+        async with self.sandbox_operation(sandbox_id) as sandbox:
+            try:
+                await sandbox.reset_workdir()
+            except Exception as e:
+                logger.warning(f"Failed to reset sandbox {sandbox_id}: {e}")
+                sandbox = None
+
+        if sandbox is None:
+            await self.delete_sandbox(sandbox_id)
+            return
+
+        async with self._global_lock:
+            self._sandboxes.pop(sandbox_id, None)
+            self._last_used.pop(sandbox_id, None)
+            self._locks.pop(sandbox_id, None)
+            self._sandbox_profiles.pop(sandbox_id, None)
+
+        # The pool may have been refilled while the workdir was being reset
+        if len(pool) >= self._pool_sizes[profile]:
+            await sandbox.cleanup()
+            return
+
+        pool.append(sandbox)
+        self._pool_recycled += 1
+        logger.info(f"Recycled sandbox {sandbox_id} into warm pool")
+
+    async def snapshot_sandbox(self, sandbox_id: str) -> str:
+        """Captures a sandbox's current state as its reset point.
+
+        Snapshotted sandboxes diverge from their pool profile and are
+        deleted rather than recycled when released.
+
+        Args:
+            sandbox_id: Sandbox ID.
+
+        Returns:
+            str: ID of the committed snapshot image.
+
+        Raises:
+            KeyError: If sandbox does not exist.
+            RuntimeError: If snapshot fails.
+        """
+        async with self.sandbox_operation(sandbox_id) as sandbox:
+            image = await sandbox.snapshot()
+        self._sandbox_profiles.pop(sandbox_id, None)
+        return image
+
+    async def reset_sandbox(self, sandbox_id: str, mode: str = "auto") -> str:
+        """Resets a sandbox to its last snapshot.
+
+        Args:
+            sandbox_id: Sandbox ID.
+            mode: Reset mode, see `DockerSandbox.restore_snapshot`.
+
+        Returns:
+            str: The reset mode that was used.
+
+        Raises:
+            KeyError: If sandbox does not exist.
+            RuntimeError: If the sandbox has no snapshot or reset fails.
+        """
+        async with self.sandbox_operation(sandbox_id) as sandbox:
+            return await sandbox.restore_snapshot(mode)
 
     async def get_sandbox(self, sandbox_id: str) -> DockerSandbox:
         """Gets a sandbox instance.
@@ -172,20 +494,55 @@ class SandboxManager:
             return sandbox
 
     def start_cleanup_task(self) -> None:
-        """Starts automatic cleanup task."""
+        """Starts automatic cleanup task.
+
+        The task also tears the manager down when it is cancelled by the
+        event loop shutting down (e.g. at the end of `asyncio.run`), so that
+        pooled containers do not outlive the process.
+        """
 
         async def cleanup_loop():
-            while not self._is_shutting_down:
-                try:
-                    await self._cleanup_idle_sandboxes()
-                except Exception as e:
-                    logger.error(f"Error in cleanup loop: {e}")
-                await asyncio.sleep(self.cleanup_interval)
+            try:
+                while not self._is_shutting_down:
+                    try:
+                        await self._cleanup_idle_sandboxes()
+                        await self._check_warm_pools()
+                    except Exception as e:
+                        logger.error(f"Error in cleanup loop: {e}")
+                    await asyncio.sleep(self.cleanup_interval)
+            except asyncio.CancelledError:
+                if not self._is_shutting_down:
+                    self._cleanup_task = None
+                    await self.cleanup()
+                raise
 
         self._cleanup_task = asyncio.create_task(cleanup_loop())
 
+    @property
+    def is_shutting_down(self) -> bool:
+        """Whether the manager has been (or is being) cleaned up."""
+        return self._is_shutting_down
+
+    async def _check_warm_pools(self) -> None:
+        """Deletes pooled sandboxes whose container stopped and refills."""
+        for profile, pool in list(self._warm_pools.items()):
+            dropped = False
+            for sandbox in list(pool):
+                if await sandbox.is_healthy() or sandbox not in pool:
+                    continue
+                pool.remove(sandbox)
+                dropped = True
+                logger.warning("Dropping unhealthy pooled sandbox")
+                await sandbox.cleanup()
+            if dropped:
+                self._schedule_refill(profile)
+
     async def _cleanup_idle_sandboxes(self) -> None:
-        """Cleans up idle sandboxes."""
+        """Releases idle sandboxes, back into the warm pool when poolable.
+
+        Sandboxes held by a session client are skipped: the client releases
+        them itself after its last lease.
+        """
         current_time = asyncio.get_event_loop().time()
         to_cleanup = []
 
@@ -193,13 +550,14 @@ class SandboxManager:
             for sandbox_id, last_used in self._last_used.items():
                 if (
                     sandbox_id not in self._active_operations
+                    and sandbox_id not in self._held
                     and current_time - last_used > self.idle_timeout
                 ):
                     to_cleanup.append(sandbox_id)
 
         for sandbox_id in to_cleanup:
             try:
-                await self.delete_sandbox(sandbox_id)
+                await self.release_sandbox(sandbox_id)
             except Exception as e:
                 logger.error(f"Error cleaning up sandbox {sandbox_id}: {e}")
 
@@ -216,15 +574,24 @@ class SandboxManager:
             except (asyncio.CancelledError, asyncio.TimeoutError):
                 pass
 
+        # Stop refilling warm pools
+        for task in self._refill_tasks.values():
+            task.cancel()
+        if self._refill_tasks:
+            await asyncio.gather(*self._refill_tasks.values(), return_exceptions=True)
+
         # Get all sandbox IDs to clean up
         async with self._global_lock:
             sandbox_ids = list(self._sandboxes.keys())
+            pooled = [sandbox for pool in self._warm_pools.values() for sandbox in pool]
 
         # Concurrently clean up all sandboxes
         cleanup_tasks = []
         for sandbox_id in sandbox_ids:
             task = asyncio.create_task(self._safe_delete_sandbox(sandbox_id))
             cleanup_tasks.append(task)
+        for sandbox in pooled:
+            cleanup_tasks.append(asyncio.create_task(sandbox.cleanup()))
 
         if cleanup_tasks:
             # Wait for all cleanup tasks to complete, with timeout to avoid infinite waiting
@@ -238,6 +605,10 @@ class SandboxManager:
         self._last_used.clear()
         self._locks.clear()
         self._active_operations.clear()
+        self._held.clear()
+        self._warm_pools.clear()
+        self._refill_tasks.clear()
+        self._sandbox_profiles.clear()
 
         logger.info("Manager cleanup completed")
 
@@ -271,6 +642,8 @@ class SandboxManager:
                     self._sandboxes.pop(sandbox_id, None)
                     self._last_used.pop(sandbox_id, None)
                     self._locks.pop(sandbox_id, None)
+                    self._sandbox_profiles.pop(sandbox_id, None)
+                    self._held.discard(sandbox_id)
                     logger.info(f"Deleted sandbox {sandbox_id}")
         except Exception as e:
             logger.error(f"Error during cleanup of sandbox {sandbox_id}: {e}")
@@ -303,11 +676,43 @@ class SandboxManager:
         Returns:
             Dict: Statistics information.
         """
+        pool_requests = self._pool_hits + self._pool_misses
         return {
             "total_sandboxes": len(self._sandboxes),
             "active_operations": len(self._active_operations),
+            "held_sandboxes": len(self._held),
             "max_sandboxes": self.max_sandboxes,
             "idle_timeout": self.idle_timeout,
             "cleanup_interval": self.cleanup_interval,
             "is_shutting_down": self._is_shutting_down,
+            "pooled_sandboxes": sum(len(pool) for pool in self._warm_pools.values()),
+            "pool_profiles": len(self._pool_sizes),
+            "pool_hits": self._pool_hits,
+            "pool_misses": self._pool_misses,
+            "pool_hit_rate": (
+                self._pool_hits / pool_requests if pool_requests else 0.0
+            ),
+            "pool_recycled": self._pool_recycled,
+            "creating": self._creating,
         }
+
+
+_sandbox_manager: Optional[SandboxManager] = None
+
+
+def get_sandbox_manager(warm_pool_size: int = 0) -> SandboxManager:
+    """Returns the shared manager that serves pooled sandboxes to clients.
+
+    Must be called from a running event loop. A new manager replaces one
+    that has shut down, e.g. when the event loop it ran on finished.
+
+    Args:
+        warm_pool_size: Warm pool size per profile for a newly created manager.
+
+    Returns:
+        SandboxManager: Shared manager instance.
+    """
+    global _sandbox_manager
+    if _sandbox_manager is None or _sandbox_manager.is_shutting_down:
+        _sandbox_manager = SandboxManager(warm_pool_size=warm_pool_size)
+    return _sandbox_manager
@@ -0,0 +1,402 @@
+import asyncio
+import inspect
+import os
+import re
+import shutil
+import signal
+import tempfile
+from typing import TYPE_CHECKING, Dict, Optional, Set
+
+from app.config import SandboxSettings
+from app.sandbox.core.exceptions import SandboxTimeoutError
+
+
+if TYPE_CHECKING:
+    from app.sandbox.core.terminal import OutputCallback
+
+
+_MEMORY_UNITS = {"": 1, "b": 1, "k": 1024, "m": 1024**2, "g": 1024**3}
+
+# Output is read in chunks; longer lines reach `on_output` in pieces
+_READ_CHUNK_BYTES = 64 * 1024
+_MAX_LINE_BYTES = 1024 * 1024
+
+
+def parse_memory_limit(limit: str) -> int:
+    """Parses a docker-style memory limit such as "512m" into bytes.
+
+    Args:
+        limit: Memory limit string.
+
+    Returns:
+        Limit in bytes.
+
+    Raises:
+        ValueError: If the limit cannot be parsed.
+    """
+    match = re.fullmatch(r"\s*(\d+)\s*([bkmg]?)b?\s*", limit.lower())
+    if not match:
+        raise ValueError(f"Invalid memory limit: {limit}")
+    return int(match.group(1)) * _MEMORY_UNITS[match.group(2)]
+
+
+class ProcessSandbox:
+    """Process-based sandbox environment.
+
+    Runs commands as local subprocesses in a private working directory with
+    resource limits and a restricted environment. It offers the same
+    interface as DockerSandbox without needing a docker daemon, but it does
+    not isolate the filesystem or network and is meant for trusted
+    workloads only.
+
+    Paths are given as container paths: relative paths and paths below
+    `config.work_dir` map to the host working directory, and paths below a
+    volume binding's container path map to its host path.
+
+    Attributes:
+        config: Sandbox configuration.
+        volume_bindings: Volume mapping configuration.
+        host_work_dir: Host directory backing the working directory.
+    """
+
+    def __init__(
+        self,
+        config: Optional[SandboxSettings] = None,
+        volume_bindings: Optional[Dict[str, str]] = None,
+    ):
+        """Initializes a sandbox instance.
+
+        Args:
+            config: Sandbox configuration. Default configuration used if None.
+            volume_bindings: Volume mappings in {host_path: container_path} format.
+        """
+        self.config = config or SandboxSettings()
+        self.volume_bindings = volume_bindings or {}
+        self.host_work_dir: Optional[str] = None
+        self._processes: Set[asyncio.subprocess.Process] = set()
+
+    async def create(self) -> "ProcessSandbox":
+        """Creates the sandbox working directory.
+
+        Returns:
+            Current sandbox instance.
+        """
+        self.host_work_dir = tempfile.mkdtemp(
+            prefix=f"sandbox_{os.path.basename(self.config.work_dir)}_"
+        )
+        return self
+
+    def _environment(self) -> Dict[str, str]:
+        """Builds the restricted environment for sandboxed commands."""
+        return {
+            "PATH": os.environ.get("PATH", "/usr/local/bin:/usr/bin:/bin"),
+            "HOME": self.host_work_dir,
+            "TMPDIR": self.host_work_dir,
+            "LANG": "C.UTF-8",
+            "PYTHONUNBUFFERED": "1",
+        }
+
+    def _limits_prefix(self) -> str:
+        """Builds the `ulimit` calls the wrapper shell runs before the command.
+
+        Limits are set by the shell rather than in a `preexec_fn`, which is
+        not safe to use from a process with threads. Memory is capped through
+        the data segment size (RLIMIT_DATA) instead of the address space, so
+        runtimes that reserve large virtual ranges (node, the JVM) still start.
+        """
+        memory_kb = max(1, parse_memory_limit(self.config.memory_limit) // 1024)
+        # cpu_limit is a share of a core; cap total CPU time at the timeout
+        cpu_seconds = max(1, int(self.config.timeout * self.config.cpu_limit))
+        return f"ulimit -d {memory_kb} -c 0 -t {cpu_seconds} || exit 125"
+
+    async def run_command(
+        self,
+        cmd: str,
+        timeout: Optional[int] = None,
+        on_output: Optional["OutputCallback"] = None,
+    ) -> str:
+        """Runs a command in the sandbox.
+
+        Each command starts a fresh shell in the working directory; shell
+        state does not persist between commands.
+
+        Args:
+            cmd: Command to execute.
+            timeout: Timeout in seconds.
+            on_output: Optional callback receiving each output line as it arrives.
+
+        Returns:
+            Command output as string.
+
+        Raises:
+            RuntimeError: If sandbox not initialized.
+            SandboxTimeoutError: If command execution times out.
+        """
+        if not self.host_work_dir:
+            raise RuntimeError("Sandbox not initialized")
+
+        timeout = timeout or self.config.timeout
+        # The command is passed as $1 to a shell that sets the limits first;
+        # its own session lets a timeout kill everything it started
+        process = await asyncio.create_subprocess_exec(
+            "bash",
+            "-c",
+            f'{self._limits_prefix()}; exec bash -c "$1"',
+            "sandbox",
+            cmd,
+            cwd=self.host_work_dir,
+            env=self._environment(),
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
+            start_new_session=True,
+        )
+        self._processes.add(process)
+        try:
+            # Waiting for exit is inside the deadline too: a command may close
+            # its output and keep running
+            output = await asyncio.wait_for(
+                self._communicate(process, on_output), timeout
+            )
+            return output.strip()
+        except asyncio.TimeoutError:
+            raise SandboxTimeoutError(
+                f"Command execution timed out after {timeout} seconds"
+            )
+        finally:
+            # Timed out, cancelled or failed while reading output
+            if process.returncode is None:
+                self._kill(process)
+                await process.wait()
+            self._processes.discard(process)
+
+    async def _communicate(
+        self,
+        process: asyncio.subprocess.Process,
+        on_output: Optional["OutputCallback"] = None,
+    ) -> str:
+        """Reads process output until it closes, then waits for the exit.
+
+        Args:
+            process: Running process.
+            on_output: Optional callback receiving each output line.
+
+        Returns:
+            Captured output.
+        """
+        output = await self._read_output(process, on_output)
+        await process.wait()
+        return output
+
+    async def _read_output(
+        self,
+        process: asyncio.subprocess.Process,
+        on_output: Optional["OutputCallback"] = None,
+    ) -> str:
+        """Reads process output, keeping at most `max_output_bytes` of the tail.
+
+        Args:
+            process: Running process.
+            on_output: Optional callback receiving each output line. Lines
+                longer than 1 MiB are passed on in pieces.
+
+        Returns:
+            Captured output.
+        """
+        max_bytes = self.config.max_output_bytes
+        buffer = bytearray()
+        pending = bytearray()
+        dropped = 0
+        while True:
+            chunk = await process.stdout.read(_READ_CHUNK_BYTES)
+            if on_output is not None:
+                pending += chunk
+                end = pending.rfind(b"\n") + 1
+                if not chunk:
+                    end = len(pending)
+                elif not end and len(pending) >= _MAX_LINE_BYTES:
+                    end = len(pending)
+                lines = bytes(pending[:end]).split(b"\n")
+                if lines[-1] == b"":
+                    lines.pop()
+                del pending[:end]
+                for line in lines:
+                    callback_result = on_output(line.decode("utf-8", errors="replace"))
+                    if inspect.isawaitable(callback_result):
+                        await callback_result
+            if not chunk:
+                break
+            buffer += chunk
+            if max_bytes is not None and len(buffer) > max_bytes:
+                excess = len(buffer) - max_bytes
+                dropped += excess
+                del buffer[:excess]
+
+        output = buffer.decode("utf-8", errors="replace")
+        if dropped:
+            output = f"[... {dropped} bytes of output truncated ...]\n{output}"
+        return output
+
+    @staticmethod
+    def _kill(process: asyncio.subprocess.Process) -> None:
+        """Kills a command and every process it started."""
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+    def _resolve_path(self, path: str) -> str:
+        """Maps a container path to a host path.
+
+        Args:
+            path: Container path.
+
+        Returns:
+            Host path.
+
+        Raises:
+            RuntimeError: If sandbox not initialized.
+            ValueError: If path is unsafe or outside the sandbox.
+        """
+        if not self.host_work_dir:
+            raise RuntimeError("Sandbox not initialized")
+        if ".." in path.split("/"):
+            raise ValueError("Path contains potentially unsafe patterns")
+
+        resolved = (
+            os.path.join(self.config.work_dir, path)
+            if not os.path.isabs(path)
+            else path
+        )
+        mounts = [(self.config.work_dir, self.host_work_dir)] + [
+            (container_path, host_path)
+            for host_path, container_path in self.volume_bindings.items()
+        ]
+        # Longest mount point wins so nested bindings resolve correctly
+        for container_path, host_path in sorted(
+            mounts, key=lambda mount: len(mount[0]), reverse=True
+        ):
+            container_path = container_path.rstrip("/")
+            if resolved == container_path or resolved.startswith(container_path + "/"):
+                return os.path.join(
+                    host_path, os.path.relpath(resolved, container_path)
+                )
+        raise ValueError(f"Path is outside the sandbox: {path}")
+
+    async def read_file(self, path: str) -> str:
+        """Reads a file from the sandbox.
+
+        Args:
+            path: File path.
+
+        Returns:
+            File contents as string.
+
+        Raises:
+            FileNotFoundError: If file does not exist.
+            RuntimeError: If read operation fails.
+        """
+        try:
+            with open(self._resolve_path(path), encoding="utf-8") as f:
+                return f.read()
+        except FileNotFoundError:
+            raise FileNotFoundError(f"File not found: {path}")
+        except Exception as e:
+            raise RuntimeError(f"Failed to read file: {e}")
+
+    async def write_file(self, path: str, content: str) -> None:
+        """Writes content to a file in the sandbox.
+
+        Args:
+            path: Target path.
+            content: File content.
+
+        Raises:
+            RuntimeError: If write operation fails.
+        """
+        try:
+            host_path = self._resolve_path(path)
+            os.makedirs(os.path.dirname(host_path), exist_ok=True)
+            with open(host_path, "w", encoding="utf-8") as f:
+                f.write(content)
+        except Exception as e:
+            raise RuntimeError(f"Failed to write file: {e}")
+
+    async def copy_from(self, src_path: str, dst_path: str) -> None:
+        """Copies a file from the sandbox.
+
+        Args:
+            src_path: Source file path (sandbox).
+            dst_path: Destination path (host).
+
+        Raises:
+            FileNotFoundError: If source file does not exist.
+            RuntimeError: If copy operation fails.
+        """
+        try:
+            host_src = self._resolve_path(src_path)
+            if not os.path.exists(host_src):
+                raise FileNotFoundError(f"Source file not found: {src_path}")
+            await asyncio.to_thread(self._copy, host_src, dst_path, True)
+        except FileNotFoundError:
+            raise
+        except Exception as e:
+            raise RuntimeError(f"Failed to copy file: {e}")
+
+    async def copy_to(self, src_path: str, dst_path: str) -> None:
+        """Copies a file to the sandbox.
+
+        Args:
+            src_path: Source file path (host).
+            dst_path: Destination path (sandbox).
+
+        Raises:
+            FileNotFoundError: If source file does not exist.
+            RuntimeError: If copy operation fails.
+        """
+        try:
+            if not os.path.exists(src_path):
+                raise FileNotFoundError(f"Source file not found: {src_path}")
+            await asyncio.to_thread(self._copy, src_path, self._resolve_path(dst_path))
+        except FileNotFoundError:
+            raise
+        except Exception as e:
+            raise RuntimeError(f"Failed to copy file: {e}")
+
+    @staticmethod
+    def _copy(src: str, dst: str, into_dir: bool = False) -> None:
+        """Copies a file or directory tree.
+
+        Args:
+            src: Source path.
+            dst: Destination path.
+            into_dir: If dst is an existing directory, copy the source into
+                it under its own name.
+        """
+        if into_dir and os.path.isdir(dst):
+            dst = os.path.join(dst, os.path.basename(src.rstrip("/")))
+        parent_dir = os.path.dirname(dst)
+        if parent_dir:
+            os.makedirs(parent_dir, exist_ok=True)
+        if os.path.isdir(src):
+            shutil.copytree(src, dst, dirs_exist_ok=True)
+        else:
+            shutil.copy2(src, dst)
+
+    async def cleanup(self) -> None:
+        """Cleans up sandbox resources."""
+        for process in list(self._processes):
+            self._kill(process)
+        self._processes.clear()
+
+        if self.host_work_dir:
+            await asyncio.to_thread(shutil.rmtree, self.host_work_dir, True)
+            self.host_work_dir = None
+
+    async def __aenter__(self) -> "ProcessSandbox":
+        """Async context manager entry."""
+        return await self.create()
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        """Async context manager exit."""
+        await self.cleanup()
@@ -4,15 +4,16 @@ import os
 import tarfile
 import tempfile
 import uuid
-from typing import Dict, Optional
+from typing import Dict, Optional, Set
 
 import docker
 from docker.errors import NotFound
 from docker.models.containers import Container
 
 from app.config import SandboxSettings
+from app.logger import logger
 from app.sandbox.core.exceptions import SandboxTimeoutError
-from app.sandbox.core.terminal import AsyncDockerizedTerminal
+from app.sandbox.core.terminal import AsyncDockerizedTerminal, OutputCallback
 
 
 class DockerSandbox:
@@ -45,6 +46,10 @@ class DockerSandbox:
         self.client = docker.from_env()
         self.container: Optional[Container] = None
         self.terminal: Optional[AsyncDockerizedTerminal] = None
+        self.snapshot_image: Optional[str] = None
+        self._snapshot_workdir: Optional[bytes] = None
+        self._snapshot_baseline: Set[str] = set()
+        self._host_work_dir: Optional[str] = None
 
     async def create(self) -> "DockerSandbox":
         """Creates and starts the sandbox container.
@@ -57,50 +62,128 @@ class DockerSandbox:
             RuntimeError: If container creation or startup fails.
         """
         try:
-            # Prepare container config
-            host_config = self.client.api.create_host_config(
-                mem_limit=self.config.memory_limit,
-                cpu_period=100000,
-                cpu_quota=int(100000 * self.config.cpu_limit),
-                network_mode="none" if not self.config.network_enabled else "bridge",
-                binds=self._prepare_volume_bindings(),
-            )
+            await self._create_container(self.config.image)
+            return self
 
-            # Generate unique container name with sandbox_ prefix
-            container_name = f"sandbox_{uuid.uuid4().hex[:8]}"
-
-            # Create container
-            container = await asyncio.to_thread(
-                self.client.api.create_container,
-                image=self.config.image,
-                command="tail -f /dev/null",
-                hostname="sandbox",
-                working_dir=self.config.work_dir,
-                host_config=host_config,
-                name=container_name,
-                tty=True,
-                detach=True,
-            )
+        except Exception as e:
+            await self.cleanup()  # Ensure resources are cleaned up
+            raise RuntimeError(f"Failed to create sandbox: {e}") from e
+
+    async def _create_container(self, image: str) -> None:
+        """Creates and starts a container from an image and opens its terminal.
+
+        The host working directory is kept across calls, so a container
+        recreated from a snapshot sees the same bind-mounted files.
+
+        Args:
+            image: Image name or ID.
+        """
+        # Prepare container config
+        host_config = self.client.api.create_host_config(
+            mem_limit=self.config.memory_limit,
+            cpu_period=100000,
+            cpu_quota=int(100000 * self.config.cpu_limit),
+            network_mode="none" if not self.config.network_enabled else "bridge",
+            binds=self._prepare_volume_bindings(),
+        )
 
-            self.container = self.client.containers.get(container["Id"])
+        # Generate unique container name with sandbox_ prefix
+        container_name = f"sandbox_{uuid.uuid4().hex[:8]}"
+
+        # Create container
+        container = await asyncio.to_thread(
+            self.client.api.create_container,
+            image=image,
+            command="tail -f /dev/null",
+            hostname="sandbox",
+            working_dir=self.config.work_dir,
+            host_config=host_config,
+            name=container_name,
+            tty=True,
+            detach=True,
+        )
+
+        self.container = self.client.containers.get(container["Id"])
+
+        # Start container
+        await asyncio.to_thread(self.container.start)
+
+        # Initialize terminal
+        self.terminal = AsyncDockerizedTerminal(
+            container["Id"],
+            self.config.work_dir,
+            env_vars={"PYTHONUNBUFFERED": "1"},
+            # Ensure Python output is not buffered
+            max_output_bytes=self.config.max_output_bytes,
+        )
+        await self.terminal.init()
+
+    async def _replace_container(self, image: str) -> None:
+        """Starts a container from an image in place of the current one.
 
-            # Start container
-            await asyncio.to_thread(self.container.start)
+        The new container is started before the current one is removed, so
+        a failure leaves the sandbox running on its previous container.
 
-            # Initialize terminal
-            self.terminal = AsyncDockerizedTerminal(
-                container["Id"],
-                self.config.work_dir,
-                env_vars={"PYTHONUNBUFFERED": "1"}
-                # Ensure Python output is not buffered
+        Args:
+            image: Image name or ID.
+
+        Raises:
+            Exception: If the new container cannot be created or started.
+        """
+        old_container, old_terminal = self.container, self.terminal
+        try:
+            await self._create_container(image)
+        except Exception:
+            new_container, new_terminal = self.container, self.terminal
+            self.container, self.terminal = old_container, old_terminal
+            await self._discard_container(
+                new_container if new_container is not old_container else None,
+                new_terminal if new_terminal is not old_terminal else None,
             )
-            await self.terminal.init()
+            raise
+        await self._discard_container(old_container, old_terminal)
 
-            return self
+    @staticmethod
+    async def _discard_container(
+        container: Optional[Container], terminal: Optional[AsyncDockerizedTerminal]
+    ) -> None:
+        """Closes a terminal and removes a container no longer in use.
 
-        except Exception as e:
-            await self.cleanup()  # Ensure resources are cleaned up
-            raise RuntimeError(f"Failed to create sandbox: {e}") from e
+        Args:
+            container: Container to remove, if any.
+            terminal: Terminal to close, if any.
+        """
+        if terminal:
+            try:
+                await terminal.close()
+            except Exception as e:
+                logger.warning(f"Failed to close sandbox terminal: {e}")
+        if container:
+            try:
+                await asyncio.to_thread(container.remove, force=True)
+            except Exception as e:
+                logger.warning(f"Failed to remove container {container.id}: {e}")
+
+    async def _changed_paths(self) -> Set[str]:
+        """Lists paths changed in the container outside the working directory.
+
+        Paths below the working directory and the volume mount points are
+        left out, since they are restored separately or not restored at all.
+
+        Returns:
+            Set of changed paths, as reported by `docker diff`.
+        """
+        changes = await asyncio.to_thread(self.container.diff) or []
+        mounts = [self.config.work_dir, *self.volume_bindings.values()]
+        return {
+            change["Path"]
+            for change in changes
+            if not any(
+                change["Path"] == mount.rstrip("/")
+                or change["Path"].startswith(mount.rstrip("/") + "/")
+                for mount in mounts
+            )
+        }
 
     def _prepare_volume_bindings(self) -> Dict[str, Dict[str, str]]:
         """Prepares volume binding configuration.
@@ -111,8 +194,9 @@ class DockerSandbox:
         bindings = {}
 
         # Create and add working directory mapping
-        work_dir = self._ensure_host_dir(self.config.work_dir)
-        bindings[work_dir] = {"bind": self.config.work_dir, "mode": "rw"}
+        if self._host_work_dir is None:
+            self._host_work_dir = self._ensure_host_dir(self.config.work_dir)
+        bindings[self._host_work_dir] = {"bind": self.config.work_dir, "mode": "rw"}
 
         # Add custom volume bindings
         for host_path, container_path in self.volume_bindings.items():
@@ -137,12 +221,18 @@ class DockerSandbox:
         os.makedirs(host_path, exist_ok=True)
         return host_path
 
-    async def run_command(self, cmd: str, timeout: Optional[int] = None) -> str:
+    async def run_command(
+        self,
+        cmd: str,
+        timeout: Optional[int] = None,
+        on_output: Optional[OutputCallback] = None,
+    ) -> str:
         """Runs a command in the sandbox.
 
         Args:
             cmd: Command to execute.
             timeout: Timeout in seconds.
+            on_output: Optional callback receiving each output line as it arrives.
 
         Returns:
             Command output as string.
@@ -156,13 +246,176 @@ class DockerSandbox:
 
         try:
             return await self.terminal.run_command(
-                cmd, timeout=timeout or self.config.timeout
+                cmd, timeout=timeout or self.config.timeout, on_output=on_output
             )
         except TimeoutError:
             raise SandboxTimeoutError(
                 f"Command execution timed out after {timeout or self.config.timeout} seconds"
             )
 
+    async def reset_workdir(self) -> None:
+        """Resets the sandbox to a clean working directory.
+
+        Removes everything below the working directory and restarts the
+        terminal session so that shell state (cwd, variables) does not leak
+        between leases.
+
+        Raises:
+            RuntimeError: If sandbox not initialized or reset fails.
+        """
+        if not self.container or not self.terminal:
+            raise RuntimeError("Sandbox not initialized")
+
+        await self._clear_workdir()
+        await self.terminal.close()
+        await self.terminal.init()
+
+    async def is_healthy(self) -> bool:
+        """Checks that the container is still running.
+
+        Returns:
+            bool: Whether the container exists and is running.
+        """
+        if not self.container or not self.terminal:
+            return False
+        try:
+            await asyncio.to_thread(self.container.reload)
+        except Exception:
+            return False
+        return self.container.status == "running"
+
+    async def _clear_workdir(self) -> None:
+        """Removes everything below the working directory.
+
+        Raises:
+            RuntimeError: If the files cannot be removed.
+        """
+        result = await asyncio.to_thread(
+            self.container.exec_run,
+            ["find", self.config.work_dir, "-mindepth", "1", "-delete"],
+        )
+        if result.exit_code != 0:
+            raise RuntimeError(
+                f"Failed to reset working directory: {result.output.decode('utf-8')}"
+            )
+
+    async def snapshot(self) -> str:
+        """Captures the current sandbox state as the reset point.
+
+        The container filesystem is committed to an image and the working
+        directory, which lives on a bind mount and is therefore not part of
+        the commit, is archived separately. The container is then restarted
+        from the committed image so that later changes outside the working
+        directory can be detected with `docker diff`. Paths the restarted
+        container already reports as changed (runtime files written on
+        startup) are recorded as a baseline and ignored by that check.
+
+        If anything fails, the sandbox keeps running on its previous
+        container and its previous snapshot.
+
+        Returns:
+            ID of the committed snapshot image.
+
+        Raises:
+            RuntimeError: If sandbox not initialized or snapshot fails.
+        """
+        if not self.container:
+            raise RuntimeError("Sandbox not initialized")
+
+        try:
+            stream, _ = await asyncio.to_thread(
+                self.container.get_archive, self.config.work_dir
+            )
+            workdir = b"".join(stream)
+            image = await asyncio.to_thread(
+                self.container.commit,
+                repository="sandbox_snapshot",
+                tag=uuid.uuid4().hex[:8],
+            )
+
+            try:
+                await self._replace_container(image.id)
+            except Exception:
+                await self._remove_image(image.id)
+                raise
+
+            previous_image = self.snapshot_image
+            self.snapshot_image = image.id
+            self._snapshot_workdir = workdir
+            self._snapshot_baseline = await self._changed_paths()
+            if previous_image:
+                await self._remove_image(previous_image)
+            return image.id
+
+        except Exception as e:
+            raise RuntimeError(f"Failed to snapshot sandbox: {e}") from e
+
+    async def restore_snapshot(self, mode: str = "auto") -> str:
+        """Resets the sandbox to its last snapshot.
+
+        Args:
+            mode: "workdir" only restores the working directory archive,
+                "image" restarts the container from the snapshot image, and
+                "auto" picks "workdir" when nothing outside the working
+                directory changed since the snapshot, "image" otherwise.
+                If the container cannot be restarted in "image" mode, the
+                sandbox keeps its current container and an error is raised.
+
+        Returns:
+            The reset mode that was used.
+
+        Raises:
+            RuntimeError: If no snapshot exists or restore fails.
+            ValueError: If mode is unknown.
+        """
+        if mode not in ("auto", "workdir", "image"):
+            raise ValueError(f"Unknown reset mode: {mode}")
+        if not self.container or not self.snapshot_image:
+            raise RuntimeError("Sandbox has no snapshot")
+
+        try:
+            if mode == "auto":
+                changes = await self._changed_paths() - self._snapshot_baseline
+                mode = "image" if changes else "workdir"
+
+            if mode == "image":
+                await self._replace_container(self.snapshot_image)
+                self._snapshot_baseline = await self._changed_paths()
+            else:
+                await self.terminal.close()
+                await self.terminal.init()
+
+            await self._clear_workdir()
+            await asyncio.to_thread(
+                self.container.put_archive,
+                os.path.dirname(self.config.work_dir.rstrip("/")) or "/",
+                self._snapshot_workdir,
+            )
+            return mode
+
+        except Exception as e:
+            raise RuntimeError(f"Failed to restore snapshot: {e}") from e
+
+    async def discard_snapshot(self) -> None:
+        """Drops the current snapshot and removes its image."""
+        image = self.snapshot_image
+        self.snapshot_image = None
+        self._snapshot_workdir = None
+        self._snapshot_baseline = set()
+        if image:
+            await self._remove_image(image)
+
+    async def _remove_image(self, image: str) -> None:
+        """Removes a snapshot image, ignoring images still in use.
+
+        Args:
+            image: Image ID.
+        """
+        try:
+            await asyncio.to_thread(self.client.images.remove, image, force=True)
+        except docker.errors.APIError as e:
+            logger.warning(f"Failed to remove snapshot image {image}: {e}")
+
     async def read_file(self, path: str) -> str:
         """Reads a file from the container.
 
@@ -447,6 +700,12 @@ class DockerSandbox:
                 finally:
                     self.container = None
 
+            if self.snapshot_image:
+                try:
+                    await self.discard_snapshot()
+                except Exception as e:
+                    errors.append(f"Snapshot cleanup error: {e}")
+
         except Exception as e:
             errors.append(f"General cleanup error: {e}")
 
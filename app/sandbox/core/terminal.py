@@ -6,9 +6,11 @@ allowing interactive command execution with timeout control.
 """
 
 import asyncio
+import inspect
 import re
 import socket
-from typing import Dict, Optional, Tuple, Union
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional, Tuple, Union
 
 import docker
 from docker import APIClient
@@ -16,15 +18,74 @@ from docker.errors import APIError
 from docker.models.containers import Container
 
 
+OutputCallback = Callable[[str], Any]
+
+PROMPT = b"$ "
+RECV_SIZE = 65536
+
+
+class OutputBuffer:
+    """Bounded line buffer that keeps the most recent command output.
+
+    Once the configured size is exceeded the oldest lines are dropped, and a
+    single line larger than the cap keeps only its tail, so memory stays
+    bounded no matter how much a command prints.
+    """
+
+    def __init__(self, max_bytes: Optional[int] = None) -> None:
+        """Initializes the buffer.
+
+        Args:
+            max_bytes: Maximum number of bytes to keep. None means unbounded.
+        """
+        self.max_bytes = max_bytes
+        self.dropped_bytes = 0
+        self._lines: Deque[bytes] = deque()
+        self._size = 0
+
+    def append(self, line: bytes) -> None:
+        """Appends a line, evicting the oldest lines if over capacity.
+
+        A line that alone exceeds the capacity is cut down to its last bytes.
+
+        Args:
+            line: Output line without trailing newline.
+        """
+        self._lines.append(line)
+        self._size += len(line) + 1
+        if self.max_bytes is None:
+            return
+        while self._size > self.max_bytes and len(self._lines) > 1:
+            dropped = self._lines.popleft()
+            self._size -= len(dropped) + 1
+            self.dropped_bytes += len(dropped) + 1
+        if self._size > self.max_bytes:
+            excess = self._size - self.max_bytes
+            self._lines[-1] = line[excess:]
+            self._size -= excess
+            self.dropped_bytes += excess
+
+    def getvalue(self) -> bytes:
+        """Returns the buffered output joined by newlines."""
+        output = b"\n".join(self._lines)
+        if self.dropped_bytes:
+            marker = f"[... {self.dropped_bytes} bytes of output truncated ...]"
+            output = marker.encode() + b"\n" + output
+        return output
+
+
 class DockerSession:
-    def __init__(self, container_id: str) -> None:
+    def __init__(self, container_id: str, max_output_bytes: Optional[int] = None) -> None:
         """Initializes a Docker session.
 
         Args:
             container_id: ID of the Docker container.
+            max_output_bytes: Maximum command output kept per command.
+                None means unbounded.
         """
         self.api = APIClient()
         self.container_id = container_id
+        self.max_output_bytes = max_output_bytes
         self.exec_id = None
         self.socket = None
 
@@ -114,6 +175,23 @@ class DockerSession:
             # Log error but don't raise, ensure cleanup continues
             print(f"Warning: Error during session cleanup: {e}")
 
+    async def _recv(self) -> bytes:
+        """Receives the next chunk from the session socket.
+
+        The socket is registered with the event loop, so this wakes up as
+        soon as data is available instead of polling.
+
+        Returns:
+            Received bytes.
+
+        Raises:
+            ConnectionError: If the session socket was closed.
+        """
+        chunk = await asyncio.get_running_loop().sock_recv(self.socket, RECV_SIZE)
+        if not chunk:
+            raise ConnectionError("Session socket closed")
+        return chunk
+
     async def _read_until_prompt(self) -> str:
         """Reads output until prompt is found.
 
@@ -123,25 +201,27 @@ class DockerSession:
         Raises:
             socket.error: If socket communication fails.
         """
-        buffer = b""
-        while b"$ " not in buffer:
-            try:
-                chunk = self.socket.recv(4096)
-                if chunk:
-                    buffer += chunk
-            except socket.error as e:
-                if e.errno == socket.EWOULDBLOCK:
-                    await asyncio.sleep(0.1)
-                    continue
-                raise
-        return buffer.decode("utf-8")
-
-    async def execute(self, command: str, timeout: Optional[int] = None) -> str:
+        buffer = bytearray()
+        while True:
+            # Only rescan the tail so a prompt split across chunks is found
+            start = max(0, len(buffer) - len(PROMPT) + 1)
+            buffer += await self._recv()
+            if buffer.find(PROMPT, start) != -1:
+                return buffer.decode("utf-8", errors="replace")
+
+    async def execute(
+        self,
+        command: str,
+        timeout: Optional[int] = None,
+        on_output: Optional[OutputCallback] = None,
+    ) -> str:
         """Executes a command and returns cleaned output.
 
         Args:
             command: Shell command to execute.
             timeout: Maximum execution time in seconds.
+            on_output: Optional callback receiving each output line as it
+                arrives. May be a coroutine function.
 
         Returns:
             Command output as string with prompt markers removed.
@@ -157,56 +237,16 @@ class DockerSession:
             # Sanitize command to prevent shell injection
             sanitized_command = self._sanitize_command(command)
             full_command = f"{sanitized_command}\necho $?\n"
-            self.socket.sendall(full_command.encode())
-
-            async def read_output() -> str:
-                buffer = b""
-                result_lines = []
-                command_sent = False
-
-                while True:
-                    try:
-                        chunk = self.socket.recv(4096)
-                        if not chunk:
-                            break
-
-                        buffer += chunk
-                        lines = buffer.split(b"\n")
-
-                        buffer = lines[-1]
-                        lines = lines[:-1]
-
-                        for line in lines:
-                            line = line.rstrip(b"\r")
-
-                            if not command_sent:
-                                command_sent = True
-                                continue
-
-                            if line.strip() == b"echo $?" or line.strip().isdigit():
-                                continue
-
-                            if line.strip():
-                                result_lines.append(line)
-
-                        if buffer.endswith(b"$ "):
-                            break
-
-                    except socket.error as e:
-                        if e.errno == socket.EWOULDBLOCK:
-                            await asyncio.sleep(0.1)
-                            continue
-                        raise
-
-                output = b"\n".join(result_lines).decode("utf-8")
-                output = re.sub(r"\n\$ echo \$\$?.*$", "", output)
-
-                return output
+            await asyncio.get_running_loop().sock_sendall(
+                self.socket, full_command.encode()
+            )
 
             if timeout:
-                result = await asyncio.wait_for(read_output(), timeout)
+                result = await asyncio.wait_for(
+                    self._read_output(on_output), timeout
+                )
             else:
-                result = await read_output()
+                result = await self._read_output(on_output)
 
             return result.strip()
 
@@ -215,6 +255,66 @@ class DockerSession:
         except Exception as e:
             raise RuntimeError(f"Failed to execute command: {e}")
 
+    async def _read_output(self, on_output: Optional[OutputCallback] = None) -> str:
+        """Reads command output until the shell prompt returns.
+
+        Complete lines are parsed out of a reusable bytearray as chunks
+        arrive; only the trailing partial line is kept between chunks.
+
+        Args:
+            on_output: Optional callback receiving each output line.
+
+        Returns:
+            Command output with the echoed command and exit code removed.
+        """
+        pending = bytearray()
+        output = OutputBuffer(self.max_output_bytes)
+        command_sent = False
+
+        while True:
+            try:
+                chunk = await self._recv()
+            except ConnectionError:
+                break
+            pending += chunk
+
+            start = 0
+            while True:
+                end = pending.find(b"\n", start)
+                if end == -1:
+                    break
+                line = bytes(pending[start:end]).rstrip(b"\r")
+                start = end + 1
+
+                if not command_sent:
+                    command_sent = True
+                    continue
+
+                stripped = line.strip()
+                if stripped == b"echo $?" or stripped.isdigit() or not stripped:
+                    continue
+
+                output.append(line)
+                if on_output is not None:
+                    callback_result = on_output(line.decode("utf-8", errors="replace"))
+                    if inspect.isawaitable(callback_result):
+                        await callback_result
+            del pending[:start]
+            if (
+                self.max_output_bytes is not None
+                and len(pending) > self.max_output_bytes + len(PROMPT)
+            ):
+                # A line without newline yet; only its tail can be kept anyway
+                excess = len(pending) - self.max_output_bytes - len(PROMPT)
+                del pending[:excess]
+                output.dropped_bytes += excess
+
+            if pending.endswith(PROMPT):
+                break
+
+        result = output.getvalue().decode("utf-8", errors="replace")
+        return re.sub(r"\n\$ echo \$\$?.*$", "", result)
+
     def _sanitize_command(self, command: str) -> str:
         """Sanitizes the command string to prevent shell injection.
 
@@ -255,6 +355,7 @@ class AsyncDockerizedTerminal:
         working_dir: str = "/workspace",
         env_vars: Optional[Dict[str, str]] = None,
         default_timeout: int = 60,
+        max_output_bytes: Optional[int] = None,
     ) -> None:
         """Initializes an asynchronous terminal for Docker containers.
 
@@ -263,6 +364,7 @@ class AsyncDockerizedTerminal:
             working_dir: Working directory inside the container.
             env_vars: Environment variables to set.
             default_timeout: Default command execution timeout in seconds.
+            max_output_bytes: Maximum output kept per command (None = unbounded).
         """
         self.client = docker.from_env()
         self.container = (
@@ -273,6 +375,7 @@ class AsyncDockerizedTerminal:
         self.working_dir = working_dir
         self.env_vars = env_vars or {}
         self.default_timeout = default_timeout
+        self.max_output_bytes = max_output_bytes
         self.session = None
 
     async def init(self) -> None:
@@ -285,7 +388,7 @@ class AsyncDockerizedTerminal:
         """
         await self._ensure_workdir()
 
-        self.session = DockerSession(self.container.id)
+        self.session = DockerSession(self.container.id, self.max_output_bytes)
         await self.session.create(self.working_dir, self.env_vars)
 
     async def _ensure_workdir(self) -> None:
@@ -313,12 +416,18 @@ class AsyncDockerizedTerminal:
         )
         return result.exit_code, result.output.decode("utf-8")
 
-    async def run_command(self, cmd: str, timeout: Optional[int] = None) -> str:
+    async def run_command(
+        self,
+        cmd: str,
+        timeout: Optional[int] = None,
+        on_output: Optional[OutputCallback] = None,
+    ) -> str:
         """Runs a command in the container with timeout.
 
         Args:
             cmd: Shell command to execute.
             timeout: Maximum execution time in seconds.
+            on_output: Optional callback receiving each output line as it arrives.
 
         Returns:
             Command output as string.
@@ -329,7 +438,9 @@ class AsyncDockerizedTerminal:
         if not self.session:
             raise RuntimeError("Terminal not initialized")
 
-        return await self.session.execute(cmd, timeout=timeout or self.default_timeout)
+        return await self.session.execute(
+            cmd, timeout=timeout or self.default_timeout, on_output=on_output
+        )
 
     async def close(self) -> None:
         """Closes the terminal session."""
@@ -1,7 +1,11 @@
+import random
+import re
+import zlib
+from collections import Counter, defaultdict
 from enum import Enum
-from typing import Any, List, Literal, Optional, Union
+from typing import Any, Dict, Iterable, List, Literal, Optional, Set, Tuple, Union
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 
 
 class Role(str, Enum):
@@ -156,27 +160,178 @@ class Message(BaseModel):
         )
 
 
+_WORD_RE = re.compile(r"\w+")
+_MERSENNE_PRIME = (1 << 61) - 1
+_LSH_ROWS = 2  # signature values per LSH band
+_MIN_SIGNATURE_WORDS = 4  # shorter contents only match exactly
+
+Signature = Tuple[int, ...]
+
+
+def _make_permutations(count: int, seed: int) -> Tuple[Tuple[int, int], ...]:
+    """(a, b) of the hash functions h(x) = (a * x + b) mod p used by MinHash."""
+    rng = random.Random(seed)
+    return tuple(
+        (rng.randrange(1, _MERSENNE_PRIME), rng.randrange(_MERSENNE_PRIME))
+        for _ in range(count)
+    )
+
+
+# Seeded so that signatures are comparable across Memory instances
+_MINHASH_PERMUTATIONS = _make_permutations(32, seed=0x5EED)
+
+
+def _minhash(words: Set[str]) -> Signature:
+    """MinHash signature of a word set; equal positions estimate Jaccard."""
+    # crc32 rather than hash(), which is salted per process
+    hashes = [zlib.crc32(word.encode()) for word in words]
+    return tuple(
+        min((a * x + b) % _MERSENNE_PRIME for x in hashes)
+        for a, b in _MINHASH_PERMUTATIONS
+    )
+
+
+def _bands(signature: Signature) -> List[Tuple[int, Signature]]:
+    return [
+        (start, signature[start : start + _LSH_ROWS])
+        for start in range(0, len(signature), _LSH_ROWS)
+    ]
+
+
+def _similarity(first: Signature, second: Signature) -> float:
+    return sum(a == b for a, b in zip(first, second)) / len(first)
+
+
+_UNSIGNED = object()
+
+
+class _ContentKey:
+    """Index entry of a message: its content and a signature of its words.
+
+    The signature costs far more than the exact lookup, so it is computed
+    on first use, i.e. only once near-duplicate matching is asked for.
+    """
+
+    __slots__ = ("content", "_signature")
+
+    def __init__(self, content: str):
+        self.content = content
+        self._signature = _UNSIGNED
+
+    @property
+    def signature(self) -> Optional[Signature]:
+        if self._signature is _UNSIGNED:
+            words = set(_WORD_RE.findall(self.content.lower()))
+            self._signature = (
+                _minhash(words) if len(words) >= _MIN_SIGNATURE_WORDS else None
+            )
+        return self._signature
+
+
+class _ContentIndex:
+    """Counts of indexed contents, exact and by MinHash signature.
+
+    Exact counts are always kept. The signature index is only built by
+    `sign`, the first time near-duplicates are looked up, and maintained
+    from then on. Signatures are bucketed by LSH bands, so finding
+    near-duplicates only compares against signatures sharing a band
+    instead of every message.
+    """
+
+    __slots__ = ("exact", "signed", "signatures", "buckets")
+
+    def __init__(self):
+        self.exact: Counter = Counter()
+        self.signed = False
+        self.signatures: Counter = Counter()
+        self.buckets: Dict[Tuple[int, Signature], Set[Signature]] = defaultdict(set)
+
+    def sign(self, keys: Iterable[_ContentKey]) -> None:
+        """Builds the signature index of the already indexed `keys`."""
+        self.signed = True
+        for key in keys:
+            self._add_signature(key)
+
+    def add(self, key: _ContentKey) -> None:
+        self.exact[key.content] += 1
+        if self.signed:
+            self._add_signature(key)
+
+    def _add_signature(self, key: _ContentKey) -> None:
+        if key.signature is None:
+            return
+        if not self.signatures[key.signature]:
+            for band in _bands(key.signature):
+                self.buckets[band].add(key.signature)
+        self.signatures[key.signature] += 1
+
+    def remove(self, key: _ContentKey) -> None:
+        self._decrement(self.exact, key.content)
+        if not self.signed or key.signature is None:
+            return
+        if self._decrement(self.signatures, key.signature):
+            return
+        for band in _bands(key.signature):
+            bucket = self.buckets[band]
+            bucket.discard(key.signature)
+            if not bucket:
+                del self.buckets[band]
+
+    def count_similar(
+        self, signature: Signature, similarity: float, limit: Optional[int] = None
+    ) -> int:
+        count = 0
+        seen = set()
+        for band in _bands(signature):
+            for candidate in self.buckets.get(band, ()):
+                if candidate in seen:
+                    continue
+                seen.add(candidate)
+                if _similarity(candidate, signature) >= similarity:
+                    count += self.signatures[candidate]
+                    if limit is not None and count >= limit:
+                        return count
+        return count
+
+    @staticmethod
+    def _decrement(counter: Counter, key) -> int:
+        """Decrement a count, dropping it at zero; returns the new count."""
+        counter[key] -= 1
+        if counter[key] <= 0:
+            del counter[key]
+            return 0
+        return counter[key]
+
+
 class Memory(BaseModel):
     messages: List[Message] = Field(default_factory=list)
     max_messages: int = Field(default=100)
 
+    # Index of assistant message contents for duplicate detection. `_keys`
+    # runs parallel to `_indexed`, the list object it was built from, so
+    # messages appended to `messages` directly are picked up on next use.
+    _index: _ContentIndex = PrivateAttr(default_factory=_ContentIndex)
+    _keys: List[Optional[_ContentKey]] = PrivateAttr(default_factory=list)
+    _indexed: Optional[List[Message]] = PrivateAttr(default=None)
+
     def add_message(self, message: Message) -> None:
         """Add a message to memory"""
         self.messages.append(message)
+        self._sync_index()
         # Optional: Implement message limit
-        if len(self.messages) > self.max_messages:
-            self.messages = self.messages[-self.max_messages :]
+        self._trim()
 
     def add_messages(self, messages: List[Message]) -> None:
         """Add multiple messages to memory"""
         self.messages.extend(messages)
+        self._sync_index()
         # Optional: Implement message limit
-        if len(self.messages) > self.max_messages:
-            self.messages = self.messages[-self.max_messages :]
+        self._trim()
 
     def clear(self) -> None:
         """Clear all messages"""
         self.messages.clear()
+        self._reset_index()
 
     def get_recent_messages(self, n: int) -> List[Message]:
         """Get n most recent messages"""
@@ -185,3 +340,68 @@ class Memory(BaseModel):
     def to_dict_list(self) -> List[dict]:
         """Convert messages to list of dicts"""
         return [msg.to_dict() for msg in self.messages]
+
+    def count_duplicates(
+        self,
+        position: int = -1,
+        similarity: Optional[float] = None,
+        limit: Optional[int] = None,
+    ) -> int:
+        """Count other assistant messages repeating the message at `position`.
+
+        Without `similarity` only identical contents count, looked up by
+        content. With it, so do near-duplicates: messages whose estimated
+        word-set (Jaccard) similarity is at least that value. Their MinHash
+        signatures are only computed from the first such call on. Contents
+        of fewer than four distinct words only ever match exactly. Looks up
+        the index, so the cost does not grow with the number of messages;
+        with `limit`, counting stops once that many are found.
+        """
+        self._sync_index()
+        if not self.messages or not self.messages[position].content:
+            return 0
+
+        key = self._keys[position]
+        own = 1
+        if key is None:  # not an assistant message, so not indexed
+            key = _ContentKey(self.messages[position].content)
+            own = 0
+
+        if similarity is None:
+            return self._index.exact[key.content] - own
+        if not self._index.signed:
+            self._index.sign(indexed for indexed in self._keys if indexed)
+        if key.signature is None:
+            return self._index.exact[key.content] - own
+        if limit is not None:
+            limit += own
+        return self._index.count_similar(key.signature, similarity, limit) - own
+
+    def _reset_index(self) -> None:
+        self._index = _ContentIndex()
+        self._keys = []
+        self._indexed = self.messages
+
+    def _sync_index(self) -> None:
+        """Index messages added since the last sync; rebuild if replaced."""
+        replaced = self._indexed is not self.messages
+        if replaced or len(self._keys) > len(self.messages):
+            self._reset_index()
+        for message in self.messages[len(self._keys) :]:
+            key = None
+            if message.role == "assistant" and message.content:
+                key = _ContentKey(message.content)
+                self._index.add(key)
+            self._keys.append(key)
+
+    def _trim(self) -> None:
+        """Drop the oldest messages beyond max_messages, and their index keys."""
+        excess = len(self.messages) - self.max_messages
+        if excess <= 0:
+            return
+        for key in self._keys[:excess]:
+            if key is not None:
+                self._index.remove(key)
+        self.messages = self.messages[excess:]
+        self._keys = self._keys[excess:]
+        self._indexed = self.messages
@@ -1,12 +1,33 @@
-from app.tool.base import BaseTool
-from app.tool.bash import Bash
-from app.tool.browser_use_tool import BrowserUseTool
-from app.tool.create_chat_completion import CreateChatCompletion
-from app.tool.planning import PlanningTool
-from app.tool.str_replace_editor import StrReplaceEditor
-from app.tool.terminate import Terminate
-from app.tool.tool_collection import ToolCollection
-from app.tool.web_search import WebSearch
+from typing import TYPE_CHECKING
+
+from app.utils.lazy import lazy_module
+
+
+if TYPE_CHECKING:
+    from app.tool.base import BaseTool
+    from app.tool.bash import Bash
+    from app.tool.browser_use_tool import BrowserUseTool
+    from app.tool.create_chat_completion import CreateChatCompletion
+    from app.tool.planning import PlanningTool
+    from app.tool.str_replace_editor import StrReplaceEditor
+    from app.tool.terminate import Terminate
+    from app.tool.tool_collection import ToolCollection
+    from app.tool.web_search import WebSearch
+
+
+# Tools are imported on first access, so `from app.tool import Terminate`
+# does not pay for browser_use/playwright or the search engine clients.
+_LAZY_IMPORTS = {
+    "BaseTool": "app.tool.base",
+    "Bash": "app.tool.bash",
+    "BrowserUseTool": "app.tool.browser_use_tool",
+    "CreateChatCompletion": "app.tool.create_chat_completion",
+    "PlanningTool": "app.tool.planning",
+    "StrReplaceEditor": "app.tool.str_replace_editor",
+    "Terminate": "app.tool.terminate",
+    "ToolCollection": "app.tool.tool_collection",
+    "WebSearch": "app.tool.web_search",
+}
 
 
 __all__ = [
@@ -20,3 +41,6 @@ __all__ = [
     "CreateChatCompletion",
     "PlanningTool",
 ]
+
+
+__getattr__, __dir__ = lazy_module(__name__, _LAZY_IMPORTS)
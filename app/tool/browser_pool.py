@@ -0,0 +1,324 @@
+import asyncio
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional, Set
+
+from browser_use import Browser as BrowserUseBrowser
+from browser_use import BrowserConfig
+from browser_use.browser.context import BrowserContext, BrowserContextConfig
+
+from app.config import config
+from app.logger import logger
+
+
+class _PooledContext:
+    """A browser context leased to one session."""
+
+    __slots__ = ("context", "lock", "last_used", "active")
+
+    def __init__(self, context: BrowserContext):
+        self.context = context
+        self.lock = asyncio.Lock()
+        self.last_used = time.monotonic()
+        self.active = 0
+
+
+class BrowserContextPool:
+    """Isolated browser contexts for concurrent agents on one shared browser.
+
+    Each session (usually one BrowserUseTool instance) gets its own context,
+    so agents browse in parallel while actions within a session stay
+    serialized. The number of open contexts is capped with LRU eviction,
+    contexts idle for longer than `idle_timeout` are closed, and the browser
+    process is shut down once the last context is released or has idled out.
+    """
+
+    def __init__(
+        self,
+        max_contexts: Optional[int] = None,
+        max_tabs: Optional[int] = None,
+        idle_timeout: Optional[float] = None,
+    ):
+        """Initializes the pool, defaulting limits to the browser config.
+
+        Args:
+            max_contexts: Maximum number of open contexts.
+            max_tabs: Maximum number of tabs per context.
+            idle_timeout: Seconds after which an unused context is closed.
+        """
+        browser_config = config.browser_config
+        self.max_contexts = max_contexts or getattr(browser_config, "max_contexts", 8)
+        self.max_tabs = max_tabs or getattr(browser_config, "max_tabs", 8)
+        self.idle_timeout = idle_timeout or getattr(
+            browser_config, "context_idle_timeout", 600
+        )
+        self.browser: Optional[BrowserUseBrowser] = None
+        self._contexts: "OrderedDict[str, _PooledContext]" = OrderedDict()
+        self._lock = asyncio.Lock()
+        self._pending: Dict[str, asyncio.Future] = {}
+        # Released contexts still in use, closed when their last lease ends
+        self._draining: Set[_PooledContext] = set()
+        self._idle_timer: Optional[asyncio.TimerHandle] = None
+        self._sweeps: Set[asyncio.Task] = set()
+
+    async def _ensure_browser(self) -> BrowserUseBrowser:
+        """Launches (or connects to) the shared browser on first use."""
+        if self.browser is None:
+            browser_config_kwargs = {"headless": False, "disable_security": True}
+
+            if config.browser_config:
+                from browser_use.browser.browser import ProxySettings
+
+                # handle proxy settings.
+                if config.browser_config.proxy and config.browser_config.proxy.server:
+                    browser_config_kwargs["proxy"] = ProxySettings(
+                        server=config.browser_config.proxy.server,
+                        username=config.browser_config.proxy.username,
+                        password=config.browser_config.proxy.password,
+                    )
+
+                browser_attrs = [
+                    "headless",
+                    "disable_security",
+                    "extra_chromium_args",
+                    "chrome_instance_path",
+                    "wss_url",
+                    "cdp_url",
+                ]
+
+                for attr in browser_attrs:
+                    value = getattr(config.browser_config, attr, None)
+                    if value is not None:
+                        if not isinstance(value, list) or value:
+                            browser_config_kwargs[attr] = value
+
+            self.browser = BrowserUseBrowser(BrowserConfig(**browser_config_kwargs))
+        return self.browser
+
+    async def _new_context(self) -> BrowserContext:
+        """Creates a context on the shared browser."""
+        browser = await self._ensure_browser()
+        context_config = BrowserContextConfig()
+
+        # if there is context config in the config, use it.
+        if (
+            config.browser_config
+            and hasattr(config.browser_config, "new_context_config")
+            and config.browser_config.new_context_config
+        ):
+            context_config = config.browser_config.new_context_config
+
+        return await browser.new_context(context_config)
+
+    @asynccontextmanager
+    async def session(self, session_id: str) -> AsyncIterator[BrowserContext]:
+        """Leases the session's context, creating it if needed.
+
+        Actions within one session are serialized; different sessions run
+        concurrently.
+
+        Args:
+            session_id: Session identifier.
+
+        Yields:
+            The session's browser context.
+        """
+        entry = await self._acquire(session_id)
+        try:
+            async with entry.lock:
+                yield entry.context
+        finally:
+            entry.active -= 1
+            entry.last_used = time.monotonic()
+            if entry in self._draining and not entry.active:
+                await self._close_released(entry)
+            else:
+                self._schedule_idle_sweep()
+
+    def get_context(self, session_id: str) -> Optional[BrowserContext]:
+        """Returns the session's open context without leasing it."""
+        entry = self._contexts.get(session_id)
+        return entry.context if entry else None
+
+    async def _acquire(self, session_id: str) -> _PooledContext:
+        """Finds or creates the session's context and marks it in use.
+
+        Only bookkeeping happens under the pool lock; contexts are created
+        and closed outside it, so one slow browser call does not stall the
+        other sessions.
+        """
+        while True:
+            async with self._lock:
+                stale = self._evict_idle()
+
+                entry = self._contexts.get(session_id)
+                if entry is not None:
+                    self._contexts.move_to_end(session_id)
+                    entry.active += 1
+                    return entry
+
+                # Another coroutine is already opening this session's context
+                pending = self._pending.get(session_id)
+                if pending is None:
+                    while len(self._contexts) + len(self._pending) >= self.max_contexts:
+                        evicted = self._evict_lru()
+                        if evicted is None:
+                            logger.warning(
+                                f"All {len(self._contexts)} browser contexts are busy, exceeding max_contexts"
+                            )
+                            break
+                        stale.append(evicted)
+                    pending = asyncio.get_running_loop().create_future()
+                    self._pending[session_id] = pending
+                    creating = True
+                else:
+                    creating = False
+
+            await self._close_contexts(stale)
+            if creating:
+                break
+            await asyncio.wait([pending])
+
+        entry = None
+        try:
+            entry = _PooledContext(await self._new_context())
+            entry.active = 1
+        finally:
+            async with self._lock:
+                if entry is not None:
+                    self._contexts[session_id] = entry
+                self._pending.pop(session_id).set_result(None)
+        return entry
+
+    def _evict_lru(self) -> Optional[BrowserContext]:
+        """Removes the least recently used context that is not in use."""
+        for session_id, entry in self._contexts.items():
+            if not entry.active:
+                logger.info(f"Evicting browser context of session {session_id}")
+                return self._contexts.pop(session_id).context
+        return None
+
+    def _evict_idle(self) -> List[BrowserContext]:
+        """Removes contexts that have not been used for `idle_timeout` seconds."""
+        now = time.monotonic()
+        idle = [
+            session_id
+            for session_id, entry in self._contexts.items()
+            if not entry.active and now - entry.last_used > self.idle_timeout
+        ]
+        for session_id in idle:
+            logger.info(f"Closing idle browser context of session {session_id}")
+        return [self._contexts.pop(session_id).context for session_id in idle]
+
+    def _take_unused_browser(self) -> Optional[BrowserUseBrowser]:
+        """Detaches the browser if no context is open or being opened."""
+        if self._contexts or self._pending or self._draining:
+            return None
+        browser, self.browser = self.browser, None
+        return browser
+
+    @staticmethod
+    async def _close_contexts(contexts: List[BrowserContext]) -> None:
+        """Closes contexts already removed from the pool."""
+        for context in contexts:
+            try:
+                await context.close()
+            except Exception as e:
+                logger.warning(f"Error closing browser context: {e}")
+
+    @staticmethod
+    async def _close_browser(browser: Optional[BrowserUseBrowser]) -> None:
+        """Closes a browser already detached from the pool."""
+        if browser is None:
+            return
+        try:
+            await browser.close()
+        except Exception as e:
+            logger.warning(f"Error closing browser: {e}")
+
+    def _schedule_idle_sweep(self) -> None:
+        """Arms a timer that sweeps idle contexts once `idle_timeout` passes."""
+        if self._idle_timer is not None:
+            self._idle_timer.cancel()
+        loop = asyncio.get_running_loop()
+        self._idle_timer = loop.call_later(
+            self.idle_timeout + 1, lambda: self._start_sweep(loop)
+        )
+
+    def _start_sweep(self, loop: asyncio.AbstractEventLoop) -> None:
+        self._idle_timer = None
+        task = loop.create_task(self.sweep_idle())
+        self._sweeps.add(task)
+        task.add_done_callback(self._sweeps.discard)
+
+    async def sweep_idle(self) -> None:
+        """Closes idle contexts, and the browser once none are left."""
+        async with self._lock:
+            stale = self._evict_idle()
+            browser = self._take_unused_browser()
+        await self._close_contexts(stale)
+        await self._close_browser(browser)
+        if self._contexts:
+            self._schedule_idle_sweep()
+
+    async def make_room_for_tab(self, context: BrowserContext) -> None:
+        """Closes the oldest background tabs so a new tab fits under `max_tabs`."""
+        session = await context.get_session()
+        current = await context.get_current_page()
+        for page in list(session.context.pages):
+            if len(session.context.pages) < self.max_tabs:
+                break
+            if page is not current:
+                await page.close()
+
+    async def release(self, session_id: str) -> None:
+        """Closes a session's context, and the browser if it was the last one.
+
+        A context still leased by `session` is closed when its last lease
+        ends instead of under the running action.
+
+        Args:
+            session_id: Session identifier.
+        """
+        async with self._lock:
+            entry = self._contexts.pop(session_id, None)
+            if entry is not None and entry.active:
+                self._draining.add(entry)
+                return
+            browser = self._take_unused_browser()
+        await self._close_contexts([entry.context] if entry else [])
+        await self._close_browser(browser)
+
+    async def _close_released(self, entry: _PooledContext) -> None:
+        """Closes a released context after its last lease ended."""
+        async with self._lock:
+            self._draining.discard(entry)
+            browser = self._take_unused_browser()
+        await self._close_contexts([entry.context])
+        await self._close_browser(browser)
+
+    async def close(self) -> None:
+        """Closes every context and the browser."""
+        if self._idle_timer is not None:
+            self._idle_timer.cancel()
+            self._idle_timer = None
+        async with self._lock:
+            entries = [*self._contexts.values(), *self._draining]
+            contexts = [entry.context for entry in entries]
+            self._contexts.clear()
+            self._draining.clear()
+            browser = self._take_unused_browser()
+        await self._close_contexts(contexts)
+        await self._close_browser(browser)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Returns pool usage counts."""
+        return {
+            "contexts": len(self._contexts),
+            "active": sum(1 for entry in self._contexts.values() if entry.active),
+            "max_contexts": self.max_contexts,
+        }
+
+
+BROWSER_POOL = BrowserContextPool()
@@ -1,18 +1,23 @@
 import asyncio
 import base64
+import hashlib
+import io
 import json
+import uuid
+from contextlib import AsyncExitStack
 from typing import Generic, Optional, TypeVar
 
-from browser_use import Browser as BrowserUseBrowser
-from browser_use import BrowserConfig
-from browser_use.browser.context import BrowserContext, BrowserContextConfig
+from browser_use.browser.context import BrowserContext
 from browser_use.dom.service import DomService
 from pydantic import Field, field_validator
 from pydantic_core.core_schema import ValidationInfo
 
 from app.config import config
-from app.llm import LLM
+from app.llm import LLM, TokenCounter
+from app.logger import logger
 from app.tool.base import BaseTool, ToolResult
+from app.tool.browser_pool import BROWSER_POOL, BrowserContextPool
+from app.tool.dom_extraction import DomExtractor
 from app.tool.web_search import WebSearch
 
 
@@ -35,6 +40,46 @@ Note: When using element indices, refer to the numbered elements shown in the cu
 
 Context = TypeVar("Context")
 
+# Page geometry needed to plan a screenshot
+_PAGE_GEOMETRY_JS = """
+() => ({
+    width: Math.max(document.documentElement.scrollWidth, window.innerWidth),
+    height: Math.max(document.documentElement.scrollHeight, window.innerHeight),
+    viewportWidth: window.innerWidth,
+    viewportHeight: window.innerHeight,
+    scrollX: window.scrollX,
+    scrollY: window.scrollY,
+})
+"""
+
+
+def _page_fingerprint(url: str, elements: str, image: bytes) -> str:
+    """Exact hash of a page state: its URL, interactive elements and pixels."""
+    digest = hashlib.sha1()
+    for part in (url.encode(), elements.encode(), image):
+        digest.update(len(part).to_bytes(8, "big"))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+def _downscale_jpeg(image: bytes, scale: float, quality: int) -> bytes:
+    """Shrink a JPEG by `scale` with Pillow; returned unchanged without it."""
+    if scale >= 1:
+        return image
+    try:
+        from PIL import Image
+    except ImportError:
+        logger.debug("Pillow is not installed; screenshot is not downscaled")
+        return image
+
+    with Image.open(io.BytesIO(image)) as img:
+        size = (max(1, round(img.width * scale)), max(1, round(img.height * scale)))
+        output = io.BytesIO()
+        img.convert("RGB").resize(size, Image.LANCZOS).save(
+            output, format="JPEG", quality=quality
+        )
+    return output.getvalue()
+
 
 class BrowserUseTool(BaseTool, Generic[Context]):
     name: str = "browser_use"
@@ -121,10 +166,12 @@ class BrowserUseTool(BaseTool, Generic[Context]):
         },
     }
 
-    lock: asyncio.Lock = Field(default_factory=asyncio.Lock)
-    browser: Optional[BrowserUseBrowser] = Field(default=None, exclude=True)
+    session_id: str = Field(default_factory=lambda: uuid.uuid4().hex)
+    pool: BrowserContextPool = Field(default_factory=lambda: BROWSER_POOL, exclude=True)
     context: Optional[BrowserContext] = Field(default=None, exclude=True)
     dom_service: Optional[DomService] = Field(default=None, exclude=True)
+    dom_extractor: DomExtractor = Field(default_factory=DomExtractor, exclude=True)
+    last_screenshot: Optional[str] = Field(default=None, exclude=True)
     web_search_tool: WebSearch = Field(default_factory=WebSearch, exclude=True)
 
     # Context for generic functionality
@@ -138,54 +185,11 @@ class BrowserUseTool(BaseTool, Generic[Context]):
             raise ValueError("Parameters cannot be empty")
         return v
 
-    async def _ensure_browser_initialized(self) -> BrowserContext:
-        """Ensure browser and context are initialized."""
-        if self.browser is None:
-            browser_config_kwargs = {"headless": False, "disable_security": True}
-
-            if config.browser_config:
-                from browser_use.browser.browser import ProxySettings
-
-                # handle proxy settings.
-                if config.browser_config.proxy and config.browser_config.proxy.server:
-                    browser_config_kwargs["proxy"] = ProxySettings(
-                        server=config.browser_config.proxy.server,
-                        username=config.browser_config.proxy.username,
-                        password=config.browser_config.proxy.password,
-                    )
-
-                browser_attrs = [
-                    "headless",
-                    "disable_security",
-                    "extra_chromium_args",
-                    "chrome_instance_path",
-                    "wss_url",
-                    "cdp_url",
-                ]
-
-                for attr in browser_attrs:
-                    value = getattr(config.browser_config, attr, None)
-                    if value is not None:
-                        if not isinstance(value, list) or value:
-                            browser_config_kwargs[attr] = value
-
-            self.browser = BrowserUseBrowser(BrowserConfig(**browser_config_kwargs))
-
-        if self.context is None:
-            context_config = BrowserContextConfig()
-
-            # if there is context config in the config, use it.
-            if (
-                config.browser_config
-                and hasattr(config.browser_config, "new_context_config")
-                and config.browser_config.new_context_config
-            ):
-                context_config = config.browser_config.new_context_config
-
-            self.context = await self.browser.new_context(context_config)
-            self.dom_service = DomService(await self.context.get_current_page())
-
-        return self.context
+    async def _bind_context(self, context: BrowserContext) -> None:
+        """Remember the context leased from the pool for this session."""
+        if self.context is not context:
+            self.context = context
+            self.dom_service = DomService(await context.get_current_page())
 
     async def execute(
         self,
@@ -220,9 +224,13 @@ class BrowserUseTool(BaseTool, Generic[Context]):
         Returns:
             ToolResult with the action's output or error
         """
-        async with self.lock:
+        async with AsyncExitStack() as lease:
             try:
-                context = await self._ensure_browser_initialized()
+                # Each tool instance browses in its own pooled context
+                context = await lease.enter_async_context(
+                    self.pool.session(self.session_id)
+                )
+                await self._bind_context(context)
 
                 # Get max content length from config
                 max_content_length = getattr(
@@ -379,16 +387,16 @@ class BrowserUseTool(BaseTool, Generic[Context]):
                         )
 
                     page = await context.get_current_page()
-                    import markdownify
-
-                    content = markdownify.markdownify(await page.content())
+                    content = await self._extract_page_content(
+                        page, goal, max_content_length
+                    )
 
                     prompt = f"""\
 Your task is to extract the content of the page. You will be given a page and a goal, and you should extract all relevant information around this goal from the page. If the goal is vague, summarize the page. Respond in json format.
 Extraction goal: {goal}
 
 Page content:
-{content[:max_content_length]}
+{content}
 """
                     messages = [{"role": "system", "content": prompt}]
 
@@ -457,6 +465,7 @@ Page content:
                 elif action == "open_tab":
                     if not url:
                         return ToolResult(error="URL is required for 'open_tab' action")
+                    await self.pool.make_room_for_tab(context)
                     await context.create_new_tab(url)
                     return ToolResult(output=f"Opened new tab with {url}")
 
@@ -476,16 +485,39 @@ Page content:
             except Exception as e:
                 return ToolResult(error=f"Browser action '{action}' failed: {str(e)}")
 
+    async def _extract_page_content(
+        self, page, goal: str, max_content_length: int
+    ) -> str:
+        """Return the parts of the page most relevant to the goal.
+
+        Visible text is pruned and chunked in the browser and the best
+        chunks are selected within `extract_token_budget`. Falls back to
+        markdown of the whole page truncated to `max_content_length`.
+        """
+        token_budget = getattr(config.browser_config, "extract_token_budget", 1000)
+        try:
+            content = await self.dom_extractor.extract(
+                page, goal, token_budget, self.llm.count_tokens
+            )
+            if content:
+                return content
+        except Exception as e:
+            logger.warning(f"DOM extraction failed, falling back to markdown: {e}")
+
+        import markdownify
+
+        return markdownify.markdownify(await page.content())[:max_content_length]
+
     async def get_current_state(
         self, context: Optional[BrowserContext] = None
     ) -> ToolResult:
         """
         Get the current browser state as a ToolResult.
-        If context is not provided, uses self.context.
+        If context is not provided, uses this session's pooled context.
         """
         try:
-            # Use provided context or fall back to self.context
-            ctx = context or self.context
+            # Use provided context or fall back to the session's context
+            ctx = context or self.pool.get_context(self.session_id)
             if not ctx:
                 return ToolResult(error="Browser context not initialized")
 
@@ -504,11 +536,26 @@ Page content:
             await page.bring_to_front()
             await page.wait_for_load_state()
 
-            screenshot = await page.screenshot(
-                full_page=True, animations="disabled", type="jpeg", quality=100
+            interactive_elements = (
+                state.element_tree.clickable_elements_to_string()
+                if state.element_tree
+                else ""
             )
-
-            screenshot = base64.b64encode(screenshot).decode("utf-8")
+            screenshot = await self._capture_screenshot(page)
+            screenshot_note = None
+            if screenshot is not None:
+                # Only an exact repeat is skipped; any pixel, element or URL
+                # change sends a new screenshot
+                fingerprint = _page_fingerprint(
+                    state.url, interactive_elements, screenshot
+                )
+                dedup = getattr(config.browser_config, "screenshot_dedup", True)
+                if dedup and fingerprint == self.last_screenshot:
+                    screenshot = None
+                    screenshot_note = "Page looks unchanged; see the previous screenshot."
+                else:
+                    self.last_screenshot = fingerprint
+                    screenshot = base64.b64encode(screenshot).decode("utf-8")
 
             # Build the state info with all required fields
             state_info = {
@@ -516,11 +563,7 @@ Page content:
                 "title": state.title,
                 "tabs": [tab.model_dump() for tab in state.tabs],
                 "help": "[0], [1], [2], etc., represent clickable indices corresponding to the elements listed. Clicking on these indices will navigate to or interact with the respective content behind them.",
-                "interactive_elements": (
-                    state.element_tree.clickable_elements_to_string()
-                    if state.element_tree
-                    else ""
-                ),
+                "interactive_elements": interactive_elements,
                 "scroll_info": {
                     "pixels_above": getattr(state, "pixels_above", 0),
                     "pixels_below": getattr(state, "pixels_below", 0),
@@ -530,6 +573,8 @@ Page content:
                 },
                 "viewport_height": viewport_height,
             }
+            if screenshot_note:
+                state_info["screenshot"] = screenshot_note
 
             return ToolResult(
                 output=json.dumps(state_info, indent=4, ensure_ascii=False),
@@ -538,26 +583,72 @@ Page content:
         except Exception as e:
             return ToolResult(error=f"Failed to get browser state: {str(e)}")
 
-    async def cleanup(self):
-        """Clean up browser resources."""
-        async with self.lock:
-            if self.context is not None:
-                await self.context.close()
-                self.context = None
-                self.dom_service = None
-            if self.browser is not None:
-                await self.browser.close()
-                self.browser = None
-
-    def __del__(self):
-        """Ensure cleanup when object is destroyed."""
-        if self.browser is not None or self.context is not None:
+    async def _capture_screenshot(self, page) -> Optional[bytes]:
+        """
+        Capture a JPEG screenshot according to the browser screenshot settings.
+
+        The capture is cropped to the image token budget and downscaled in the
+        browser to the resolution the model would see anyway.
+        """
+        browser_config = config.browser_config
+        mode = getattr(browser_config, "screenshot_mode", "full_page")
+        if mode == "none":
+            return None
+        quality = getattr(browser_config, "screenshot_quality", 80)
+        max_tokens = getattr(browser_config, "screenshot_max_tokens", 1445)
+
+        geometry = await page.evaluate(_PAGE_GEOMETRY_JS)
+        full_page = mode == "full_page"
+        if full_page:
+            x, y = 0, 0
+            width, height = geometry["width"], geometry["height"]
+        else:
+            x, y = geometry["scrollX"], geometry["scrollY"]
+            width, height = geometry["viewportWidth"], geometry["viewportHeight"]
+        height, scale = TokenCounter.plan_image_capture(width, height, max_tokens)
+
+        try:
+            cdp = await page.context.new_cdp_session(page)
             try:
-                asyncio.run(self.cleanup())
-            except RuntimeError:
-                loop = asyncio.new_event_loop()
-                loop.run_until_complete(self.cleanup())
-                loop.close()
+                result = await cdp.send(
+                    "Page.captureScreenshot",
+                    {
+                        "format": "jpeg",
+                        "quality": quality,
+                        "clip": {
+                            "x": x,
+                            "y": y,
+                            "width": width,
+                            "height": height,
+                            "scale": scale,
+                        },
+                        "captureBeyondViewport": full_page,
+                    },
+                )
+            finally:
+                await cdp.detach()
+            return base64.b64decode(result["data"])
+        except Exception as e:
+            # Non-Chromium browsers have no CDP; capture at CSS pixels and
+            # downscale afterwards. page.screenshot clips are relative to the
+            # viewport (or to the page with full_page), so no scroll offset.
+            logger.debug(f"CDP screenshot failed, using page.screenshot: {e}")
+            image = await page.screenshot(
+                full_page=full_page,
+                clip={"x": 0, "y": 0, "width": width, "height": height},
+                animations="disabled",
+                scale="css",
+                type="jpeg",
+                quality=quality,
+            )
+            return await asyncio.to_thread(_downscale_jpeg, image, scale, quality)
+
+    async def cleanup(self):
+        """Release this session's browser context; the shared browser closes with the last one."""
+        if self.context is not None:
+            await self.pool.release(self.session_id)
+            self.context = None
+            self.dom_service = None
 
     @classmethod
     def create_with_context(cls, context: Context) -> "BrowserUseTool[Context]":
@@ -0,0 +1,256 @@
+import asyncio
+import itertools
+import json
+import os
+import time
+from contextlib import suppress
+from typing import Any, Dict, List, Optional, Sequence
+
+from app.logger import logger
+
+
+class ChartWorkerError(RuntimeError):
+    """Raised when the chart worker process fails or stops responding."""
+
+
+class ChartWorker:
+    """Long-lived Node process rendering VMind charts.
+
+    Starting `ts-node` compiles the TypeScript and boots Node, which takes
+    seconds; the worker pays that once and then serves requests over a
+    line-delimited JSON protocol on stdin/stdout (see `runWorker` in
+    src/chartVisualize.ts). Requests are correlated by id, so several
+    batches can be in flight at once.
+
+    The process is started lazily, pinged before use after being idle, and
+    restarted when it crashes or hangs.
+    """
+
+    def __init__(
+        self,
+        command: Sequence[str] = ("npx", "ts-node", "src/chartVisualize.ts", "--worker"),
+        cwd: Optional[str] = None,
+        request_timeout: float = 600.0,
+        ping_timeout: float = 10.0,
+        health_check_interval: float = 60.0,
+    ):
+        """Initializes the worker without starting it.
+
+        Args:
+            command: Command starting the worker process.
+            cwd: Working directory of the process, defaults to this package.
+            request_timeout: Seconds to wait for a batch to render.
+            ping_timeout: Seconds to wait for a health check reply.
+            health_check_interval: Idle seconds after which the worker is
+                pinged before the next request.
+        """
+        self.command = list(command)
+        self.cwd = cwd or os.path.dirname(__file__)
+        self.request_timeout = request_timeout
+        self.ping_timeout = ping_timeout
+        self.health_check_interval = health_check_interval
+        self._process: Optional[asyncio.subprocess.Process] = None
+        self._tasks: List[asyncio.Task] = []
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._ids = itertools.count(1)
+        self._lock = asyncio.Lock()
+        self._last_reply = 0.0
+
+    @property
+    def running(self) -> bool:
+        """Whether the worker process is alive."""
+        return self._process is not None and self._process.returncode is None
+
+    async def render(self, requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Renders a batch of charts in one round trip.
+
+        Args:
+            requests: VMind parameters, one dict per chart.
+
+        Returns:
+            One result per request, in order; failures are reported as
+            {"error": ...} entries rather than raised.
+        """
+        if not requests:
+            return []
+        process = None
+        try:
+            await self._ensure_healthy()
+            process = self._process
+            try:
+                response = await self._request({"requests": requests})
+            except ChartWorkerError as e:
+                # The worker died under us; a fresh one gets one more try
+                logger.warning(f"Chart worker failed, restarting: {e}")
+                await self._restart(process)
+                process = self._process
+                response = await self._request({"requests": requests})
+        except asyncio.TimeoutError:
+            await self._restart(process)
+            error = f"Chart worker timed out after {self.request_timeout} seconds"
+            return [{"error": error} for _ in requests]
+        except Exception as e:
+            return [{"error": f"Chart worker error: {e}"} for _ in requests]
+
+        results = response.get("results")
+        if not isinstance(results, list) or len(results) != len(requests):
+            error = response.get("error") or "Malformed chart worker response"
+            return [{"error": error} for _ in requests]
+        return [result or {"error": "Empty chart result"} for result in results]
+
+    async def ping(self) -> bool:
+        """Checks that the worker answers within `ping_timeout`."""
+        if not self.running:
+            return False
+        try:
+            response = await self._request({"type": "ping"}, self.ping_timeout)
+            return bool(response.get("pong"))
+        except (asyncio.TimeoutError, ChartWorkerError):
+            return False
+
+    async def _ensure_healthy(self) -> None:
+        """Starts the worker, or restarts it if it stopped answering."""
+        async with self._lock:
+            if not self.running:
+                await self._start()
+                return
+        idle = time.monotonic() - self._last_reply
+        process = self._process
+        if idle > self.health_check_interval and not await self.ping():
+            logger.warning("Chart worker did not answer a ping, restarting")
+            await self._restart(process)
+
+    async def _start(self) -> None:
+        """Launches the worker process and its reader tasks."""
+        logger.info(f"Starting chart worker: {' '.join(self.command)}")
+        self._process = await asyncio.create_subprocess_exec(
+            *self.command,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            cwd=self.cwd,
+            limit=16 * 1024 * 1024,
+        )
+        self._last_reply = time.monotonic()
+        self._tasks = [
+            asyncio.create_task(self._read_responses(self._process)),
+            asyncio.create_task(self._drain_stderr(self._process)),
+        ]
+
+    async def _restart(
+        self, failed: Optional[asyncio.subprocess.Process] = None
+    ) -> None:
+        """Replaces the worker process.
+
+        Args:
+            failed: The process that misbehaved; if another caller already
+                replaced it, the running worker is kept.
+        """
+        async with self._lock:
+            if failed is not None and self._process is not failed and self.running:
+                return
+            await self._stop()
+            await self._start()
+
+    async def _request(
+        self, message: Dict[str, Any], timeout: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """Sends a message and waits for the response with the same id.
+
+        Raises:
+            ChartWorkerError: If the worker is not running or exits.
+            asyncio.TimeoutError: If no response arrives in time.
+        """
+        process = self._process
+        if process is None or process.returncode is not None:
+            raise ChartWorkerError("Chart worker is not running")
+
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        line = json.dumps({"id": request_id, **message}, ensure_ascii=False) + "\n"
+        try:
+            process.stdin.write(line.encode("utf-8"))
+            await process.stdin.drain()
+            return await asyncio.wait_for(future, timeout or self.request_timeout)
+        except (BrokenPipeError, ConnectionResetError) as e:
+            raise ChartWorkerError(f"Chart worker pipe closed: {e}")
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def _read_responses(self, process: asyncio.subprocess.Process) -> None:
+        """Resolves pending requests from the worker's stdout.
+
+        If stdout cannot be read (e.g. a response over the stream limit) the
+        worker is killed, so its pending requests fail right away and the
+        next render starts a fresh process.
+        """
+        try:
+            while True:
+                line = await process.stdout.readline()
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    logger.debug(f"Chart worker: {line.decode(errors='replace')}")
+                    continue
+                if not isinstance(message, dict):
+                    continue
+                self._last_reply = time.monotonic()
+                future = self._pending.get(message.get("id"))
+                if future is not None and not future.done():
+                    future.set_result(message)
+        except Exception as e:
+            logger.error(f"Failed to read chart worker output, killing it: {e}")
+            if process.returncode is None:
+                with suppress(ProcessLookupError):
+                    process.kill()
+        finally:
+            returncode = await process.wait()
+            # Only fail requests sent to this process, not to a replacement
+            if process is self._process:
+                for future in self._pending.values():
+                    if not future.done():
+                        future.set_exception(
+                            ChartWorkerError(
+                                f"Chart worker exited with code {returncode}"
+                            )
+                        )
+
+    @staticmethod
+    async def _drain_stderr(process: asyncio.subprocess.Process) -> None:
+        """Forwards worker logs so a full stderr pipe cannot block it.
+
+        Reads in chunks rather than lines, so no line is too long to drain.
+        """
+        while True:
+            chunk = await process.stderr.read(64 * 1024)
+            if not chunk:
+                break
+            logger.debug(f"Chart worker: {chunk.decode(errors='replace').rstrip()}")
+
+    async def _stop(self) -> None:
+        """Terminates the worker process."""
+        process, self._process = self._process, None
+        if process is not None and process.returncode is None:
+            process.stdin.close()
+            try:
+                await asyncio.wait_for(process.wait(), 5)
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(ChartWorkerError("Chart worker was stopped"))
+
+    async def close(self) -> None:
+        """Stops the worker; the next render starts a new one."""
+        async with self._lock:
+            await self._stop()
+
+
+CHART_WORKER = ChartWorker()
@@ -1,4 +1,3 @@
-import asyncio
 import json
 import os
 from typing import Any, Hashable
@@ -10,6 +9,7 @@ from app.config import config
 from app.llm import LLM
 from app.logger import logger
 from app.tool.base import BaseTool
+from app.tool.chart_visualization.chart_worker import CHART_WORKER, ChartWorker
 
 
 class DataVisualization(BaseTool):
@@ -49,6 +49,10 @@ Outputs:
         "required": ["code"],
     }
     llm: LLM = Field(default_factory=LLM, description="Language model instance")
+    worker: ChartWorker = Field(
+        default_factory=lambda: CHART_WORKER,
+        description="Node worker rendering the charts",
+    )
 
     @model_validator(mode="after")
     def initialize_llm(self):
@@ -111,19 +115,19 @@ Outputs:
                     "chartTitle": item["chartTitle"],
                 }
             )
-        tasks = [
-            self.invoke_vmind(
-                dict_data=item["dict_data"],
-                chart_description=item["chartTitle"],
-                file_name=item["file_name"],
-                output_type=output_type,
-                task_type="visualization",
-                language=language,
-            )
-            for item in data_list
-        ]
-
-        results = await asyncio.gather(*tasks)
+        results = await self.invoke_vmind_batch(
+            [
+                self.vmind_params(
+                    dict_data=item["dict_data"],
+                    chart_description=item["chartTitle"],
+                    file_name=item["file_name"],
+                    output_type=output_type,
+                    task_type="visualization",
+                    language=language,
+                )
+                for item in data_list
+            ]
+        )
         error_list = []
         success_list = []
         for index, result in enumerate(results):
@@ -138,8 +142,9 @@ Outputs:
                     }
                 )
         if len(error_list) > 0:
+            errors = "\n".join(error_list)
             return {
-                "observation": f"# Error chart generated{'\n'.join(error_list)}\n{self.success_output_template(success_list)}",
+                "observation": f"# Error chart generated{errors}\n{self.success_output_template(success_list)}",
                 "success": False,
             }
         else:
@@ -162,16 +167,17 @@ Outputs:
                         "insights_id": item["insights_id"],
                     }
                 )
-        tasks = [
-            self.invoke_vmind(
-                insights_id=item["insights_id"],
-                file_name=item["file_name"],
-                output_type=output_type,
-                task_type="insight",
-            )
-            for item in data_list
-        ]
-        results = await asyncio.gather(*tasks)
+        results = await self.invoke_vmind_batch(
+            [
+                self.vmind_params(
+                    insights_id=item["insights_id"],
+                    file_name=item["file_name"],
+                    output_type=output_type,
+                    task_type="insight",
+                )
+                for item in data_list
+            ]
+        )
         error_list = []
         success_list = []
         for index, result in enumerate(results):
@@ -186,8 +192,9 @@ Outputs:
             else ""
         )
         if len(error_list) > 0:
+            errors = "\n".join(error_list)
             return {
-                "observation": f"# Error in chart insights:{'\n'.join(error_list)}\n{success_template}",
+                "observation": f"# Error in chart insights:{errors}\n{success_template}",
                 "success": False,
             }
         else:
@@ -214,7 +221,7 @@ Outputs:
                 "success": False,
             }
 
-    async def invoke_vmind(
+    def vmind_params(
         self,
         file_name: str,
         output_type: str,
@@ -223,13 +230,13 @@ Outputs:
         dict_data: list[dict[Hashable, Any]] = None,
         chart_description: str = None,
         language: str = "en",
-    ):
+    ) -> dict[str, Any]:
         llm_config = {
             "base_url": self.llm.base_url,
             "model": self.llm.model,
             "api_key": self.llm.api_key,
         }
-        vmind_params = {
+        return {
             "llm_config": llm_config,
             "user_prompt": chart_description,
             "dataset": dict_data,
@@ -240,24 +247,34 @@ Outputs:
             "directory": str(config.workspace_root),
             "language": language,
         }
-        # build async sub process
-        process = await asyncio.create_subprocess_exec(
-            "npx",
-            "ts-node",
-            "src/chartVisualize.ts",
-            stdin=asyncio.subprocess.PIPE,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-            cwd=os.path.dirname(__file__),
+
+    async def invoke_vmind_batch(
+        self, vmind_params: list[dict[str, Any]]
+    ) -> list[dict[str, Any]]:
+        """Render several charts in one round trip to the chart worker."""
+        return await self.worker.render(vmind_params)
+
+    async def invoke_vmind(
+        self,
+        file_name: str,
+        output_type: str,
+        task_type: str,
+        insights_id: list[str] = None,
+        dict_data: list[dict[Hashable, Any]] = None,
+        chart_description: str = None,
+        language: str = "en",
+    ):
+        results = await self.invoke_vmind_batch(
+            [
+                self.vmind_params(
+                    file_name=file_name,
+                    output_type=output_type,
+                    task_type=task_type,
+                    insights_id=insights_id,
+                    dict_data=dict_data,
+                    chart_description=chart_description,
+                    language=language,
+                )
+            ]
         )
-        input_json = json.dumps(vmind_params, ensure_ascii=False).encode("utf-8")
-        try:
-            stdout, stderr = await process.communicate(input_json)
-            stdout_str = stdout.decode("utf-8")
-            stderr_str = stderr.decode("utf-8")
-            if process.returncode == 0:
-                return json.loads(stdout_str)
-            else:
-                return {"error": f"Node.js Error: {stderr_str}"}
-        except Exception as e:
-            return {"error": f"Subprocess Error: {str(e)}"}
+        return results[0]
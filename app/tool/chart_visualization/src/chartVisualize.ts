@@ -1,6 +1,7 @@
 import path from "path";
 import fs from "fs";
-import puppeteer from "puppeteer";
+import readline from "readline";
+import puppeteer, { Browser } from "puppeteer";
 import VMind, { ChartType, DataTable } from "@visactor/vmind";
 import { isString } from "@visactor/vutils";
 
@@ -21,24 +22,46 @@ enum AlgorithmType {
   Volatility = "volatility",
 }
 
+/** Browser shared by all png renders of this process, launched on first use */
+let sharedBrowser: Promise<Browser> | null = null;
+
+const getBrowser = () => {
+  if (!sharedBrowser) {
+    sharedBrowser = puppeteer.launch();
+    sharedBrowser.catch(() => (sharedBrowser = null));
+  }
+  return sharedBrowser;
+};
+
+const closeBrowser = async () => {
+  if (sharedBrowser) {
+    const browser = await sharedBrowser.catch(() => null);
+    sharedBrowser = null;
+    await browser?.close();
+  }
+};
+
 const getBase64 = async (spec: any, width?: number, height?: number) => {
   spec.animation = false;
   width && (spec.width = width);
   height && (spec.height = height);
-  const browser = await puppeteer.launch();
+  const browser = await getBrowser();
   const page = await browser.newPage();
-  await page.setContent(getHtmlVChart(spec, width, height));
+  try {
+    await page.setContent(getHtmlVChart(spec, width, height));
 
-  const dataUrl = await page.evaluate(() => {
-    const canvas: any = document
-      .getElementById("chart-container")
-      ?.querySelector("canvas");
-    return canvas?.toDataURL("image/png");
-  });
+    const dataUrl = await page.evaluate(() => {
+      const canvas: any = document
+        .getElementById("chart-container")
+        ?.querySelector("canvas");
+      return canvas?.toDataURL("image/png");
+    });
 
-  const base64Data = dataUrl.replace(/^data:image\/png;base64,/, "");
-  await browser.close();
-  return Buffer.from(base64Data, "base64");
+    const base64Data = dataUrl.replace(/^data:image\/png;base64,/, "");
+    return Buffer.from(base64Data, "base64");
+  } finally {
+    await page.close();
+  }
 };
 
 const serializeSpec = (spec: any) => {
@@ -321,9 +344,28 @@ async function updateChartWithInsight(
   }
 }
 
-async function executeVMind() {
-  const input = await readStdin();
-  const inputData = JSON.parse(input);
+/** VMind instances by llm config, reused across requests of the worker */
+const vmindCache = new Map<string, VMind>();
+
+const getVMind = (llmConfig: any) => {
+  const { base_url: baseUrl, model, api_key: apiKey } = llmConfig;
+  const key = JSON.stringify([baseUrl, model, apiKey]);
+  let vmind = vmindCache.get(key);
+  if (!vmind) {
+    vmind = new VMind({
+      url: `${baseUrl}/chat/completions`,
+      model,
+      headers: {
+        "api-key": apiKey,
+        Authorization: `Bearer ${apiKey}`,
+      },
+    });
+    vmindCache.set(key, vmind);
+  }
+  return vmind;
+};
+
+async function handleRequest(inputData: any) {
   let res;
   const {
     llm_config,
@@ -338,15 +380,7 @@ async function executeVMind() {
     insights_id: insightsId = [],
     language = "en",
   } = inputData;
-  const { base_url: baseUrl, model, api_key: apiKey } = llm_config;
-  const vmind = new VMind({
-    url: `${baseUrl}/chat/completions`,
-    model,
-    headers: {
-      "api-key": apiKey,
-      Authorization: `Bearer ${apiKey}`,
-    },
-  });
+  const vmind = getVMind(llm_config);
   if (taskType === "visualization") {
     res = await generateChart(vmind, {
       dataset,
@@ -366,7 +400,64 @@ async function executeVMind() {
       insightsId,
     });
   }
+  return res || { error: `Nothing to do for task type: ${taskType}` };
+}
+
+async function executeVMind() {
+  const input = await readStdin();
+  const res = await handleRequest(JSON.parse(input));
+  await closeBrowser();
   console.log(JSON.stringify(res));
 }
 
-executeVMind();
+/**
+ * Long-lived mode used by the Python ChartWorker.
+ * Reads one JSON message per line from stdin and writes one JSON response per
+ * line to stdout, correlated by `id`:
+ *   {"id": 1, "type": "ping"}                -> {"id": 1, "pong": true}
+ *   {"id": 2, "requests": [params, ...]}     -> {"id": 2, "results": [res, ...]}
+ * Requests of a batch are rendered concurrently; results keep their order.
+ */
+function runWorker() {
+  const send = (message: any) =>
+    process.stdout.write(JSON.stringify(message) + "\n");
+  // stdout carries protocol messages only, so route library logging to stderr
+  console.log = console.info = console.debug = console.error;
+
+  const lines = readline.createInterface({ input: process.stdin });
+  lines.on("line", async (line) => {
+    if (!line.trim()) {
+      return;
+    }
+    let message: any;
+    try {
+      message = JSON.parse(line);
+    } catch (error: any) {
+      send({ id: null, error: `Invalid message: ${error}` });
+      return;
+    }
+    const { id, type, requests = [] } = message;
+    if (type === "ping") {
+      send({ id, pong: true });
+      return;
+    }
+    const results = await Promise.all(
+      requests.map((params: any) =>
+        handleRequest(params).catch((error: any) => ({
+          error: error.toString(),
+        }))
+      )
+    );
+    send({ id, results });
+  });
+  lines.on("close", async () => {
+    await closeBrowser();
+    process.exit(0);
+  });
+}
+
+if (process.argv.includes("--worker")) {
+  runWorker();
+} else {
+  executeVMind();
+}
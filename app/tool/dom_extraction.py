@@ -0,0 +1,210 @@
+import math
+import re
+from collections import Counter, OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+# Cheap signature of the current DOM, used to reuse extractions of unchanged pages
+DOM_SIGNATURE_JS = """
+() => {
+    const body = document.body;
+    if (!body) return "";
+    return [location.href, body.getElementsByTagName("*").length, body.textContent.length].join(":");
+}
+"""
+
+# Collects visible, non-boilerplate text blocks in document order
+EXTRACT_BLOCKS_JS = """
+() => {
+    const SKIP = new Set(["SCRIPT", "STYLE", "NOSCRIPT", "TEMPLATE", "SVG", "CANVAS",
+        "IFRAME", "NAV", "HEADER", "FOOTER", "ASIDE", "FORM", "BUTTON", "SELECT"]);
+    const BLOCK = new Set(["P", "LI", "H1", "H2", "H3", "H4", "H5", "H6", "TD", "TH",
+        "PRE", "BLOCKQUOTE", "DT", "DD", "FIGCAPTION", "CAPTION", "SUMMARY"]);
+    const BOILERPLATE = /(^|[\\s_-])(cookie|banner|sidebar|advert|ads?|promo|share|social|breadcrumb|menu|popup|modal|newsletter)([\\s_-]|$)/i;
+    const blocks = [];
+
+    const hidden = (el) => {
+        if (el.hidden || el.getAttribute("aria-hidden") === "true") return true;
+        const style = window.getComputedStyle(el);
+        return style.display === "none" || style.visibility === "hidden" || style.opacity === "0";
+    };
+
+    const directText = (el) => {
+        let text = "";
+        for (const child of el.childNodes) {
+            if (child.nodeType === Node.TEXT_NODE) text += child.textContent;
+        }
+        return text;
+    };
+
+    const walk = (el) => {
+        if (SKIP.has(el.tagName) || hidden(el)) return;
+        const role = el.getAttribute("role");
+        if (role === "navigation" || role === "banner" || role === "contentinfo") return;
+        if (BOILERPLATE.test((el.id || "") + " " + (typeof el.className === "string" ? el.className : ""))) return;
+
+        if (BLOCK.has(el.tagName)) {
+            const text = (el.innerText || "").replace(/\\s+/g, " ").trim();
+            if (text) blocks.push({tag: el.tagName.toLowerCase(), text});
+            return;
+        }
+        const own = directText(el).replace(/\\s+/g, " ").trim();
+        if (own.length > 40) blocks.push({tag: "div", text: own});
+        for (const child of el.children) walk(child);
+    };
+
+    if (document.body) walk(document.body);
+    return blocks;
+}
+"""
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+|[\u3040-\u30ff\u4e00-\u9fff\uac00-\ud7af]")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens; CJK characters count as individual tokens."""
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+def blocks_to_chunks(blocks: List[Dict[str, str]], chunk_words: int = 150) -> List[str]:
+    """Render text blocks as markdown and group them into chunks.
+
+    Each chunk starts with the most recent heading so it stays meaningful
+    when ranked and sent on its own.
+    """
+    chunks: List[str] = []
+    current: List[str] = []
+    words = 0
+    heading = ""
+
+    def flush() -> None:
+        nonlocal current, words
+        if current and current != [heading]:
+            if heading and current[0] != heading:
+                current.insert(0, heading)
+            chunks.append("\n".join(current))
+        current, words = [], 0
+
+    for block in blocks:
+        tag, text = block["tag"], block["text"]
+        if tag[0] == "h" and tag[1:].isdigit():
+            flush()
+            heading = f"{'#' * int(tag[1:])} {text}"
+            current, words = [heading], 0
+            continue
+        if tag == "li":
+            line = f"- {text}"
+        elif tag == "pre":
+            line = f"```\n{text}\n```"
+        elif tag == "blockquote":
+            line = f"> {text}"
+        else:
+            line = text
+        current.append(line)
+        words += len(text.split())
+        if words >= chunk_words:
+            flush()
+    flush()
+    return chunks
+
+
+def bm25_scores(
+    query: str, documents: List[str], k1: float = 1.5, b: float = 0.75
+) -> List[float]:
+    """Score documents against a query with Okapi BM25."""
+    query_terms = set(tokenize(query))
+    if not query_terms or not documents:
+        return [0.0] * len(documents)
+
+    doc_terms = [Counter(tokenize(doc)) for doc in documents]
+    lengths = [sum(terms.values()) for terms in doc_terms]
+    avg_length = sum(lengths) / len(lengths) or 1.0
+    doc_freq = Counter(term for terms in doc_terms for term in query_terms & terms.keys())
+
+    scores = []
+    for terms, length in zip(doc_terms, lengths):
+        score = 0.0
+        for term in query_terms:
+            freq = terms.get(term)
+            if not freq:
+                continue
+            idf = math.log(
+                1 + (len(documents) - doc_freq[term] + 0.5) / (doc_freq[term] + 0.5)
+            )
+            score += idf * freq * (k1 + 1) / (freq + k1 * (1 - b + b * length / avg_length))
+        scores.append(score)
+    return scores
+
+
+def select_chunks(
+    goal: str,
+    chunks: List[str],
+    token_budget: int,
+    count_tokens: Callable[[str], int],
+) -> str:
+    """Pick the chunks most relevant to the goal within a token budget.
+
+    Only matching chunks are taken, by descending BM25 score; when nothing
+    matches (e.g. a vague goal) the page is taken from the top. The result
+    is returned in document order.
+    """
+    scores = bm25_scores(goal, chunks)
+    order = sorted(range(len(chunks)), key=lambda i: (-scores[i], i))
+    if scores and scores[order[0]] > 0:
+        order = [i for i in order if scores[i] > 0]
+
+    selected: List[int] = []
+    used = 0
+    for i in order:
+        tokens = count_tokens(chunks[i])
+        if used + tokens > token_budget:
+            if not selected and tokens:
+                # Always send something: truncate the best chunk to fit
+                ratio = token_budget / tokens
+                return chunks[i][: int(len(chunks[i]) * ratio)]
+            continue
+        selected.append(i)
+        used += tokens
+    return "\n\n".join(chunks[i] for i in sorted(selected))
+
+
+class DomExtractor:
+    """Goal-scoped text extraction for browser pages.
+
+    Visible, non-boilerplate text is collected in the page itself, chunked,
+    and cached per URL and DOM signature; each goal then only ranks the
+    cached chunks and selects the best ones within the token budget.
+    """
+
+    def __init__(self, max_pages: int = 32):
+        self.max_pages = max_pages
+        self._cache: "OrderedDict[Tuple[str, str], List[str]]" = OrderedDict()
+
+    async def get_chunks(self, page) -> List[str]:
+        """Return the page's text chunks, reusing them while the DOM is unchanged."""
+        signature = await page.evaluate(DOM_SIGNATURE_JS)
+        key = (page.url, signature)
+        chunks = self._cache.get(key)
+        if chunks is not None:
+            self._cache.move_to_end(key)
+            return chunks
+
+        blocks = await page.evaluate(EXTRACT_BLOCKS_JS)
+        chunks = blocks_to_chunks(blocks or [])
+        self._cache[key] = chunks
+        while len(self._cache) > self.max_pages:
+            self._cache.popitem(last=False)
+        return chunks
+
+    async def extract(
+        self,
+        page,
+        goal: str,
+        token_budget: int,
+        count_tokens: Callable[[str], int],
+    ) -> Optional[str]:
+        """Return goal-relevant page text within the token budget, or None if empty."""
+        chunks = await self.get_chunks(page)
+        if not chunks:
+            return None
+        return select_chunks(goal, chunks, token_budget, count_tokens)
@@ -1,129 +1,496 @@
+import asyncio
+import time
 from contextlib import AsyncExitStack
-from typing import Dict, List, Optional
+from functools import partial
+from typing import Any, AsyncContextManager, Callable, Dict, List, Optional
 
+import anyio
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.sse import sse_client
 from mcp.client.stdio import stdio_client
-from mcp.types import ListToolsResult, TextContent
-
+from mcp.types import (
+    CallToolResult,
+    ListToolsResult,
+    ServerNotification,
+    TextContent,
+    Tool,
+    ToolListChangedNotification,
+)
+from pydantic import BaseModel, Field
+
+from app.config import MCPServerConfig, config
 from app.logger import logger
 from app.tool.base import BaseTool, ToolResult
 from app.tool.tool_collection import ToolCollection
 
 
+# Errors raised when the transport is closed before a request is written,
+# so the request can be resent on a new connection
+_CONNECTION_CLOSED = (anyio.ClosedResourceError, anyio.BrokenResourceError)
+
+MAX_RECONNECT_DELAY = 30.0
+
+
+class _WatchedReceiveStream:
+    """Receive stream wrapper that signals when the server side goes away.
+
+    ClientSession keeps running after its transport ends, so the connection
+    task watches the stream it reads from to notice a dropped server.
+    """
+
+    def __init__(self, stream, closed: asyncio.Event):
+        self._stream = stream
+        self._closed = closed
+
+    async def receive(self):
+        try:
+            return await self._stream.receive()
+        except (anyio.EndOfStream, *_CONNECTION_CLOSED):
+            self._closed.set()
+            raise
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return await self.receive()
+        except anyio.EndOfStream:
+            raise StopAsyncIteration
+
+    async def aclose(self) -> None:
+        await self._stream.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self._closed.set()
+        await self.aclose()
+
+
+class MCPToolStats(BaseModel):
+    """Latency and error counters for an MCP tool."""
+
+    alpha: float = Field(default=0.3, description="Smoothing factor for new samples")
+    calls: int = Field(default=0, description="Number of calls")
+    errors: int = Field(default=0, description="Number of failed calls")
+    timeouts: int = Field(default=0, description="Number of timed out calls")
+    latency: Optional[float] = Field(
+        default=None, description="Smoothed latency in seconds"
+    )
+    max_latency: float = Field(default=0.0, description="Slowest call in seconds")
+    last_error: Optional[str] = Field(default=None, description="Most recent error")
+
+    def record(
+        self, latency: float, error: Optional[str] = None, timed_out: bool = False
+    ) -> None:
+        """Records a call."""
+        self.calls += 1
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency += self.alpha * (latency - self.latency)
+        self.max_latency = max(self.max_latency, latency)
+        if timed_out:
+            self.timeouts += 1
+        if error is not None:
+            self.errors += 1
+            self.last_error = error
+
+
 class MCPClientTool(BaseTool):
     """Represents a tool proxy that can be called on the MCP server from the client side."""
 
     session: Optional[ClientSession] = None
     server_id: str = ""  # Add server identifier
     original_name: str = ""
+    # MCPClients owning the connection; calls go through it for limits and reconnects
+    client: Optional[Any] = Field(default=None, exclude=True)
+    stats: MCPToolStats = Field(default_factory=MCPToolStats, exclude=True)
 
     async def execute(self, **kwargs) -> ToolResult:
         """Execute the tool by making a remote call to the MCP server."""
         if not self.session:
             return ToolResult(error="Not connected to MCP server")
 
+        start = time.monotonic()
         try:
             logger.info(f"Executing tool: {self.original_name}")
-            result = await self.session.call_tool(self.original_name, kwargs)
+            if self.client is not None:
+                result = await self.client.call_tool(
+                    self.server_id, self.original_name, kwargs
+                )
+            else:
+                result = await self.session.call_tool(self.original_name, kwargs)
             content_str = ", ".join(
                 item.text for item in result.content if isinstance(item, TextContent)
             )
+            self.stats.record(
+                time.monotonic() - start,
+                error=(content_str or "Tool reported an error") if result.isError else None,
+            )
             return ToolResult(output=content_str or "No output returned.")
+        except asyncio.TimeoutError:
+            error = f"Tool {self.original_name} timed out on MCP server {self.server_id}"
+            self.stats.record(time.monotonic() - start, error=error, timed_out=True)
+            return ToolResult(error=error)
         except Exception as e:
+            self.stats.record(time.monotonic() - start, error=str(e))
             return ToolResult(error=f"Error executing tool: {str(e)}")
 
 
 class MCPClients(ToolCollection):
     """
     A collection of tools that connects to multiple MCP servers and manages available tools through the Model Context Protocol.
+
+    Calls to each server are limited to its `max_in_flight` and bounded by its
+    `timeout`; dropped connections are re-established with exponential backoff
+    while the tool proxies (and their names) stay the same.
     """
 
-    sessions: Dict[str, ClientSession] = {}
-    exit_stacks: Dict[str, AsyncExitStack] = {}
     description: str = "MCP client tools for server interaction"
 
     def __init__(self):
         super().__init__()  # Initialize with empty tools list
         self.name = "mcp"  # Keep name for backward compatibility
-
-    async def connect_sse(self, server_url: str, server_id: str = "") -> None:
+        self.sessions: Dict[str, ClientSession] = {}
+        # Each connection is owned by its own task, so transports can be opened
+        # concurrently and closed from any task without cancel scope errors
+        self._connections: Dict[str, asyncio.Task] = {}
+        self._stop_events: Dict[str, asyncio.Event] = {}
+        self._servers: Dict[str, MCPServerConfig] = {}
+        self._transports: Dict[str, Callable[[], AsyncContextManager]] = {}
+        self._limits: Dict[str, asyncio.Semaphore] = {}
+        self._tool_cache: Dict[str, List[Tool]] = {}
+        self._refresh_tasks: Dict[str, asyncio.Task] = {}
+        self._reconnect_tasks: Dict[str, asyncio.Task] = {}
+
+    async def connect_sse(
+        self,
+        server_url: str,
+        server_id: str = "",
+        server_config: Optional[MCPServerConfig] = None,
+    ) -> None:
         """Connect to an MCP server using SSE transport."""
         if not server_url:
             raise ValueError("Server URL is required.")
 
         server_id = server_id or server_url
-
-        # Always ensure clean disconnection before new connection
-        if server_id in self.sessions:
-            await self.disconnect(server_id)
-
-        exit_stack = AsyncExitStack()
-        self.exit_stacks[server_id] = exit_stack
-
-        streams_context = sse_client(url=server_url)
-        streams = await exit_stack.enter_async_context(streams_context)
-        session = await exit_stack.enter_async_context(ClientSession(*streams))
-        self.sessions[server_id] = session
-
-        await self._initialize_and_list_tools(server_id)
+        await self._connect(
+            server_id,
+            lambda: sse_client(url=server_url),
+            server_config or MCPServerConfig(type="sse", url=server_url),
+        )
 
     async def connect_stdio(
-        self, command: str, args: List[str], server_id: str = ""
+        self,
+        command: str,
+        args: List[str],
+        server_id: str = "",
+        server_config: Optional[MCPServerConfig] = None,
     ) -> None:
         """Connect to an MCP server using stdio transport."""
         if not command:
             raise ValueError("Server command is required.")
 
         server_id = server_id or command
+        server_params = StdioServerParameters(command=command, args=args)
+        await self._connect(
+            server_id,
+            lambda: stdio_client(server_params),
+            server_config or MCPServerConfig(type="stdio", command=command, args=args),
+        )
 
+    async def connect_all(
+        self, servers: Optional[Dict[str, MCPServerConfig]] = None
+    ) -> Dict[str, Optional[Exception]]:
+        """Connect to several MCP servers concurrently.
+
+        Servers default to those configured in config/mcp.json. A server that
+        fails to connect is logged and skipped; the others stay connected.
+
+        Returns:
+            Mapping of server id to the connection error, or None on success.
+        """
+        if servers is None:
+            servers = config.mcp_config.servers if config.mcp_config else {}
+
+        async def connect(server_id: str, server: MCPServerConfig) -> None:
+            if server.type == "sse":
+                await self.connect_sse(server.url, server_id, server)
+            elif server.type == "stdio":
+                await self.connect_stdio(server.command, server.args, server_id, server)
+            else:
+                raise ValueError(f"Unsupported MCP server type: {server.type}")
+
+        results = await asyncio.gather(
+            *(connect(sid, server) for sid, server in servers.items()),
+            return_exceptions=True,
+        )
+        errors: Dict[str, Optional[Exception]] = {}
+        for server_id, result in zip(servers, results):
+            if isinstance(result, BaseException):
+                logger.error(f"Failed to connect to MCP server {server_id}: {result}")
+                errors[server_id] = result
+            else:
+                errors[server_id] = None
+        return errors
+
+    async def _connect(
+        self,
+        server_id: str,
+        open_transport: Callable[[], AsyncContextManager],
+        server: MCPServerConfig,
+    ) -> None:
+        """Register a server, open its connection and list its tools."""
         # Always ensure clean disconnection before new connection
-        if server_id in self.sessions:
+        if server_id in self._servers:
             await self.disconnect(server_id)
 
-        exit_stack = AsyncExitStack()
-        self.exit_stacks[server_id] = exit_stack
-
-        server_params = StdioServerParameters(command=command, args=args)
-        stdio_transport = await exit_stack.enter_async_context(
-            stdio_client(server_params)
+        self._servers[server_id] = server
+        self._transports[server_id] = open_transport
+        self._limits[server_id] = asyncio.Semaphore(server.max_in_flight)
+        try:
+            await self._open(server_id)
+            await self._initialize_and_list_tools(server_id)
+        except BaseException:
+            await self.disconnect(server_id)
+            raise
+
+    async def _open(self, server_id: str) -> ClientSession:
+        """Start the task owning the server's connection and wait until it is ready."""
+        ready = asyncio.get_running_loop().create_future()
+        stop = asyncio.Event()
+        self._stop_events[server_id] = stop
+        self._connections[server_id] = asyncio.create_task(
+            self._serve(server_id, self._transports[server_id], ready, stop)
         )
-        read, write = stdio_transport
-        session = await exit_stack.enter_async_context(ClientSession(read, write))
+        session = await ready
         self.sessions[server_id] = session
-
-        await self._initialize_and_list_tools(server_id)
+        return session
+
+    async def _close_connection(self, server_id: str) -> None:
+        """Stop the task owning the server's connection and wait for it to close."""
+        stop = self._stop_events.pop(server_id, None)
+        if stop is not None:
+            stop.set()
+        task = self._connections.pop(server_id, None)
+        if task is not None:
+            await task
+        self.sessions.pop(server_id, None)
+
+    async def _serve(
+        self,
+        server_id: str,
+        open_transport: Callable[[], AsyncContextManager],
+        ready: asyncio.Future,
+        stop: asyncio.Event,
+    ) -> None:
+        """Hold a server connection open until it is stopped or drops."""
+        closed = asyncio.Event()
+        try:
+            async with AsyncExitStack() as exit_stack:
+                read, write = await exit_stack.enter_async_context(open_transport())
+                session = await exit_stack.enter_async_context(
+                    ClientSession(
+                        _WatchedReceiveStream(read, closed),
+                        write,
+                        message_handler=self._message_handler(server_id),
+                    )
+                )
+                await session.initialize()
+                ready.set_result(session)
+
+                waiters = [
+                    asyncio.ensure_future(stop.wait()),
+                    asyncio.ensure_future(closed.wait()),
+                ]
+                try:
+                    await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+                finally:
+                    for waiter in waiters:
+                        waiter.cancel()
+                if not stop.is_set():
+                    raise ConnectionError("transport closed by the server")
+        except Exception as e:
+            if not ready.done():
+                ready.set_exception(e)
+            elif not stop.is_set():
+                logger.warning(f"Connection to MCP server {server_id} dropped: {e}")
+                self._connection_lost(server_id, ready.result())
+        finally:
+            if not ready.done():
+                ready.set_exception(
+                    ConnectionError(f"Connection to MCP server {server_id} was cancelled")
+                )
+
+    def _connection_lost(self, server_id: str, session: ClientSession) -> None:
+        """Forget a dropped session and start reconnecting in the background."""
+        if self.sessions.get(server_id) is session:
+            self.sessions.pop(server_id)
+        server = self._servers.get(server_id)
+        if server is not None and server.reconnect_attempts:
+            self._reconnect(server_id)
+
+    def _reconnect(self, server_id: str) -> asyncio.Task:
+        """Return the server's reconnect task, starting one if none is running.
+
+        Concurrent callers share one reconnect; they should await it through
+        asyncio.shield so a caller's timeout does not abort it.
+        """
+        task = self._reconnect_tasks.get(server_id)
+        if task is None or task.done():
+            task = asyncio.create_task(self._reconnect_with_backoff(server_id))
+            task.add_done_callback(partial(self._reconnect_done, server_id))
+            self._reconnect_tasks[server_id] = task
+        return task
+
+    def _reconnect_done(self, server_id: str, task: asyncio.Task) -> None:
+        """Log a reconnect that gave up; the server stays down until the next call.
+
+        Background reconnects have no awaiting caller, so their failure is
+        retrieved here instead of surfacing as an unretrieved task exception.
+        """
+        if task.cancelled():
+            return
+        error = task.exception()
+        if error is not None:
+            self.sessions.pop(server_id, None)
+            logger.error(f"MCP server {server_id} is down: {error}")
+
+    async def _reconnect_with_backoff(self, server_id: str) -> ClientSession:
+        """Re-open a server connection, retrying with exponential backoff.
+
+        The existing tool proxies are updated in place, so tool names and
+        statistics survive the reconnect.
+        """
+        server = self._servers[server_id]
+        delay = server.reconnect_delay
+        for attempt in range(1, server.reconnect_attempts + 1):
+            await self._close_connection(server_id)
+            try:
+                session = await self._open(server_id)
+                await self._list_server_tools(server_id)
+                logger.info(f"Reconnected to MCP server {server_id}")
+                return session
+            except Exception as e:
+                logger.warning(
+                    f"Reconnect {attempt}/{server.reconnect_attempts} to MCP server {server_id} failed: {e}"
+                )
+                if attempt == server.reconnect_attempts:
+                    raise ConnectionError(
+                        f"Could not reconnect to MCP server {server_id}: {e}"
+                    ) from e
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, MAX_RECONNECT_DELAY)
+        raise ConnectionError(f"Reconnecting to MCP server {server_id} is disabled")
+
+    async def call_tool(
+        self, server_id: str, name: str, arguments: Dict[str, Any]
+    ) -> CallToolResult:
+        """Call a tool on a server within its in-flight limit and deadline.
+
+        Waiting for a free slot counts towards the deadline. A call that hits
+        a closed connection is resent once after reconnecting.
+
+        Raises:
+            asyncio.TimeoutError: If the call does not finish within the server's timeout.
+            ConnectionError: If the server is not connected and cannot be reconnected.
+        """
+        server = self._servers.get(server_id)
+        if server is None:
+            raise ConnectionError(f"MCP server {server_id} is not connected")
+
+        async def call() -> CallToolResult:
+            async with self._limits[server_id]:
+                session = self.sessions.get(server_id)
+                if session is None:
+                    session = await asyncio.shield(self._reconnect(server_id))
+                try:
+                    return await session.call_tool(name, arguments)
+                except _CONNECTION_CLOSED:
+                    if not server.reconnect_attempts:
+                        raise
+                    current = self.sessions.get(server_id)
+                    if current is None or current is session:
+                        current = await asyncio.shield(self._reconnect(server_id))
+                    return await current.call_tool(name, arguments)
+
+        return await asyncio.wait_for(call(), server.timeout)
+
+    def _message_handler(self, server_id: str):
+        """Build a session message handler that tracks tool list changes."""
+
+        async def handle(message) -> None:
+            if isinstance(message, ServerNotification) and isinstance(
+                message.root, ToolListChangedNotification
+            ):
+                # Listing from inside the receive loop would deadlock, so refresh
+                # in the background; repeated notifications share one refresh
+                task = self._refresh_tasks.get(server_id)
+                if task is None or task.done():
+                    self._refresh_tasks[server_id] = asyncio.create_task(
+                        self._refresh_server_tools(server_id)
+                    )
+
+        return handle
+
+    async def _refresh_server_tools(self, server_id: str) -> None:
+        """Re-list a server's tools after it reported a change."""
+        try:
+            await self._list_server_tools(server_id)
+            logger.info(f"Refreshed tools of MCP server {server_id}")
+        except Exception as e:
+            logger.warning(f"Failed to refresh tools of MCP server {server_id}: {e}")
 
     async def _initialize_and_list_tools(self, server_id: str) -> None:
-        """Initialize session and populate tool map."""
-        session = self.sessions.get(server_id)
-        if not session:
+        """Populate the tool map from the server's tool listing."""
+        if server_id not in self.sessions:
             raise RuntimeError(f"Session not initialized for server {server_id}")
 
-        await session.initialize()
+        tools = await self._list_server_tools(server_id)
+        logger.info(
+            f"Connected to server {server_id} with tools: {[tool.name for tool in tools]}"
+        )
+
+    async def _list_server_tools(self, server_id: str) -> List[Tool]:
+        """Fetch a server's tools, cache them and update its tool proxies."""
+        session = self.sessions[server_id]
         response = await session.list_tools()
+        self._tool_cache[server_id] = response.tools
 
-        # Create proper tool objects for each server tool
+        existing = {k: v for k, v in self.tool_map.items() if v.server_id == server_id}
+        self.tool_map = {
+            k: v for k, v in self.tool_map.items() if v.server_id != server_id
+        }
         for tool in response.tools:
             original_name = tool.name
             tool_name = f"mcp_{server_id}_{original_name}"
             tool_name = self._sanitize_tool_name(tool_name)
 
-            server_tool = MCPClientTool(
-                name=tool_name,
-                description=tool.description,
-                parameters=tool.inputSchema,
-                session=session,
-                server_id=server_id,
-                original_name=original_name,
-            )
+            # Reuse proxies so names stay stable and stats survive refreshes
+            server_tool = existing.get(tool_name)
+            if server_tool is None:
+                server_tool = MCPClientTool(
+                    name=tool_name,
+                    description=tool.description,
+                    parameters=tool.inputSchema,
+                    session=session,
+                    server_id=server_id,
+                    original_name=original_name,
+                    client=self,
+                )
+            else:
+                server_tool.description = tool.description
+                server_tool.parameters = tool.inputSchema
+                server_tool.session = session
+                server_tool.original_name = original_name
             self.tool_map[tool_name] = server_tool
 
         # Update tools tuple
         self.tools = tuple(self.tool_map.values())
-        logger.info(
-            f"Connected to server {server_id} with tools: {[tool.name for tool in response.tools]}"
-        )
+        return response.tools
 
     def _sanitize_tool_name(self, name: str) -> str:
         """Sanitize tool name to match MCPClientTool requirements."""
@@ -144,36 +511,60 @@ class MCPClients(ToolCollection):
 
         return sanitized
 
-    async def list_tools(self) -> ListToolsResult:
-        """List all available tools."""
+    async def list_tools(self, refresh: bool = False) -> ListToolsResult:
+        """List all available tools.
+
+        Listings are cached per server and kept current through tools/list_changed
+        notifications; pass refresh=True to re-fetch every server concurrently.
+        A server that fails to answer is logged and keeps its cached listing.
+        """
+        if refresh:
+            server_ids = list(self.sessions)
+            results = await asyncio.gather(
+                *(self._list_server_tools(sid) for sid in server_ids),
+                return_exceptions=True,
+            )
+            # A failing server keeps its last listing; the others are refreshed
+            for server_id, result in zip(server_ids, results):
+                if isinstance(result, BaseException):
+                    logger.warning(
+                        f"Failed to list tools of MCP server {server_id}: {result}"
+                    )
         tools_result = ListToolsResult(tools=[])
-        for session in self.sessions.values():
-            response = await session.list_tools()
-            tools_result.tools += response.tools
+        for server_id in self._servers:
+            tools_result.tools += self._tool_cache.get(server_id, [])
         return tools_result
 
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return latency and error statistics for each MCP tool."""
+        return {
+            name: {
+                "server_id": tool.server_id,
+                "connected": tool.server_id in self.sessions,
+                **tool.stats.model_dump(exclude={"alpha"}),
+            }
+            for name, tool in self.tool_map.items()
+            if isinstance(tool, MCPClientTool)
+        }
+
     async def disconnect(self, server_id: str = "") -> None:
         """Disconnect from a specific MCP server or all servers if no server_id provided."""
         if server_id:
-            if server_id in self.sessions:
+            if server_id in self._servers:
                 try:
-                    exit_stack = self.exit_stacks.get(server_id)
-
-                    # Close the exit stack which will handle session cleanup
-                    if exit_stack:
-                        try:
-                            await exit_stack.aclose()
-                        except RuntimeError as e:
-                            if "cancel scope" in str(e).lower():
-                                logger.warning(
-                                    f"Cancel scope error during disconnect from {server_id}, continuing with cleanup: {e}"
-                                )
-                            else:
-                                raise
+                    for tasks in (self._reconnect_tasks, self._refresh_tasks):
+                        task = tasks.pop(server_id, None)
+                        if task is not None:
+                            task.cancel()
+
+                    # Let the owning task close the session and transport
+                    await self._close_connection(server_id)
 
                     # Clean up references
-                    self.sessions.pop(server_id, None)
-                    self.exit_stacks.pop(server_id, None)
+                    self._servers.pop(server_id, None)
+                    self._transports.pop(server_id, None)
+                    self._limits.pop(server_id, None)
+                    self._tool_cache.pop(server_id, None)
 
                     # Remove tools associated with this server
                     self.tool_map = {
@@ -186,9 +577,10 @@ class MCPClients(ToolCollection):
                 except Exception as e:
                     logger.error(f"Error disconnecting from server {server_id}: {e}")
         else:
-            # Disconnect from all servers in a deterministic order
-            for sid in sorted(list(self.sessions.keys())):
-                await self.disconnect(sid)
+            # Disconnect from all servers concurrently
+            await asyncio.gather(
+                *(self.disconnect(sid) for sid in sorted(self._servers))
+            )
             self.tool_map = {}
             self.tools = tuple()
             logger.info("Disconnected from all MCP servers")
@@ -0,0 +1,307 @@
+import json
+import os
+import sqlite3
+import time
+from typing import Any, Dict, List, Optional
+
+from app.config import WORKSPACE_ROOT, config
+from app.logger import logger
+
+
+def _is_busy(error: sqlite3.Error) -> bool:
+    """Whether an error means another connection holds the database lock."""
+    code = getattr(error, "sqlite_errorcode", None)
+    if code is not None:
+        return (code & 0xFF) in (sqlite3.SQLITE_BUSY, sqlite3.SQLITE_LOCKED)
+    return isinstance(error, sqlite3.OperationalError) and "locked" in str(error)
+
+
+class PlanStore:
+    """Persistence backend for PlanningTool plans and step results.
+
+    Plans are exchanged as plain dicts (see `Plan.to_dict`). This base class
+    keeps nothing beyond the tool's own in-memory plans and is used when
+    persistence is disabled; subclasses make plans survive restarts.
+
+    Step results are stored with the text of the step that produced them,
+    so a result is only reused while the step is unchanged.
+    """
+
+    def load_plan(self, plan_id: str) -> Optional[Dict[str, Any]]:
+        """Returns a stored plan, or None if there is none."""
+        return None
+
+    def list_plans(self) -> List[str]:
+        """Returns the IDs of all stored plans."""
+        return []
+
+    def save_plan(self, plan: Dict[str, Any]) -> None:
+        """Stores a whole plan, replacing its previous steps."""
+
+    def save_step(
+        self, plan_id: str, index: int, step: Dict[str, Any], plan_version: int
+    ) -> None:
+        """Stores one step's status and notes."""
+
+    def delete_plan(self, plan_id: str) -> None:
+        """Removes a plan and its step results."""
+
+    def load_result(self, plan_id: str, index: int, text: str) -> Optional[str]:
+        """Returns the stored result of a step, if it was produced by `text`."""
+        return None
+
+    def save_result(self, plan_id: str, index: int, text: str, result: str) -> None:
+        """Stores the result of a step."""
+
+
+class MemoryPlanStore(PlanStore):
+    """Keeps step results for the life of the process only."""
+
+    def __init__(self):
+        self._results: Dict[tuple, tuple] = {}
+
+    def delete_plan(self, plan_id: str) -> None:
+        for key in [key for key in self._results if key[0] == plan_id]:
+            del self._results[key]
+
+    def load_result(self, plan_id: str, index: int, text: str) -> Optional[str]:
+        stored = self._results.get((plan_id, index))
+        return stored[1] if stored and stored[0] == text else None
+
+    def save_result(self, plan_id: str, index: int, text: str, result: str) -> None:
+        self._results[(plan_id, index)] = (text, result)
+
+
+class SQLitePlanStore(PlanStore):
+    """Stores plans in a SQLite database in WAL mode.
+
+    Every write is committed before it returns, so a plan can be resumed
+    after a crash from the last recorded step status. Another process
+    holding the database lock is waited for (`busy_timeout`) and retried;
+    a write that still cannot get the lock is skipped with a warning. Any
+    other database error disables persistence with a warning, and plans
+    live on in memory only.
+    """
+
+    def __init__(self, path: str, busy_timeout: float = 5.0, retries: int = 3):
+        """Opens (and creates if needed) the database.
+
+        Args:
+            path: SQLite database file.
+            busy_timeout: Seconds to wait for a lock held by another connection.
+            retries: Attempts of a write whose lock wait timed out.
+        """
+        self.path = path
+        self.retries = retries
+        self._db: Optional[sqlite3.Connection] = None
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(
+                path, timeout=busy_timeout, isolation_level=None
+            )
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.executescript(
+                "CREATE TABLE IF NOT EXISTS plans ("
+                "plan_id TEXT PRIMARY KEY, title TEXT, version INTEGER,"
+                " structure_version INTEGER, has_dependencies INTEGER, updated_at REAL);"
+                "CREATE TABLE IF NOT EXISTS steps ("
+                "plan_id TEXT, idx INTEGER, text TEXT, status TEXT, notes TEXT,"
+                " dependencies TEXT, version INTEGER, PRIMARY KEY (plan_id, idx));"
+                "CREATE TABLE IF NOT EXISTS results ("
+                "plan_id TEXT, idx INTEGER, text TEXT, result TEXT, created_at REAL,"
+                " PRIMARY KEY (plan_id, idx));"
+            )
+        except sqlite3.Error as e:
+            logger.warning(f"Plan persistence disabled ({path}): {e}")
+            self._db = None
+
+    def load_plan(self, plan_id: str) -> Optional[Dict[str, Any]]:
+        if self._db is None:
+            return None
+        try:
+            row = self._db.execute(
+                "SELECT title, version, structure_version, has_dependencies"
+                " FROM plans WHERE plan_id = ?",
+                (plan_id,),
+            ).fetchone()
+            if row is None:
+                return None
+            steps = self._db.execute(
+                "SELECT text, status, notes, dependencies, version"
+                " FROM steps WHERE plan_id = ? ORDER BY idx",
+                (plan_id,),
+            ).fetchall()
+        except sqlite3.Error as e:
+            self._disable(e)
+            return None
+
+        return {
+            "plan_id": plan_id,
+            "title": row[0],
+            "version": row[1],
+            "structure_version": row[2],
+            "has_dependencies": bool(row[3]),
+            "steps": [
+                {
+                    "text": text,
+                    "status": status,
+                    "notes": notes,
+                    "dependencies": json.loads(dependencies),
+                    "version": version,
+                }
+                for text, status, notes, dependencies, version in steps
+            ],
+        }
+
+    def list_plans(self) -> List[str]:
+        if self._db is None:
+            return []
+        try:
+            rows = self._db.execute(
+                "SELECT plan_id FROM plans ORDER BY updated_at"
+            ).fetchall()
+        except sqlite3.Error as e:
+            self._disable(e)
+            return []
+        return [row[0] for row in rows]
+
+    def save_plan(self, plan: Dict[str, Any]) -> None:
+        plan_id = plan["plan_id"]
+        self._transaction(
+            [
+                (
+                    "INSERT OR REPLACE INTO plans VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        plan_id,
+                        plan["title"],
+                        plan["version"],
+                        plan["structure_version"],
+                        int(plan["has_dependencies"]),
+                        time.time(),
+                    ),
+                ),
+                ("DELETE FROM steps WHERE plan_id = ?", (plan_id,)),
+                *(
+                    (
+                        "INSERT INTO steps VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (
+                            plan_id,
+                            index,
+                            step["text"],
+                            step["status"],
+                            step["notes"],
+                            json.dumps(step["dependencies"]),
+                            step["version"],
+                        ),
+                    )
+                    for index, step in enumerate(plan["steps"])
+                ),
+            ]
+        )
+
+    def save_step(
+        self, plan_id: str, index: int, step: Dict[str, Any], plan_version: int
+    ) -> None:
+        self._transaction(
+            [
+                (
+                    "UPDATE steps SET status = ?, notes = ?, version = ?"
+                    " WHERE plan_id = ? AND idx = ?",
+                    (step["status"], step["notes"], step["version"], plan_id, index),
+                ),
+                (
+                    "UPDATE plans SET version = ?, updated_at = ? WHERE plan_id = ?",
+                    (plan_version, time.time(), plan_id),
+                ),
+            ]
+        )
+
+    def delete_plan(self, plan_id: str) -> None:
+        self._transaction(
+            [
+                (f"DELETE FROM {table} WHERE plan_id = ?", (plan_id,))
+                for table in ("plans", "steps", "results")
+            ]
+        )
+
+    def load_result(self, plan_id: str, index: int, text: str) -> Optional[str]:
+        if self._db is None:
+            return None
+        try:
+            row = self._db.execute(
+                "SELECT result FROM results WHERE plan_id = ? AND idx = ? AND text = ?",
+                (plan_id, index, text),
+            ).fetchone()
+        except sqlite3.Error as e:
+            self._disable(e)
+            return None
+        return row[0] if row else None
+
+    def save_result(self, plan_id: str, index: int, text: str, result: str) -> None:
+        self._transaction(
+            [
+                (
+                    "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+                    (plan_id, index, text, result, time.time()),
+                )
+            ]
+        )
+
+    def _transaction(self, statements: List[tuple]) -> None:
+        """Runs statements atomically, retrying while the database is locked."""
+        for attempt in range(1, self.retries + 1):
+            if self._db is None:
+                return
+            try:
+                self._db.execute("BEGIN IMMEDIATE")
+                for sql, params in statements:
+                    self._db.execute(sql, params)
+                self._db.execute("COMMIT")
+                return
+            except sqlite3.Error as e:
+                try:
+                    self._db.execute("ROLLBACK")
+                except sqlite3.Error:
+                    pass
+                if not _is_busy(e):
+                    self._disable(e)
+                    return
+                if attempt == self.retries:
+                    logger.warning(f"Plan store is locked, write skipped: {e}")
+                    return
+                time.sleep(0.05 * attempt)
+
+    def _disable(self, error: sqlite3.Error) -> None:
+        """Turns persistence off after a database error other than a lock."""
+        if _is_busy(error):
+            logger.warning(f"Plan store is locked: {error}")
+            return
+        logger.warning(f"Plan persistence error, disabling: {error}")
+        self._db = None
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+
+_shared_store: Optional[PlanStore] = None
+
+
+def get_plan_store() -> PlanStore:
+    """Return the process-wide plan store selected by the [planning] config."""
+    global _shared_store
+    if _shared_store is None:
+        planning_config = config.planning_config
+        if planning_config.backend == "sqlite":
+            _shared_store = SQLitePlanStore(
+                planning_config.path or str(WORKSPACE_ROOT / ".plans.sqlite")
+            )
+        elif planning_config.backend == "memory":
+            _shared_store = MemoryPlanStore()
+        else:
+            raise ValueError(f"Unknown plan store backend: {planning_config.backend}")
+    return _shared_store
@@ -1,8 +1,11 @@
 # tool/planning.py
-from typing import Dict, List, Literal, Optional
+from typing import Any, Dict, List, Literal, Optional, Set
+
+from pydantic import Field
 
 from app.exceptions import ToolError
 from app.tool.base import BaseTool, ToolResult
+from app.tool.plan_store import PlanStore, get_plan_store
 
 
 _PLANNING_TOOL_DESCRIPTION = """
@@ -10,6 +13,228 @@ A planning tool that allows the agent to create and manage plans for solving com
 The tool provides functionality for creating plans, updating plan steps, and tracking progress.
 """
 
+STEP_STATUSES = ("not_started", "in_progress", "completed", "blocked")
+ACTIVE_STATUSES = ("not_started", "in_progress")
+STATUS_MARKS = {
+    "not_started": "[ ]",
+    "in_progress": "[→]",
+    "completed": "[✓]",
+    "blocked": "[!]",
+}
+
+
+class PlanStep:
+    """A plan step with its status, notes and prerequisites."""
+
+    __slots__ = ("text", "status", "notes", "dependencies", "version")
+
+    def __init__(
+        self,
+        text: str,
+        status: str = "not_started",
+        notes: str = "",
+        dependencies: Optional[List[int]] = None,
+        version: int = 0,
+    ):
+        self.text = text
+        self.status = status
+        self.notes = notes
+        self.dependencies = dependencies or []
+        self.version = version  # Plan version of the step's last change
+
+    def render(self, index: int) -> str:
+        """Format the step as a plan line, with its notes if any."""
+        line = f"{index}. {STATUS_MARKS.get(self.status, '[ ]')} {self.text}"
+        if self.dependencies:
+            line += f" (after {', '.join(str(dep) for dep in self.dependencies)})"
+        line += "\n"
+        if self.notes:
+            line += f"   Notes: {self.notes}\n"
+        return line
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "text": self.text,
+            "status": self.status,
+            "notes": self.notes,
+            "dependencies": self.dependencies,
+            "version": self.version,
+        }
+
+
+class Plan:
+    """A plan with O(1) step updates and maintained status counters.
+
+    Every change bumps the plan version and stamps the changed step, so a
+    reader that remembers the version it last saw can be shown only what
+    changed since (see `render_delta`).
+    """
+
+    __slots__ = (
+        "plan_id",
+        "title",
+        "steps",
+        "counts",
+        "version",
+        "structure_version",
+        "has_dependencies",
+    )
+
+    def __init__(
+        self,
+        plan_id: str,
+        title: str,
+        steps: List[str],
+        dependencies: Optional[List[List[int]]] = None,
+    ):
+        self.plan_id = plan_id
+        self.title = title
+        self.version = 0
+        self.set_steps([PlanStep(text) for text in steps], dependencies)
+
+    def set_steps(
+        self, steps: List[PlanStep], dependencies: Optional[List[List[int]]] = None
+    ) -> None:
+        """Replace the steps; counts as a structural change."""
+        self.version += 1
+        self.structure_version = self.version
+        self.has_dependencies = dependencies is not None
+        for step, deps in zip(steps, dependencies or [[]] * len(steps)):
+            step.dependencies = deps
+            step.version = self.version
+        self.steps = steps
+        self.counts = {status: 0 for status in STEP_STATUSES}
+        for step in steps:
+            self.counts[step.status] += 1
+
+    def set_dependencies(self, dependencies: Optional[List[List[int]]]) -> None:
+        """Replace the step prerequisites, keeping statuses and notes."""
+        self.set_steps(self.steps, dependencies)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Plan":
+        """Rebuild a plan stored with `to_dict`, keeping its versions."""
+        plan = cls.__new__(cls)
+        plan.plan_id = data["plan_id"]
+        plan.title = data["title"]
+        plan.version = 0
+        steps = [
+            PlanStep(step["text"], step["status"], step["notes"])
+            for step in data["steps"]
+        ]
+        dependencies = [step["dependencies"] for step in data["steps"]]
+        plan.set_steps(steps, dependencies if data["has_dependencies"] else None)
+        for step, stored in zip(plan.steps, data["steps"]):
+            step.version = stored["version"]
+        plan.version = data["version"]
+        plan.structure_version = data["structure_version"]
+        return plan
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "plan_id": self.plan_id,
+            "title": self.title,
+            "version": self.version,
+            "structure_version": self.structure_version,
+            "has_dependencies": self.has_dependencies,
+            "steps": [step.to_dict() for step in self.steps],
+        }
+
+    def set_title(self, title: str) -> None:
+        self.title = title
+        self.version += 1
+        self.structure_version = self.version
+
+    def update_step(
+        self, index: int, status: Optional[str] = None, notes: Optional[str] = None
+    ) -> bool:
+        """Set a step's status and/or notes as one change, updating the counters.
+
+        Returns whether anything changed.
+        """
+        step = self.steps[index]
+        status = status or step.status
+        notes = step.notes if notes is None else notes
+        if status == step.status and notes == step.notes:
+            return False
+        self.counts[step.status] -= 1
+        self.counts[status] += 1
+        step.status = status
+        step.notes = notes
+        self.version += 1
+        step.version = self.version
+        return True
+
+    def set_status(self, index: int, status: str) -> None:
+        """Set a step's status, updating the counters."""
+        self.update_step(index, status=status)
+
+    def set_notes(self, index: int, notes: str) -> None:
+        self.update_step(index, notes=notes)
+
+    def ready_steps(self, running: Optional[Set[int]] = None) -> List[int]:
+        """Indices of steps that can start now (see PlanningTool.get_ready_steps)."""
+        running = running or set()
+        active = [
+            i for i, step in enumerate(self.steps) if step.status in ACTIVE_STATUSES
+        ]
+        if not self.has_dependencies:
+            return active[:1] if active and active[0] not in running else []
+        return [
+            i
+            for i in active
+            if i not in running
+            and all(
+                self.steps[dep].status == "completed"
+                for dep in self.steps[i].dependencies
+            )
+        ]
+
+    def progress_line(self) -> str:
+        """One-line progress summary from the counters."""
+        total = len(self.steps)
+        completed = self.counts["completed"]
+        percentage = f"{(completed / total) * 100:.1f}%" if total > 0 else "0%"
+        return f"Progress: {completed}/{total} steps completed ({percentage})\n"
+
+    def render(self) -> str:
+        """Format the whole plan for display."""
+        output = f"Plan: {self.title} (ID: {self.plan_id})\n"
+        output += "=" * len(output) + "\n\n"
+
+        output += self.progress_line()
+        output += (
+            f"Status: {self.counts['completed']} completed, {self.counts['in_progress']} in progress, "
+            f"{self.counts['blocked']} blocked, {self.counts['not_started']} not started\n\n"
+        )
+        output += "Steps:\n"
+
+        # Add each step with its status and notes
+        for i, step in enumerate(self.steps):
+            output += step.render(i)
+
+        return output
+
+    def render_delta(self, since_version: Optional[int]) -> str:
+        """Format only the steps changed after `since_version`.
+
+        Falls back to the whole plan when the reader has not seen it yet or
+        its steps or title changed since.
+        """
+        if since_version is None or since_version < self.structure_version:
+            return self.render()
+
+        output = f"Plan: {self.title} (ID: {self.plan_id})\n"
+        output += self.progress_line()
+        changed = [
+            step.render(i)
+            for i, step in enumerate(self.steps)
+            if step.version > since_version
+        ]
+        if not changed:
+            return output + "No steps changed since your last view.\n"
+        return output + "Steps changed since your last view:\n" + "".join(changed)
+
 
 class PlanningTool(BaseTool):
     """
@@ -48,6 +273,11 @@ class PlanningTool(BaseTool):
                 "type": "array",
                 "items": {"type": "string"},
             },
+            "step_dependencies": {
+                "description": "Optional prerequisites of each step: one list of step indices (0-based) per step, e.g. [[], [], [0, 1]]. Steps whose prerequisites are completed may run in parallel. Without it, steps run in order. Optional for create and update commands.",
+                "type": "array",
+                "items": {"type": "array", "items": {"type": "integer"}},
+            },
             "step_index": {
                 "description": "Index of the step to update (0-based). Required for mark_step command.",
                 "type": "integer",
@@ -66,7 +296,8 @@ class PlanningTool(BaseTool):
         "additionalProperties": False,
     }
 
-    plans: dict = {}  # Dictionary to store plans by plan_id
+    plans: Dict[str, Plan] = Field(default_factory=dict)  # Loaded plans by plan_id
+    store: PlanStore = Field(default_factory=get_plan_store, exclude=True)
     _current_plan_id: Optional[str] = None  # Track the current active plan
 
     async def execute(
@@ -78,6 +309,7 @@ class PlanningTool(BaseTool):
         plan_id: Optional[str] = None,
         title: Optional[str] = None,
         steps: Optional[List[str]] = None,
+        step_dependencies: Optional[List[List[int]]] = None,
         step_index: Optional[int] = None,
         step_status: Optional[
             Literal["not_started", "in_progress", "completed", "blocked"]
@@ -93,15 +325,16 @@ class PlanningTool(BaseTool):
         - plan_id: Unique identifier for the plan
         - title: Title for the plan (used with create command)
         - steps: List of steps for the plan (used with create command)
+        - step_dependencies: Prerequisite step indices of each step (used with create and update commands)
         - step_index: Index of the step to update (used with mark_step command)
         - step_status: Status to set for a step (used with mark_step command)
         - step_notes: Additional notes for a step (used with mark_step command)
         """
 
         if command == "create":
-            return self._create_plan(plan_id, title, steps)
+            return self._create_plan(plan_id, title, steps, step_dependencies)
         elif command == "update":
-            return self._update_plan(plan_id, title, steps)
+            return self._update_plan(plan_id, title, steps, step_dependencies)
         elif command == "list":
             return self._list_plans()
         elif command == "get":
@@ -118,13 +351,17 @@ class PlanningTool(BaseTool):
             )
 
     def _create_plan(
-        self, plan_id: Optional[str], title: Optional[str], steps: Optional[List[str]]
+        self,
+        plan_id: Optional[str],
+        title: Optional[str],
+        steps: Optional[List[str]],
+        step_dependencies: Optional[List[List[int]]] = None,
     ) -> ToolResult:
         """Create a new plan with the given ID, title, and steps."""
         if not plan_id:
             raise ToolError("Parameter `plan_id` is required for command: create")
 
-        if plan_id in self.plans:
+        if self._find_plan(plan_id) is not None:
             raise ToolError(
                 f"A plan with ID '{plan_id}' already exists. Use 'update' to modify existing plans."
             )
@@ -142,14 +379,14 @@ class PlanningTool(BaseTool):
             )
 
         # Create a new plan with initialized step statuses
-        plan = {
-            "plan_id": plan_id,
-            "title": title,
-            "steps": steps,
-            "step_statuses": ["not_started"] * len(steps),
-            "step_notes": [""] * len(steps),
-        }
+        plan = Plan(
+            plan_id,
+            title,
+            steps,
+            self._validate_dependencies(step_dependencies, len(steps)),
+        )
 
+        self.store.save_plan(plan.to_dict())
         self.plans[plan_id] = plan
         self._current_plan_id = plan_id  # Set as active plan
 
@@ -158,19 +395,20 @@ class PlanningTool(BaseTool):
         )
 
     def _update_plan(
-        self, plan_id: Optional[str], title: Optional[str], steps: Optional[List[str]]
+        self,
+        plan_id: Optional[str],
+        title: Optional[str],
+        steps: Optional[List[str]],
+        step_dependencies: Optional[List[List[int]]] = None,
     ) -> ToolResult:
         """Update an existing plan with new title or steps."""
         if not plan_id:
             raise ToolError("Parameter `plan_id` is required for command: update")
 
-        if plan_id not in self.plans:
-            raise ToolError(f"No plan found with ID: {plan_id}")
-
-        plan = self.plans[plan_id]
+        plan = self.get_plan(plan_id)
 
         if title:
-            plan["title"] = title
+            plan.set_title(title)
 
         if steps:
             if not isinstance(steps, list) or not all(
@@ -180,34 +418,151 @@ class PlanningTool(BaseTool):
                     "Parameter `steps` must be a list of strings for command: update"
                 )
 
-            # Preserve existing step statuses for unchanged steps
-            old_steps = plan["steps"]
-            old_statuses = plan["step_statuses"]
-            old_notes = plan["step_notes"]
-
-            # Create new step statuses and notes
-            new_statuses = []
-            new_notes = []
+            # Indices of old dependencies may no longer match the new steps
+            new_dependencies = self._validate_dependencies(
+                step_dependencies, len(steps)
+            )
 
-            for i, step in enumerate(steps):
-                # If the step exists at the same position in old steps, preserve status and notes
-                if i < len(old_steps) and step == old_steps[i]:
-                    new_statuses.append(old_statuses[i])
-                    new_notes.append(old_notes[i])
-                else:
-                    new_statuses.append("not_started")
-                    new_notes.append("")
+            # If the step exists at the same position in old steps, preserve status and notes
+            old_steps = plan.steps
+            new_steps = [
+                PlanStep(text, old_steps[i].status, old_steps[i].notes)
+                if i < len(old_steps) and text == old_steps[i].text
+                else PlanStep(text)
+                for i, text in enumerate(steps)
+            ]
+            plan.set_steps(new_steps, new_dependencies)
+        elif step_dependencies is not None:
+            plan.set_dependencies(
+                self._validate_dependencies(step_dependencies, len(plan.steps))
+            )
 
-            plan["steps"] = steps
-            plan["step_statuses"] = new_statuses
-            plan["step_notes"] = new_notes
+        self.store.save_plan(plan.to_dict())
 
         return ToolResult(
             output=f"Plan updated successfully: {plan_id}\n\n{self._format_plan(plan)}"
         )
 
+    @staticmethod
+    def _validate_dependencies(
+        step_dependencies: Optional[List[List[int]]], step_count: int
+    ) -> Optional[List[List[int]]]:
+        """Check that step dependencies form a DAG over the plan's steps."""
+        if step_dependencies is None:
+            return None
+
+        if len(step_dependencies) != step_count or not all(
+            isinstance(deps, list) and all(isinstance(dep, int) for dep in deps)
+            for deps in step_dependencies
+        ):
+            raise ToolError(
+                "Parameter `step_dependencies` must contain one list of step indices per step"
+            )
+
+        for i, deps in enumerate(step_dependencies):
+            for dep in deps:
+                if dep < 0 or dep >= step_count or dep == i:
+                    raise ToolError(f"Invalid dependency {dep} for step {i}")
+
+        # Kahn's algorithm: every step must become ready eventually
+        remaining = [len(set(deps)) for deps in step_dependencies]
+        dependents: List[List[int]] = [[] for _ in range(step_count)]
+        for i, deps in enumerate(step_dependencies):
+            for dep in set(deps):
+                dependents[dep].append(i)
+        ready = [i for i in range(step_count) if not remaining[i]]
+        resolved = 0
+        while ready:
+            step = ready.pop()
+            resolved += 1
+            for dependent in dependents[step]:
+                remaining[dependent] -= 1
+                if not remaining[dependent]:
+                    ready.append(dependent)
+        if resolved != step_count:
+            raise ToolError("Parameter `step_dependencies` contains a cycle")
+
+        return [sorted(set(deps)) for deps in step_dependencies]
+
+    def get_ready_steps(
+        self, plan_id: str, running: Optional[Set[int]] = None
+    ) -> List[int]:
+        """Return the indices of steps that can start now.
+
+        A step is ready when it is not started or in progress, not already
+        running, and all its dependencies are completed. Plans without
+        dependencies run in order, so only their first active step is ready.
+        """
+        return self.get_plan(plan_id).ready_steps(running)
+
+    def get_plan(self, plan_id: str) -> Plan:
+        """Return a plan for direct, typed access.
+
+        Raises:
+            ToolError: If no plan has the given ID.
+        """
+        plan = self._find_plan(plan_id)
+        if plan is None:
+            raise ToolError(f"No plan found with ID: {plan_id}")
+        return plan
+
+    def has_plan(self, plan_id: str) -> bool:
+        """Whether a plan exists, in memory or in the plan store."""
+        return self._find_plan(plan_id) is not None
+
+    def _find_plan(self, plan_id: str) -> Optional[Plan]:
+        """Look up a plan, loading it from the store on first access."""
+        plan = self.plans.get(plan_id)
+        if plan is None:
+            data = self.store.load_plan(plan_id)
+            if data is not None:
+                plan = self.plans[plan_id] = Plan.from_dict(data)
+        return plan
+
+    def set_step_status(
+        self,
+        plan_id: str,
+        step_index: int,
+        status: Optional[str] = None,
+        notes: Optional[str] = None,
+    ) -> bool:
+        """Update a step without rendering the plan; O(1).
+
+        The change is written to the plan store before it is applied, so a
+        resumed plan never lags behind what callers have already seen.
+        Returns whether anything changed.
+        """
+        plan = self.get_plan(plan_id)
+        step = plan.steps[step_index]
+        status = status or step.status
+        notes = step.notes if notes is None else notes
+        if status == step.status and notes == step.notes:
+            return False
+        version = plan.version + 1
+        self.store.save_step(
+            plan_id,
+            step_index,
+            {"status": status, "notes": notes, "version": version},
+            version,
+        )
+        return plan.update_step(step_index, status, notes)
+
+    def get_step_result(self, plan_id: str, step_index: int) -> Optional[str]:
+        """Return the stored result of a step, if the step has not changed since."""
+        step = self.get_plan(plan_id).steps[step_index]
+        return self.store.load_result(plan_id, step_index, step.text)
+
+    def save_step_result(self, plan_id: str, step_index: int, result: str) -> None:
+        """Store a step's result so it is not recomputed when the plan resumes."""
+        step = self.get_plan(plan_id).steps[step_index]
+        self.store.save_result(plan_id, step_index, step.text, result)
+
     def _list_plans(self) -> ToolResult:
-        """List all available plans."""
+        """List the plans of this session.
+
+        Only plans created or opened through this tool are listed; other
+        plans in a shared store are reachable by their ID but not exposed.
+        """
         if not self.plans:
             return ToolResult(
                 output="No plans available. Create a plan with the 'create' command."
@@ -216,12 +571,8 @@ class PlanningTool(BaseTool):
         output = "Available plans:\n"
         for plan_id, plan in self.plans.items():
             current_marker = " (active)" if plan_id == self._current_plan_id else ""
-            completed = sum(
-                1 for status in plan["step_statuses"] if status == "completed"
-            )
-            total = len(plan["steps"])
-            progress = f"{completed}/{total} steps completed"
-            output += f"• {plan_id}{current_marker}: {plan['title']} - {progress}\n"
+            progress = f"{plan.counts['completed']}/{len(plan.steps)} steps completed"
+            output += f"• {plan_id}{current_marker}: {plan.title} - {progress}\n"
 
         return ToolResult(output=output)
 
@@ -235,10 +586,7 @@ class PlanningTool(BaseTool):
                 )
             plan_id = self._current_plan_id
 
-        if plan_id not in self.plans:
-            raise ToolError(f"No plan found with ID: {plan_id}")
-
-        plan = self.plans[plan_id]
+        plan = self.get_plan(plan_id)
         return ToolResult(output=self._format_plan(plan))
 
     def _set_active_plan(self, plan_id: Optional[str]) -> ToolResult:
@@ -246,12 +594,10 @@ class PlanningTool(BaseTool):
         if not plan_id:
             raise ToolError("Parameter `plan_id` is required for command: set_active")
 
-        if plan_id not in self.plans:
-            raise ToolError(f"No plan found with ID: {plan_id}")
-
+        plan = self.get_plan(plan_id)
         self._current_plan_id = plan_id
         return ToolResult(
-            output=f"Plan '{plan_id}' is now the active plan.\n\n{self._format_plan(self.plans[plan_id])}"
+            output=f"Plan '{plan_id}' is now the active plan.\n\n{self._format_plan(plan)}"
         )
 
     def _mark_step(
@@ -270,34 +616,22 @@ class PlanningTool(BaseTool):
                 )
             plan_id = self._current_plan_id
 
-        if plan_id not in self.plans:
-            raise ToolError(f"No plan found with ID: {plan_id}")
+        plan = self.get_plan(plan_id)
 
         if step_index is None:
             raise ToolError("Parameter `step_index` is required for command: mark_step")
 
-        plan = self.plans[plan_id]
-
-        if step_index < 0 or step_index >= len(plan["steps"]):
+        if step_index < 0 or step_index >= len(plan.steps):
             raise ToolError(
-                f"Invalid step_index: {step_index}. Valid indices range from 0 to {len(plan['steps'])-1}."
+                f"Invalid step_index: {step_index}. Valid indices range from 0 to {len(plan.steps)-1}."
             )
 
-        if step_status and step_status not in [
-            "not_started",
-            "in_progress",
-            "completed",
-            "blocked",
-        ]:
+        if step_status and step_status not in STEP_STATUSES:
             raise ToolError(
                 f"Invalid step_status: {step_status}. Valid statuses are: not_started, in_progress, completed, blocked"
             )
 
-        if step_status:
-            plan["step_statuses"][step_index] = step_status
-
-        if step_notes:
-            plan["step_notes"][step_index] = step_notes
+        self.set_step_status(plan_id, step_index, step_status, step_notes or None)
 
         return ToolResult(
             output=f"Step {step_index} updated in plan '{plan_id}'.\n\n{self._format_plan(plan)}"
@@ -308,9 +642,9 @@ class PlanningTool(BaseTool):
         if not plan_id:
             raise ToolError("Parameter `plan_id` is required for command: delete")
 
-        if plan_id not in self.plans:
-            raise ToolError(f"No plan found with ID: {plan_id}")
+        self.get_plan(plan_id)
 
+        self.store.delete_plan(plan_id)
         del self.plans[plan_id]
 
         # If the deleted plan was the active plan, clear the active plan
@@ -319,45 +653,6 @@ class PlanningTool(BaseTool):
 
         return ToolResult(output=f"Plan '{plan_id}' has been deleted.")
 
-    def _format_plan(self, plan: Dict) -> str:
+    def _format_plan(self, plan: Plan) -> str:
         """Format a plan for display."""
-        output = f"Plan: {plan['title']} (ID: {plan['plan_id']})\n"
-        output += "=" * len(output) + "\n\n"
-
-        # Calculate progress statistics
-        total_steps = len(plan["steps"])
-        completed = sum(1 for status in plan["step_statuses"] if status == "completed")
-        in_progress = sum(
-            1 for status in plan["step_statuses"] if status == "in_progress"
-        )
-        blocked = sum(1 for status in plan["step_statuses"] if status == "blocked")
-        not_started = sum(
-            1 for status in plan["step_statuses"] if status == "not_started"
-        )
-
-        output += f"Progress: {completed}/{total_steps} steps completed "
-        if total_steps > 0:
-            percentage = (completed / total_steps) * 100
-            output += f"({percentage:.1f}%)\n"
-        else:
-            output += "(0%)\n"
-
-        output += f"Status: {completed} completed, {in_progress} in progress, {blocked} blocked, {not_started} not started\n\n"
-        output += "Steps:\n"
-
-        # Add each step with its status and notes
-        for i, (step, status, notes) in enumerate(
-            zip(plan["steps"], plan["step_statuses"], plan["step_notes"])
-        ):
-            status_symbol = {
-                "not_started": "[ ]",
-                "in_progress": "[→]",
-                "completed": "[✓]",
-                "blocked": "[!]",
-            }.get(status, "[ ]")
-
-            output += f"{i}. {status_symbol} {step}\n"
-            if notes:
-                output += f"   Notes: {notes}\n"
-
-        return output
+        return plan.render()
@@ -1,8 +1,24 @@
-from app.tool.search.baidu_search import BaiduSearchEngine
-from app.tool.search.base import WebSearchEngine
-from app.tool.search.bing_search import BingSearchEngine
-from app.tool.search.duckduckgo_search import DuckDuckGoSearchEngine
-from app.tool.search.google_search import GoogleSearchEngine
+from typing import TYPE_CHECKING
+
+from app.utils.lazy import lazy_module
+
+
+if TYPE_CHECKING:
+    from app.tool.search.baidu_search import BaiduSearchEngine
+    from app.tool.search.base import WebSearchEngine
+    from app.tool.search.bing_search import BingSearchEngine
+    from app.tool.search.duckduckgo_search import DuckDuckGoSearchEngine
+    from app.tool.search.google_search import GoogleSearchEngine
+
+
+# Each engine pulls in its own client library; import only the ones used
+_LAZY_IMPORTS = {
+    "WebSearchEngine": "app.tool.search.base",
+    "BaiduSearchEngine": "app.tool.search.baidu_search",
+    "DuckDuckGoSearchEngine": "app.tool.search.duckduckgo_search",
+    "GoogleSearchEngine": "app.tool.search.google_search",
+    "BingSearchEngine": "app.tool.search.bing_search",
+}
 
 
 __all__ = [
@@ -12,3 +28,6 @@ __all__ = [
     "GoogleSearchEngine",
     "BingSearchEngine",
 ]
+
+
+__getattr__, __dir__ = lazy_module(__name__, _LAZY_IMPORTS)
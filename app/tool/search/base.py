@@ -1,7 +1,16 @@
-from typing import List, Optional
+import asyncio
+from typing import Any, List, Optional, Set
 
 from pydantic import BaseModel, Field
 
+from app.logger import logger
+
+
+try:
+    import httpx
+except ImportError:  # only needed by the engines and fetchers that use it
+    httpx = None
+
 
 class SearchItem(BaseModel):
     """Represents a single search result item"""
@@ -17,6 +26,73 @@ class SearchItem(BaseModel):
         return f"{self.title} - {self.url}"
 
 
+class SharedHTTPClient:
+    """Keep-alive httpx client shared by every coroutine on one event loop.
+
+    The client is bound to the running event loop and recreated if the loop
+    changes (e.g. between separate asyncio.run calls). The stale client is
+    closed rather than dropped, so its pooled connections are not leaked.
+    """
+
+    def __init__(self, **client_kwargs: Any):
+        self._client_kwargs = client_kwargs
+        self._client: Optional["httpx.AsyncClient"] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._closing: Set[asyncio.Task] = set()
+
+    def get(self) -> "httpx.AsyncClient":
+        """Return the client for the running loop, creating it if needed."""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._loop is not loop:
+            self._discard()
+            self._client = httpx.AsyncClient(**self._client_kwargs)
+            self._loop = loop
+        return self._client
+
+    def _discard(self) -> None:
+        """Close the current client in the background."""
+        client, loop = self._client, self._loop
+        self._client = self._loop = None
+        if client is None or client.is_closed:
+            return
+        if loop is not None and loop.is_running():
+            # Still serving another thread: close it there
+            asyncio.run_coroutine_threadsafe(self._close_quietly(client), loop)
+            return
+        task = asyncio.get_running_loop().create_task(self._close_quietly(client))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    @staticmethod
+    async def _close_quietly(client: "httpx.AsyncClient") -> None:
+        try:
+            await client.aclose()
+        except Exception as e:
+            # Connections of a closed loop cannot always be shut down cleanly
+            logger.debug(f"Error closing stale HTTP client: {e}")
+
+    async def aclose(self) -> None:
+        """Close the client."""
+        client, self._client, self._loop = self._client, None, None
+        if client is not None:
+            await client.aclose()
+
+
+_http_client: Optional[SharedHTTPClient] = None
+
+
+def get_http_client() -> "httpx.AsyncClient":
+    """Return the keep-alive HTTP client shared by the search engines."""
+    global _http_client
+    if _http_client is None:
+        _http_client = SharedHTTPClient(
+            follow_redirects=True,
+            timeout=10,
+            limits=httpx.Limits(max_connections=50, max_keepalive_connections=20),
+        )
+    return _http_client.get()
+
+
 class WebSearchEngine(BaseModel):
     """Base class for web search engines."""
 
@@ -38,3 +114,27 @@ class WebSearchEngine(BaseModel):
             List[SearchItem]: A list of SearchItem objects matching the search query.
         """
         raise NotImplementedError
+
+    async def perform_search_async(
+        self, query: str, num_results: int = 10, *args, **kwargs
+    ) -> List[SearchItem]:
+        """
+        Perform a web search without blocking the event loop.
+
+        Engines with a native async implementation override this; the default
+        runs `perform_search` in a worker thread.
+
+        Args:
+            query (str): The search query to submit to the search engine.
+            num_results (int, optional): The number of search results to return. Default is 10.
+            args: Additional arguments.
+            kwargs: Additional keyword arguments.
+
+        Returns:
+            List[SearchItem]: A list of SearchItem objects matching the search query.
+        """
+        return list(
+            await asyncio.to_thread(
+                self.perform_search, query, num_results, *args, **kwargs
+            )
+        )
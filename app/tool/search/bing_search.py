@@ -1,13 +1,17 @@
+import asyncio
 from typing import List, Optional, Tuple
+from urllib.parse import quote_plus
 
 import requests
 from bs4 import BeautifulSoup
 
 from app.logger import logger
-from app.tool.search.base import SearchItem, WebSearchEngine
+from app.tool.search.base import SearchItem, WebSearchEngine, get_http_client
 
 
 ABSTRACT_MAX_LENGTH = 300
+RESULTS_PER_PAGE = 10
+MAX_PAGES = 10
 
 USER_AGENTS = [
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/68.0.3440.106 Safari/537.36",
@@ -86,52 +90,110 @@ class BingSearchEngine(WebSearchEngine):
         try:
             res = self.session.get(url=url)
             res.encoding = "utf-8"
-            root = BeautifulSoup(res.text, "lxml")
-
-            list_data = []
-            ol_results = root.find("ol", id="b_results")
-            if not ol_results:
-                return [], None
-
-            for li in ol_results.find_all("li", class_="b_algo"):
-                title = ""
-                url = ""
-                abstract = ""
-                try:
-                    h2 = li.find("h2")
-                    if h2:
-                        title = h2.text.strip()
-                        url = h2.a["href"].strip()
-
-                    p = li.find("p")
-                    if p:
-                        abstract = p.text.strip()
-
-                    if ABSTRACT_MAX_LENGTH and len(abstract) > ABSTRACT_MAX_LENGTH:
-                        abstract = abstract[:ABSTRACT_MAX_LENGTH]
-
-                    rank_start += 1
-
-                    # Create a SearchItem object
-                    list_data.append(
-                        SearchItem(
-                            title=title or f"Bing Result {rank_start}",
-                            url=url,
-                            description=abstract,
-                        )
+            return self._parse_results(res.text, rank_start)
+        except Exception as e:
+            logger.warning(f"Error parsing HTML: {e}")
+            return [], None
+
+    @staticmethod
+    def _parse_results(
+        html: str, rank_start: int = 0
+    ) -> Tuple[List[SearchItem], Optional[str]]:
+        """
+        Extract search results and the next page URL from a Bing result page.
+
+        Returns:
+            tuple: (List of SearchItem objects, next page URL or None)
+        """
+        root = BeautifulSoup(html, "lxml")
+
+        list_data = []
+        ol_results = root.find("ol", id="b_results")
+        if not ol_results:
+            return [], None
+
+        for li in ol_results.find_all("li", class_="b_algo"):
+            title = ""
+            url = ""
+            abstract = ""
+            try:
+                h2 = li.find("h2")
+                if h2:
+                    title = h2.text.strip()
+                    url = h2.a["href"].strip()
+
+                p = li.find("p")
+                if p:
+                    abstract = p.text.strip()
+
+                if ABSTRACT_MAX_LENGTH and len(abstract) > ABSTRACT_MAX_LENGTH:
+                    abstract = abstract[:ABSTRACT_MAX_LENGTH]
+
+                rank_start += 1
+
+                # Create a SearchItem object
+                list_data.append(
+                    SearchItem(
+                        title=title or f"Bing Result {rank_start}",
+                        url=url,
+                        description=abstract,
                     )
-                except Exception:
-                    continue
+                )
+            except Exception:
+                continue
 
-            next_btn = root.find("a", title="Next page")
-            if not next_btn:
-                return list_data, None
+        next_btn = root.find("a", title="Next page")
+        if not next_btn:
+            return list_data, None
 
-            next_url = BING_HOST_URL + next_btn["href"]
-            return list_data, next_url
+        next_url = BING_HOST_URL + next_btn["href"]
+        return list_data, next_url
+
+    async def _fetch_page(self, query: str, page: int) -> List[SearchItem]:
+        """Fetch one result page over the shared client and parse it off the loop."""
+        url = f"{BING_SEARCH_URL}{quote_plus(query)}&first={page * RESULTS_PER_PAGE + 1}"
+        try:
+            response = await get_http_client().get(url, headers=HEADERS)
+            response.encoding = "utf-8"
+            items, _ = await asyncio.to_thread(
+                self._parse_results, response.text, page * RESULTS_PER_PAGE
+            )
+            return items
         except Exception as e:
-            logger.warning(f"Error parsing HTML: {e}")
-            return [], None
+            logger.warning(f"Error fetching Bing page {page + 1}: {e}")
+            return []
+
+    async def perform_search_async(
+        self, query: str, num_results: int = 10, *args, **kwargs
+    ) -> List[SearchItem]:
+        """
+        Bing search engine, fetching result pages concurrently.
+
+        Result page URLs only differ in their `first` offset, so all pages
+        needed for `num_results` are requested at once instead of following
+        the "Next page" links one by one.
+        """
+        if not query:
+            return []
+
+        list_result: List[SearchItem] = []
+        page = 0
+        while len(list_result) < num_results and page < MAX_PAGES:
+            missing = num_results - len(list_result)
+            batch = range(
+                page,
+                min(MAX_PAGES, page + -(-missing // RESULTS_PER_PAGE)),
+            )
+            pages = await asyncio.gather(
+                *(self._fetch_page(query, number) for number in batch)
+            )
+            page = batch.stop
+            for items in pages:
+                if not items:
+                    return list_result[:num_results]
+                list_result.extend(items)
+
+        return list_result[:num_results]
 
     def perform_search(
         self, query: str, num_results: int = 10, *args, **kwargs
@@ -0,0 +1,250 @@
+import json
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from app.logger import logger
+
+
+# Database writes between two prunes of expired and excess rows
+_PRUNE_INTERVAL = 100
+
+
+class CacheEntry:
+    """A cached value with its expiry time and HTTP validators."""
+
+    __slots__ = ("value", "size", "expires_at", "meta")
+
+    def __init__(
+        self,
+        value: Any,
+        size: int,
+        expires_at: float,
+        meta: Optional[Dict[str, Any]] = None,
+    ):
+        self.value = value
+        self.size = size
+        self.expires_at = expires_at
+        self.meta = meta or {}
+
+    @property
+    def fresh(self) -> bool:
+        """Whether the entry is still within its TTL."""
+        return time.time() < self.expires_at
+
+
+class TTLCache:
+    """LRU cache with per-entry TTL, bounded by entry count and total bytes.
+
+    Values must be JSON-serializable. When `path` is set, entries are also
+    written to a SQLite database so they survive restarts and are shared
+    between processes; the in-memory LRU stays the fast path. Evicting from
+    memory leaves the row on disk: the database is pruned separately, by TTL
+    and by its own `max_disk_entries` bound per namespace.
+
+    Expired entries are kept until evicted so callers can revalidate them
+    (e.g. with ETag / Last-Modified) instead of refetching from scratch.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        ttl: float,
+        max_entries: int = 1000,
+        max_bytes: int = 50 * 1024 * 1024,
+        path: Optional[str] = None,
+        max_disk_entries: int = 10000,
+    ):
+        """Initializes the cache.
+
+        Args:
+            namespace: Name separating this cache's rows in a shared database.
+            ttl: Seconds an entry stays fresh.
+            max_entries: Maximum number of entries kept in memory.
+            max_bytes: Maximum total serialized size kept in memory.
+            path: Optional SQLite database path for persistence.
+            max_disk_entries: Maximum number of rows kept in the database.
+        """
+        self.namespace = namespace
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_disk_entries = max_disk_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._bytes = 0
+        self._db: Optional[sqlite3.Connection] = None
+        self._writes = 0
+        if path:
+            self._open_db(path)
+
+    def _open_db(self, path: str) -> None:
+        """Opens (and creates if needed) the persistence database."""
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(path, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "namespace TEXT, key TEXT, value TEXT, meta TEXT, expires_at REAL,"
+                " PRIMARY KEY (namespace, key))"
+            )
+        except sqlite3.Error as e:
+            logger.warning(f"Search cache persistence disabled ({path}): {e}")
+            self._db = None
+
+    def get(self, key: str, allow_stale: bool = False) -> Optional[CacheEntry]:
+        """Looks up an entry.
+
+        Args:
+            key: Cache key.
+            allow_stale: Also return expired entries (for revalidation).
+
+        Returns:
+            The entry, or None if missing (or expired and not allow_stale).
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._load(key)
+            if entry is not None:
+                self._insert(key, entry)
+        else:
+            self._entries.move_to_end(key)
+
+        if entry is None or (not allow_stale and not entry.fresh):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry
+
+    def set(
+        self, key: str, value: Any, meta: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """Stores a value with a fresh TTL.
+
+        Args:
+            key: Cache key.
+            value: JSON-serializable value.
+            meta: Optional metadata such as HTTP validators.
+        """
+        serialized = json.dumps(value, ensure_ascii=False)
+        entry = CacheEntry(value, len(serialized), time.time() + self.ttl, meta)
+        if entry.size > self.max_bytes:
+            return
+        self._insert(key, entry)
+        self._store(key, serialized, entry)
+
+    def touch(self, key: str) -> None:
+        """Renews the TTL of an entry, e.g. after a 304 Not Modified."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return
+        entry.expires_at = time.time() + self.ttl
+        self._entries.move_to_end(key)
+        if self._db is not None:
+            self._execute(
+                "UPDATE cache SET expires_at = ? WHERE namespace = ? AND key = ?",
+                (entry.expires_at, self.namespace, key),
+            )
+
+    def _insert(self, key: str, entry: CacheEntry) -> None:
+        """Adds an entry to the in-memory LRU and evicts down to the bounds."""
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= previous.size
+        self._entries[key] = entry
+        self._bytes += entry.size
+
+        while self._entries and (
+            len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+        ):
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.size
+
+    def _load(self, key: str) -> Optional[CacheEntry]:
+        """Reads an entry from the persistence database."""
+        if self._db is None:
+            return None
+        row = self._execute(
+            "SELECT value, meta, expires_at FROM cache WHERE namespace = ? AND key = ?",
+            (self.namespace, key),
+        )
+        row = row.fetchone() if row is not None else None
+        if row is None:
+            return None
+        value, meta, expires_at = row
+        return CacheEntry(json.loads(value), len(value), expires_at, json.loads(meta))
+
+    def _store(self, key: str, serialized: str, entry: CacheEntry) -> None:
+        """Writes an entry to the persistence database."""
+        if self._db is None:
+            return
+        self._execute(
+            "INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?, ?)",
+            (
+                self.namespace,
+                key,
+                serialized,
+                json.dumps(entry.meta),
+                entry.expires_at,
+            ),
+        )
+        self._writes += 1
+        if self._writes % _PRUNE_INTERVAL == 0:
+            self._prune()
+
+    def _prune(self) -> None:
+        """Drops long-expired rows and rows beyond `max_disk_entries`.
+
+        Expired rows are kept for one more TTL so they can still be
+        revalidated; past that, and past the size bound (oldest expiry
+        first), they are deleted.
+        """
+        self._execute(
+            "DELETE FROM cache WHERE namespace = ? AND expires_at < ?",
+            (self.namespace, time.time() - self.ttl),
+        )
+        if self._db is not None:
+            self._execute(
+                "DELETE FROM cache WHERE namespace = ? AND key IN ("
+                "SELECT key FROM cache WHERE namespace = ?"
+                " ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+                (self.namespace, self.namespace, self.max_disk_entries),
+            )
+
+    def _execute(self, sql: str, params: tuple) -> Optional[sqlite3.Cursor]:
+        """Runs a statement, disabling persistence if the database fails."""
+        try:
+            return self._db.execute(sql, params)
+        except sqlite3.Error as e:
+            logger.warning(f"Search cache persistence error, disabling: {e}")
+            self._db = None
+            return None
+
+    def clear(self) -> None:
+        """Removes all entries of this cache."""
+        self._entries.clear()
+        self._bytes = 0
+        if self._db is not None:
+            self._execute("DELETE FROM cache WHERE namespace = ?", (self.namespace,))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Returns cache size and hit statistics."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "persistent": self._db is not None,
+        }
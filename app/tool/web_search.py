@@ -1,12 +1,13 @@
 import asyncio
-from typing import Any, Dict, List, Optional
+import random
+import time
+from typing import Any, Dict, List, Optional, Set
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 
-import requests
-from bs4 import BeautifulSoup
-from pydantic import BaseModel, ConfigDict, Field, model_validator
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr, model_validator
 from tenacity import retry, stop_after_attempt, wait_exponential
 
-from app.config import config
+from app.config import SearchSettings, config
 from app.logger import logger
 from app.tool.base import BaseTool, ToolResult
 from app.tool.search import (
@@ -16,7 +17,16 @@ from app.tool.search import (
     GoogleSearchEngine,
     WebSearchEngine,
 )
-from app.tool.search.base import SearchItem
+from app.tool.search.base import SearchItem, SharedHTTPClient
+from app.tool.search.cache import CacheEntry, TTLCache
+
+
+try:
+    import httpx
+    from lxml import etree
+except ImportError:  # fall back to requests + BeautifulSoup page fetching
+    httpx = None
+    etree = None
 
 
 class SearchResult(BaseModel):
@@ -103,14 +113,242 @@ class SearchResponse(ToolResult):
         return self
 
 
+class EngineStats(BaseModel):
+    """Running latency and error-rate estimates for a search engine."""
+
+    alpha: float = Field(default=0.3, description="Smoothing factor for new samples")
+    latency: Optional[float] = Field(
+        default=None, description="Smoothed latency in seconds"
+    )
+    error_rate: float = Field(default=0.0, description="Smoothed failure rate")
+    calls: int = Field(default=0, description="Number of recorded searches")
+
+    def record(self, latency: float, failed: Optional[bool] = None) -> None:
+        """Records a search; failed=None records latency only (cancelled search)."""
+        self.calls += 1
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency += self.alpha * (latency - self.latency)
+        if failed is not None:
+            self.error_rate += self.alpha * (float(failed) - self.error_rate)
+
+    @property
+    def score(self) -> float:
+        """Expected time to a successful answer; lower is better."""
+        return (self.latency or 0.0) / max(1.0 - self.error_rate, 0.05)
+
+    @property
+    def healthy(self) -> bool:
+        """Whether the engine fails at most half of the time."""
+        return self.error_rate <= UNHEALTHY_ERROR_RATE
+
+
+# Engines failing more often than this are tried after the healthy ones
+UNHEALTHY_ERROR_RATE = 0.5
+# Share of searches in which unhealthy engines keep their configured
+# position, so that an engine that recovered gets noticed
+EXPLORATION_SHARE = 0.05
+
+
+_TRACKING_PARAMS = ("utm_", "gclid", "fbclid")
+
+
+def normalize_url(url: str) -> str:
+    """Normalize a URL for deduplicating results across engines."""
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = urlencode(
+        [
+            (key, value)
+            for key, value in parse_qsl(parts.query, keep_blank_values=True)
+            if not key.lower().startswith(_TRACKING_PARAMS)
+        ]
+    )
+    return urlunsplit(("", host, parts.path.rstrip("/"), query, ""))
+
+
+_shared_caches: Dict[str, Optional[TTLCache]] = {}
+
+
+def get_search_cache(namespace: str) -> Optional[TTLCache]:
+    """Return the process-wide cache for "results" or "pages", None if disabled."""
+    if namespace not in _shared_caches:
+        # A missing [search] section means the defaults, which cache
+        search_config = config.search_config or SearchSettings()
+        ttl_setting = "cache_ttl" if namespace == "results" else "content_cache_ttl"
+        ttl = getattr(search_config, ttl_setting)
+        _shared_caches[namespace] = (
+            TTLCache(
+                namespace,
+                ttl,
+                max_entries=search_config.cache_max_entries,
+                max_bytes=search_config.cache_max_bytes,
+                path=search_config.cache_path,
+                max_disk_entries=search_config.cache_max_disk_entries,
+            )
+            if ttl > 0
+            else None
+        )
+    return _shared_caches[namespace]
+
+
+_BINARY_SIGNATURES = (
+    b"%PDF",
+    b"\x89PNG",
+    b"GIF8",
+    b"\xff\xd8\xff",
+    b"PK\x03\x04",
+    b"\x1f\x8b",
+    b"RIFF",
+    b"OggS",
+    b"\x7fELF",
+)
+
+
+def _is_text_content_type(content_type: str) -> bool:
+    """Whether a Content-Type header denotes a page we can extract text from."""
+    mime = content_type.split(";", 1)[0].strip().lower()
+    return (
+        not mime
+        or mime.startswith("text/")
+        or mime.endswith(("+xml", "/xml", "/json", "+json"))
+        or mime == "application/xhtml+xml"
+    )
+
+
+_TEXT_BOMS = (
+    b"\xef\xbb\xbf",
+    b"\xff\xfe",
+    b"\xfe\xff",
+    b"\x00\x00\xfe\xff",
+)
+
+
+def _looks_binary(head: bytes, charset: Optional[str] = None) -> bool:
+    """Sniff the first bytes of a body for binary formats.
+
+    NUL bytes only mark a body as binary when neither a byte order mark nor
+    the declared charset says it is UTF-16/32 text, which is full of them.
+    """
+    if head.startswith(_TEXT_BOMS):
+        return False
+    if head.startswith(_BINARY_SIGNATURES):
+        return True
+    wide_text = (charset or "").lower().replace("-", "").startswith(("utf16", "utf32"))
+    return not wide_text and b"\x00" in head[:512]
+
+
+class HTMLTextExtractor:
+    """lxml parser target that collects visible text incrementally.
+
+    Text inside boilerplate elements is skipped and collection stops once
+    `max_chars` have been gathered, so callers can stop downloading early.
+    """
+
+    SKIP_TAGS = {"script", "style", "header", "footer", "nav", "noscript", "template"}
+
+    def __init__(self, max_chars: int):
+        self.max_chars = max_chars
+        self.length = 0
+        self._parts: List[str] = []
+        self._skip_depth = 0
+
+    @property
+    def full(self) -> bool:
+        return self.length >= self.max_chars
+
+    def start(self, tag: str, attrib: Dict[str, str]) -> None:
+        if self._skip_depth or tag in self.SKIP_TAGS:
+            self._skip_depth += 1
+
+    def end(self, tag: str) -> None:
+        if self._skip_depth:
+            self._skip_depth -= 1
+
+    def data(self, data: str) -> None:
+        if self._skip_depth or self.full:
+            return
+        text = " ".join(data.split())
+        if text:
+            self._parts.append(text)
+            self.length += len(text) + 1
+
+    def close(self) -> str:
+        return " ".join(self._parts)[: self.max_chars]
+
+
 class WebContentFetcher:
-    """Utility class for fetching web content."""
+    """Utility class for fetching web content.
+
+    Pages are downloaded over a shared keep-alive connection pool with a
+    per-host concurrency limit, streamed into an incremental text extractor
+    and cut off at `fetch_max_bytes` / `fetch_max_chars`.
+    """
+
+    USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+
+    _client: Optional[SharedHTTPClient] = None
+    _host_limits: Dict[str, asyncio.Semaphore] = {}
+    _host_limits_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def __init__(self, cache: Optional[TTLCache] = None):
+        self.cache = cache if cache is not None else get_search_cache("pages")
+        search_config = config.search_config
+        self.max_bytes = search_config.fetch_max_bytes if search_config else 2 << 20
+        self.max_chars = search_config.fetch_max_chars if search_config else 10000
+
+    @classmethod
+    def _get_client(cls) -> "httpx.AsyncClient":
+        """Return the shared HTTP client for the running loop."""
+        if cls._client is None:
+            max_connections = (
+                config.search_config.fetch_max_connections
+                if config.search_config
+                else 20
+            )
+            cls._client = SharedHTTPClient(
+                headers={"User-Agent": cls.USER_AGENT},
+                follow_redirects=True,
+                limits=httpx.Limits(
+                    max_connections=max_connections,
+                    max_keepalive_connections=max_connections,
+                ),
+            )
+        return cls._client.get()
+
+    @classmethod
+    def _host_limit(cls, url: str) -> asyncio.Semaphore:
+        """Return the concurrency limiter for the URL's host."""
+        loop = asyncio.get_running_loop()
+        if cls._host_limits_loop is not loop:
+            cls._host_limits = {}
+            cls._host_limits_loop = loop
+        host = urlsplit(url).netloc.lower()
+        if host not in cls._host_limits:
+            per_host = (
+                config.search_config.fetch_per_host_limit
+                if config.search_config
+                else 4
+            )
+            cls._host_limits[host] = asyncio.Semaphore(per_host)
+        return cls._host_limits[host]
+
+    @classmethod
+    async def close(cls) -> None:
+        """Close the shared HTTP client."""
+        if cls._client is not None:
+            await cls._client.aclose()
 
-    @staticmethod
-    async def fetch_content(url: str, timeout: int = 10) -> Optional[str]:
+    async def fetch_content(self, url: str, timeout: int = 10) -> Optional[str]:
         """
         Fetch and extract the main content from a webpage.
 
+        Pages are cached by URL. Expired entries are revalidated with their
+        ETag / Last-Modified validators, so unchanged pages are not parsed again.
+
         Args:
             url: The URL to fetch content from
             timeout: Request timeout in seconds
@@ -118,40 +356,137 @@ class WebContentFetcher:
         Returns:
             Extracted text content or None if fetching fails
         """
-        headers = {
-            "WebSearch": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        }
+        cached = self.cache.get(url, allow_stale=True) if self.cache else None
+        if cached is not None and cached.fresh:
+            return cached.value
+
+        headers = {}
+        if cached is not None:
+            if cached.meta.get("etag"):
+                headers["If-None-Match"] = cached.meta["etag"]
+            if cached.meta.get("last_modified"):
+                headers["If-Modified-Since"] = cached.meta["last_modified"]
+
+        if httpx is None:
+            return await self._fetch_with_requests(url, headers, cached, timeout)
+
+        try:
+            client = self._get_client()
+            async with self._host_limit(url):
+                async with client.stream(
+                    "GET", url, headers=headers, timeout=timeout
+                ) as response:
+                    if response.status_code == 304 and cached is not None:
+                        self.cache.touch(url)
+                        return cached.value
+
+                    if response.status_code != 200:
+                        logger.warning(
+                            f"Failed to fetch content from {url}: HTTP {response.status_code}"
+                        )
+                        return None
+
+                    content_type = response.headers.get("Content-Type", "")
+                    if not _is_text_content_type(content_type):
+                        logger.info(f"Skipping non-text content from {url}: {content_type}")
+                        return None
+
+                    text = await self._extract_text(response)
+                    if text is None:
+                        logger.info(f"Skipping binary content from {url}")
+                        return None
+
+            if text and self.cache is not None:
+                validators = {
+                    "etag": response.headers.get("ETag"),
+                    "last_modified": response.headers.get("Last-Modified"),
+                }
+                self.cache.set(
+                    url, text, {key: value for key, value in validators.items() if value}
+                )
+            return text or None
+
+        except Exception as e:
+            logger.warning(f"Error fetching content from {url}: {e}")
+            return None
+
+    async def _fetch_with_requests(
+        self,
+        url: str,
+        headers: Dict[str, str],
+        cached: Optional[CacheEntry],
+        timeout: int,
+    ) -> Optional[str]:
+        """Fetch a page with requests and BeautifulSoup when httpx/lxml are missing."""
+        import requests
+        from bs4 import BeautifulSoup
 
         try:
-            # Use asyncio to run requests in a thread pool
-            response = await asyncio.get_event_loop().run_in_executor(
-                None, lambda: requests.get(url, headers=headers, timeout=timeout)
+            response = await asyncio.to_thread(
+                requests.get,
+                url,
+                headers={"User-Agent": self.USER_AGENT, **headers},
+                timeout=timeout,
             )
 
+            if response.status_code == 304 and cached is not None:
+                self.cache.touch(url)
+                return cached.value
+
             if response.status_code != 200:
                 logger.warning(
                     f"Failed to fetch content from {url}: HTTP {response.status_code}"
                 )
                 return None
 
-            # Parse HTML with BeautifulSoup
-            soup = BeautifulSoup(response.text, "html.parser")
-
-            # Remove script and style elements
-            for script in soup(["script", "style", "header", "footer", "nav"]):
-                script.extract()
-
-            # Get text content
-            text = soup.get_text(separator="\n", strip=True)
+            content_type = response.headers.get("Content-Type", "")
+            if not _is_text_content_type(content_type) or _looks_binary(
+                response.content[:512], response.encoding
+            ):
+                logger.info(f"Skipping non-text content from {url}: {content_type}")
+                return None
 
-            # Clean up whitespace and limit size (100KB max)
-            text = " ".join(text.split())
-            return text[:10000] if text else None
+            soup = BeautifulSoup(response.text, "html.parser")
+            for element in soup(list(HTMLTextExtractor.SKIP_TAGS)):
+                element.extract()
+            text = " ".join(soup.get_text(separator="\n", strip=True).split())
+            text = text[: self.max_chars]
+
+            if text and self.cache is not None:
+                validators = {
+                    "etag": response.headers.get("ETag"),
+                    "last_modified": response.headers.get("Last-Modified"),
+                }
+                self.cache.set(
+                    url, text, {key: value for key, value in validators.items() if value}
+                )
+            return text or None
 
         except Exception as e:
             logger.warning(f"Error fetching content from {url}: {e}")
             return None
 
+    async def _extract_text(self, response: "httpx.Response") -> Optional[str]:
+        """Stream the body into the text extractor, stopping at the byte/char caps.
+
+        Returns:
+            Extracted text, or None if the body turned out to be binary
+        """
+        extractor = HTMLTextExtractor(self.max_chars)
+        parser = etree.HTMLParser(
+            target=extractor, encoding=response.charset_encoding
+        )
+        received = 0
+        async for chunk in response.aiter_bytes():
+            if received == 0 and _looks_binary(chunk, response.charset_encoding):
+                return None
+            chunk = chunk[: self.max_bytes - received]
+            received += len(chunk)
+            parser.feed(chunk)
+            if extractor.full or received >= self.max_bytes:
+                break
+        return parser.close() if received else ""
+
 
 class WebSearch(BaseTool):
     """Search the web for information using various search engines."""
@@ -196,7 +531,8 @@ class WebSearch(BaseTool):
         "duckduckgo": DuckDuckGoSearchEngine(),
         "bing": BingSearchEngine(),
     }
-    content_fetcher: WebContentFetcher = WebContentFetcher()
+    content_fetcher: WebContentFetcher = Field(default_factory=WebContentFetcher)
+    _engine_stats: Dict[str, EngineStats] = PrivateAttr(default_factory=dict)
 
     async def execute(
         self,
@@ -250,7 +586,7 @@ class WebSearch(BaseTool):
 
         # Try searching with retries when all engines fail
         for retry_count in range(max_retries + 1):
-            results = await self._try_all_engines(query, num_results, search_params)
+            results = await self._search_cached(query, num_results, search_params)
 
             if results:
                 # Fetch content if requested
@@ -287,21 +623,58 @@ class WebSearch(BaseTool):
             results=[],
         )
 
+    async def _search_cached(
+        self, query: str, num_results: int, search_params: Dict[str, Any]
+    ) -> List[SearchResult]:
+        """Serve a search from the result cache, searching the engines on a miss."""
+        cache = get_search_cache("results")
+        if cache is None:
+            return await self._try_all_engines(query, num_results, search_params)
+
+        normalized_query = " ".join(query.lower().split())
+        key = f"{search_params.get('lang')}|{search_params.get('country')}|{normalized_query}"
+        cached = cache.get(key)
+        # A cached search for at least as many results answers this one too
+        if cached is not None and (
+            len(cached.value) >= num_results
+            or cached.meta.get("requested", 0) >= num_results
+        ):
+            return [SearchResult(**item) for item in cached.value[:num_results]]
+
+        results = await self._try_all_engines(query, num_results, search_params)
+        if results:
+            cache.set(
+                key,
+                [result.model_dump(exclude={"raw_content"}) for result in results],
+                {"requested": num_results},
+            )
+        return results
+
     async def _try_all_engines(
         self, query: str, num_results: int, search_params: Dict[str, Any]
     ) -> List[SearchResult]:
-        """Try all search engines in the configured order."""
+        """Try the search engines in order, racing several at once if configured."""
         engine_order = self._get_engine_order()
+        race_width = (
+            getattr(config.search_config, "race_engines", 1)
+            if config.search_config
+            else 1
+        )
+        if race_width > 1:
+            return await self._race_engines(
+                engine_order, race_width, query, num_results, search_params
+            )
+
         failed_engines = []
 
         for engine_name in engine_order:
-            engine = self._search_engine[engine_name]
             logger.info(f"🔎 Attempting search with {engine_name.capitalize()}...")
-            search_items = await self._perform_search_with_engine(
-                engine, query, num_results, search_params
+            search_items = await self._search_with_stats(
+                engine_name, query, num_results, search_params
             )
 
             if not search_items:
+                failed_engines.append(engine_name)
                 continue
 
             if failed_engines:
@@ -326,6 +699,108 @@ class WebSearch(BaseTool):
             logger.error(f"All search engines failed: {', '.join(failed_engines)}")
         return []
 
+    async def _race_engines(
+        self,
+        engine_order: List[str],
+        race_width: int,
+        query: str,
+        num_results: int,
+        search_params: Dict[str, Any],
+    ) -> List[SearchResult]:
+        """Query up to `race_width` engines concurrently.
+
+        Results are merged in arrival order and deduplicated by normalized
+        URL. As soon as enough results are collected the remaining searches
+        are cancelled; when an engine finishes without filling the quota the
+        next engine in order is started in its place.
+
+        Cancelling a losing search stops engines that search natively async.
+        Engines that search in a worker thread (`perform_search`) cannot be
+        interrupted: their thread runs to completion in the background and
+        its result is discarded, so the losers keep using the default
+        executor's threads until their request finishes or times out.
+        """
+        waiting = list(engine_order)
+        running: Dict[asyncio.Task, str] = {}
+        results: List[SearchResult] = []
+        seen: Set[str] = set()
+
+        def launch() -> None:
+            while waiting and len(running) < race_width:
+                engine_name = waiting.pop(0)
+                logger.info(f"🔎 Racing search with {engine_name.capitalize()}...")
+                task = asyncio.create_task(
+                    self._search_with_stats(
+                        engine_name, query, num_results, search_params
+                    )
+                )
+                running[task] = engine_name
+
+        launch()
+        try:
+            while running and len(results) < num_results:
+                done, _ = await asyncio.wait(
+                    running, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    engine_name = running.pop(task)
+                    for item in task.result():
+                        key = normalize_url(item.url)
+                        if not item.url or key in seen:
+                            continue
+                        seen.add(key)
+                        results.append(
+                            SearchResult(
+                                position=len(results) + 1,
+                                url=item.url,
+                                title=item.title or f"Result {len(results) + 1}",
+                                description=item.description or "",
+                                source=engine_name,
+                            )
+                        )
+                if len(results) < num_results:
+                    launch()
+        finally:
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+
+        if not results:
+            logger.error(f"All search engines failed: {', '.join(engine_order)}")
+        return results[:num_results]
+
+    async def _search_with_stats(
+        self,
+        engine_name: str,
+        query: str,
+        num_results: int,
+        search_params: Dict[str, Any],
+    ) -> List[SearchItem]:
+        """Search with one engine, recording its latency and outcome."""
+        stats = self._engine_stats.setdefault(engine_name, EngineStats())
+        start = time.monotonic()
+        try:
+            search_items = await self._perform_search_with_engine(
+                self._search_engine[engine_name], query, num_results, search_params
+            )
+        except asyncio.CancelledError:
+            # Only a lower bound on latency, but still a useful signal
+            stats.record(time.monotonic() - start)
+            raise
+        except Exception as e:
+            logger.warning(f"{engine_name.capitalize()} search failed: {e}")
+            search_items = []
+        stats.record(time.monotonic() - start, failed=not search_items)
+        return search_items
+
+    def get_engine_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Returns the per-engine latency and error-rate estimates."""
+        return {
+            name: {**stats.model_dump(exclude={"alpha"}), "score": stats.score}
+            for name, stats in self._engine_stats.items()
+        }
+
     async def _fetch_content_for_results(
         self, results: List[SearchResult]
     ) -> List[SearchResult]:
@@ -382,7 +857,37 @@ class WebSearch(BaseTool):
         )
         engine_order.extend([e for e in self._search_engine if e not in engine_order])
 
-        return engine_order
+        # Engines without a record keep their configured position. Healthy
+        # engines with a record trade places among themselves by score, and
+        # unhealthy ones go to the back (except in an exploration share)
+        explore = random.random() < EXPLORATION_SHARE
+        healthy = [
+            name
+            for name in engine_order
+            if name not in self._engine_stats
+            or self._engine_stats[name].healthy
+            or explore
+        ]
+        ranked = iter(
+            sorted(
+                (name for name in healthy if name in self._engine_stats),
+                key=lambda name: self._engine_stats[name].score,
+            )
+        )
+        order = [
+            name if name not in self._engine_stats else next(ranked)
+            for name in healthy
+        ]
+        order.extend(
+            sorted(
+                (name for name in engine_order if name not in healthy),
+                key=lambda name: (
+                    self._engine_stats[name].error_rate,
+                    self._engine_stats[name].score,
+                ),
+            )
+        )
+        return order
 
     @retry(
         stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=1, max=10)
@@ -395,16 +900,11 @@ class WebSearch(BaseTool):
         search_params: Dict[str, Any],
     ) -> List[SearchItem]:
         """Execute search with the given engine and parameters."""
-        return await asyncio.get_event_loop().run_in_executor(
-            None,
-            lambda: list(
-                engine.perform_search(
-                    query,
-                    num_results=num_results,
-                    lang=search_params.get("lang"),
-                    country=search_params.get("country"),
-                )
-            ),
+        return await engine.perform_search_async(
+            query,
+            num_results=num_results,
+            lang=search_params.get("lang"),
+            country=search_params.get("country"),
         )
 
 
@@ -0,0 +1,34 @@
+import importlib
+import sys
+from typing import Any, Callable, Dict, List, Tuple
+
+
+def lazy_module(
+    module_name: str, imports: Dict[str, str]
+) -> Tuple[Callable[[str], Any], Callable[[], List[str]]]:
+    """Builds a package's `__getattr__` and `__dir__` for lazily imported exports.
+
+    Each name is imported from its module on first access and then cached in
+    the package namespace, so later lookups do not go through `__getattr__`.
+
+    Args:
+        module_name: The package's `__name__`.
+        imports: Exported name -> module that defines it.
+
+    Returns:
+        The `__getattr__` and `__dir__` functions for the package.
+    """
+    namespace = sys.modules[module_name].__dict__
+
+    def __getattr__(name: str) -> Any:
+        module = imports.get(name)
+        if module is None:
+            raise AttributeError(f"module {module_name!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(module), name)
+        namespace[name] = value
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(namespace) | set(namespace.get("__all__", imports)))
+
+    return __getattr__, __dir__
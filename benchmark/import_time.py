@@ -0,0 +1,111 @@
+"""Benchmark import time of the agent and tool entry points.
+
+Each target is imported in a fresh interpreter, so the timings include
+everything the import pulls in. The run fails (exit code 1) when a target
+loads one of the heavy optional dependencies it should not need, or is
+slower than --max-ms, so it can guard against import-time regressions.
+
+Usage:
+    python -m benchmark.import_time --runs 5
+    python -m benchmark.import_time --max-ms 1500
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+from typing import Dict, List, Tuple
+
+
+# Optional dependencies only specific tools or sandbox backends need
+HEAVY_MODULES = (
+    "browser_use",
+    "playwright",
+    "docker",
+    "googlesearch",
+    "duckduckgo_search",
+    "baidusearch",
+    "bs4",
+    "mcp",
+)
+
+# name -> (statement, whether heavy modules are expected)
+TARGETS: Dict[str, Tuple[str, bool]] = {
+    "tool": ("from app.tool import Terminate, ToolCollection", False),
+    "sandbox_client": ("from app.sandbox.client import get_sandbox_client", False),
+    "toolcall_agent": ("from app.agent.toolcall import ToolCallAgent", False),
+    "blackjack": ("from example.blackjack.agent import HostAgent, PlayerAgent", False),
+    "browser_tool": ("from app.tool import BrowserUseTool", True),
+}
+
+CHILD_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+exec({statement!r})
+elapsed = time.perf_counter() - start
+heavy = [name for name in {heavy!r} if name in sys.modules]
+print(json.dumps({{"seconds": elapsed, "heavy": heavy}}))
+"""
+
+
+async def measure(statement: str) -> Tuple[float, List[str]]:
+    """Imports in a fresh interpreter; returns seconds and heavy modules loaded."""
+    process = await asyncio.create_subprocess_exec(
+        sys.executable,
+        "-c",
+        CHILD_SCRIPT.format(statement=statement, heavy=HEAVY_MODULES),
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    stdout, stderr = await process.communicate()
+    if process.returncode != 0:
+        raise RuntimeError(stderr.decode(errors="replace").strip().splitlines()[-1])
+    result = json.loads(stdout.decode().strip().splitlines()[-1])
+    return result["seconds"], result["heavy"]
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="Imports per target")
+    parser.add_argument(
+        "--targets", nargs="+", choices=list(TARGETS), default=list(TARGETS)
+    )
+    parser.add_argument(
+        "--max-ms",
+        type=float,
+        default=None,
+        help="Fail if a target that should stay light takes longer (median)",
+    )
+    args = parser.parse_args()
+
+    failures = []
+    for name in args.targets:
+        statement, heavy_expected = TARGETS[name]
+        try:
+            samples = [await measure(statement) for _ in range(args.runs)]
+        except RuntimeError as e:
+            print(f"{name:<16} failed: {e}")
+            failures.append(f"{name} failed to import")
+            continue
+
+        timings = [seconds * 1000 for seconds, _ in samples]
+        heavy = sorted({module for _, loaded in samples for module in loaded})
+        median = statistics.median(timings)
+        print(
+            f"{name:<16} p50 {median:9.1f} ms  min {min(timings):9.1f} ms"
+            f"  heavy: {', '.join(heavy) or '-'}"
+        )
+        if not heavy_expected:
+            if heavy:
+                failures.append(f"{name} imports {', '.join(heavy)}")
+            if args.max_ms is not None and median > args.max_ms:
+                failures.append(f"{name} took {median:.1f} ms > {args.max_ms} ms")
+
+    if failures:
+        print("Regressions:\n  " + "\n  ".join(failures))
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
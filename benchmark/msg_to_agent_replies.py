@@ -0,0 +1,209 @@
+"""Benchmark host input tokens for each MsgToAgent reply mode.
+
+Replays a recorded blackjack game: the host messages the players through
+MsgToAgent, and each player replays its recorded steps instead of calling
+the LLM. Every reply lands in the host's memory and is re-sent on each
+later host call, so the host's input tokens per round are estimated from
+its accumulated memory.
+
+Usage:
+    python -m benchmark.msg_to_agent_replies
+    python -m benchmark.msg_to_agent_replies --modes final transcript
+"""
+
+import argparse
+import asyncio
+from typing import List, Tuple
+
+import tiktoken
+
+from app.agent.base import BaseAgent
+from app.agent_manager import AgentManager
+from app.custom_tool import MsgToAgent
+from app.output import NullSink, set_default_sink
+from app.schema import AgentState
+from example.blackjack.prompt.host import SYSTEM_PROMPT as HOST_SYSTEM_PROMPT
+
+
+TERMINATE_OBSERVATION = (
+    "Observed output of cmd `terminate` executed:\n"
+    "The interaction has been completed with status: success"
+)
+
+# (player, host message, [(thoughts, action) per recorded step])
+RECORDED_GAME: List[Tuple[str, str, List[Tuple[str, str]]]] = [
+    (
+        "Alice",
+        "Round 1. Your cards: 10♠, 6♥ (16). Dealer shows 10♦. Hit or stand?",
+        [
+            (
+                "I have a hard 16 against a dealer 10. The dealer's most likely "
+                "total is 20, and standing on 16 loses to any dealer total of 17 "
+                "or more. Basic strategy says to hit 16 against a 10. No cards "
+                "have been dealt from this deck yet, so the count is neutral.",
+                "",
+            ),
+            ("Hit.", TERMINATE_OBSERVATION),
+        ],
+    ),
+    (
+        "Bob",
+        "Round 1. Your cards: 9♣, 9♦ (18). Dealer shows 10♦. Hit or stand?",
+        [
+            (
+                "18 against a dealer 10. Hitting busts on anything above a 3, "
+                "and 18 beats a dealer 17. Alice already saw 10♠ and 6♥; the "
+                "deck is not reshuffled, so high cards are slightly depleted. "
+                "Standing is the better play.",
+                "",
+            ),
+            ("Stand.", TERMINATE_OBSERVATION),
+        ],
+    ),
+    (
+        "Alice",
+        "You drew 4♣ (20). Dealer reveals 7♥ (17), dealer stands. You win "
+        "round 1. Round 2: your cards A♠, 7♦ (soft 18). Dealer shows 9♠.",
+        [
+            (
+                "I won round 1 with 20 against 17. Now I have soft 18 against "
+                "a dealer 9. Standing on soft 18 against a 9 is an underdog; "
+                "basic strategy hits. Cards seen so far: 10♠ 6♥ 9♣ 9♦ 10♦ 4♣ "
+                "7♥ A♠ 7♦ 9♠. Three nines are gone, so a nine is unlikely.",
+                "",
+            ),
+            ("Hit.", TERMINATE_OBSERVATION),
+        ],
+    ),
+    (
+        "Bob",
+        "Bob, you stood on 18 against 17 and win round 1. Round 2: your "
+        "cards 5♥, 6♣ (11). Dealer shows 9♠.",
+        [
+            (
+                "11 against a dealer 9 is a double down in basic strategy. "
+                "Many small cards (4, 6, 7) are already out, which helps "
+                "slightly. I will double.",
+                "",
+            ),
+            ("Double down.", TERMINATE_OBSERVATION),
+        ],
+    ),
+    (
+        "Alice",
+        "You drew 2♥ (soft 20). Bob doubled and drew K♦ (21). Dealer has "
+        "9♠ 8♦ (17). Round 3: your cards Q♣, 3♠ (13). Dealer shows 2♣.",
+        [
+            (
+                "Soft 20 beats 17, so I won round 2. Now 13 against a dealer "
+                "2: basic strategy stands, since the dealer busts often "
+                "drawing from 2 and hitting 13 risks a bust on any ten. "
+                "Ten-value cards seen: 10♠ 10♦ K♦ Q♣ — still plenty left.",
+                "",
+            ),
+            ("Stand.", TERMINATE_OBSERVATION),
+        ],
+    ),
+    (
+        "Bob",
+        "Round 3: your cards J♥, 8♠ (18). Dealer shows 2♣. Hit or stand?",
+        [
+            ("18 against a 2: stand.", TERMINATE_OBSERVATION),
+        ],
+    ),
+    (
+        "Alice",
+        "Dealer drew to 2♣ 10♥ 5♦ (17). You lose round 3 with 13. Score: "
+        "Alice 2, Bob 2, dealer 1. Final round: your cards 8♥, 8♣. Dealer "
+        "shows 6♦.",
+        [
+            (
+                "A pair of eights against a dealer 6 should always be split. "
+                "The dealer's 6 is the weakest up card, and splitting gives "
+                "two hands starting from 8 with good odds.",
+                "",
+            ),
+            ("Split the eights.", TERMINATE_OBSERVATION),
+        ],
+    ),
+    (
+        "Bob",
+        "Final round: your cards A♦, K♠. Blackjack! Anything to add?",
+        [
+            ("Understood, blackjack. I stand.", TERMINATE_OBSERVATION),
+        ],
+    ),
+]
+
+
+class ReplayPlayer(BaseAgent):
+    """Player that replays its recorded steps for each message it receives."""
+
+    rounds: List[List[Tuple[str, str]]]
+
+    async def step(self) -> str:
+        round_steps = self.rounds[0]
+        thoughts, action = round_steps.pop(0)
+        self.update_memory("assistant", thoughts)
+        if not round_steps:
+            self.rounds.pop(0)
+            self.state = AgentState.FINISHED
+        return f"<Thinking>\n{thoughts}\n\n<Action>\n{action or 'No action needed'}"
+
+
+async def replay(mode: str, encoding) -> List[int]:
+    """Plays the recorded game; returns the host's input tokens per round."""
+    for name in {player for player, _, _ in RECORDED_GAME}:
+        AgentManager.register_agent(
+            ReplayPlayer(
+                name=name,
+                max_steps=1000,
+                rounds=[
+                    [tuple(step) for step in steps]
+                    for player, _, steps in RECORDED_GAME
+                    if player == name
+                ],
+            )
+        )
+
+    tool = MsgToAgent(reply_mode=mode)
+    host_memory: List[str] = [HOST_SYSTEM_PROMPT]
+    tokens_per_round = []
+    for player, message, _ in RECORDED_GAME:
+        host_memory.append(message)
+        reply = await tool.execute(
+            your_name="Host", agent_name=player, message=message
+        )
+        host_memory.append(reply)
+        # The next host call re-sends everything it has seen so far
+        tokens_per_round.append(
+            sum(len(encoding.encode(text)) for text in host_memory)
+        )
+    return tokens_per_round
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--modes",
+        nargs="+",
+        choices=["transcript", "structured", "final"],
+        default=["transcript", "structured", "final"],
+    )
+    args = parser.parse_args()
+
+    set_default_sink(NullSink())
+    encoding = tiktoken.get_encoding("cl100k_base")
+    baseline = None
+    for mode in args.modes:
+        tokens = await replay(mode, encoding)
+        total = sum(tokens)
+        baseline = baseline or total
+        print(
+            f"{mode:<12} per round {tokens[0]:6d} .. {tokens[-1]:6d} tokens"
+            f"  total {total:7d}  ({total / baseline:5.1%} of {args.modes[0]})"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
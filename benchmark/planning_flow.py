@@ -0,0 +1,102 @@
+"""Benchmark sequential against dependency-aware parallel plan execution.
+
+Replays a recorded research plan: each executor sleeps for the step's
+recorded duration instead of calling the LLM, so the comparison measures
+scheduling only.
+
+Usage:
+    python -m benchmark.planning_flow --executors 4 --scale 0.1
+"""
+
+import argparse
+import asyncio
+import re
+import time
+from typing import Dict, List
+
+from app.agent.base import BaseAgent
+from app.flow.planning import PlanningFlow
+from app.schema import AgentState
+from app.tool import PlanningTool
+from app.tool.plan_store import MemoryPlanStore
+
+
+# (step, recorded seconds, dependencies)
+RECORDED_PLAN = [
+    ("Search for recent EV battery market reports", 14.2, []),
+    ("Search for solid-state battery research papers", 11.8, []),
+    ("Collect manufacturer capacity announcements", 16.5, []),
+    ("Download and clean the price-per-kWh dataset", 9.4, []),
+    ("Summarize market report findings", 7.9, [0]),
+    ("Summarize research directions", 8.6, [1]),
+    ("Chart price-per-kWh trend", 12.3, [3]),
+    ("Compare announced capacity with demand forecasts", 10.1, [2, 4]),
+    ("Draft the report", 18.7, [5, 6, 7]),
+    ("Review and finalize the report", 6.4, [8]),
+]
+
+
+class ReplayAgent(BaseAgent):
+    """Executor that sleeps for the recorded duration of the step it is given."""
+
+    durations: Dict[int, float]
+
+    async def step(self) -> str:
+        prompt = self.memory.messages[-1].content or ""
+        match = re.search(r"working on step (\d+)", prompt)
+        index = int(match.group(1)) if match else -1
+        await asyncio.sleep(self.durations.get(index, 0.0))
+        self.state = AgentState.FINISHED
+        return f"step {index} done"
+
+
+class ReplayFlow(PlanningFlow):
+    """Planning flow without the LLM summary at the end."""
+
+    async def _finalize_plan(self) -> str:
+        return ""
+
+
+async def run(executors: int, max_concurrency: int, scale: float) -> float:
+    """Runs the recorded plan and returns the wall-clock time."""
+    durations = {i: seconds * scale for i, (_, seconds, _) in enumerate(RECORDED_PLAN)}
+    agents: List[BaseAgent] = [
+        ReplayAgent(name=f"replay_{i}", durations=durations, max_steps=1)
+        for i in range(executors)
+    ]
+    planning_tool = PlanningTool(store=MemoryPlanStore())
+    flow = ReplayFlow(
+        agents, planning_tool=planning_tool, max_concurrency=max_concurrency
+    )
+    await planning_tool.execute(
+        command="create",
+        plan_id=flow.active_plan_id,
+        title="EV battery market report",
+        steps=[step for step, _, _ in RECORDED_PLAN],
+        step_dependencies=[deps for _, _, deps in RECORDED_PLAN],
+    )
+
+    start = time.perf_counter()
+    await flow._run_steps()
+    return time.perf_counter() - start
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--executors", type=int, default=4)
+    parser.add_argument(
+        "--scale", type=float, default=0.1, help="Multiplier for recorded durations"
+    )
+    args = parser.parse_args()
+
+    total = sum(seconds for _, seconds, _ in RECORDED_PLAN) * args.scale
+    print(f"Recorded plan: {len(RECORDED_PLAN)} steps, {total:.1f}s of work")
+
+    sequential = await run(args.executors, 1, args.scale)
+    parallel = await run(args.executors, args.executors, args.scale)
+    print(f"{'sequential':<12} {sequential:8.2f} s")
+    print(f"{'parallel':<12} {parallel:8.2f} s  ({sequential / parallel:.1f}x)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,90 @@
+"""Benchmark BaseAgent.run_stream with a slow consumer and a small queue.
+
+An agent streams token deltas faster than the consumer reads them, so the
+run waits on the bounded event queue most of the time. For each queue size
+the consumer reads a few events and then leaves the loop; closing the
+stream must cancel the run promptly instead of waiting for the full queue
+to drain. Exits with status 1 if any close hangs.
+
+Usage:
+    python -m benchmark.run_stream_backpressure
+    python -m benchmark.run_stream_backpressure --queue-sizes 1 4 --events 50
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from contextlib import suppress
+from typing import Tuple
+
+from app.agent.base import BaseAgent
+from app.output import NullSink
+
+
+class TokenFlood(BaseAgent):
+    """Agent whose steps stream tokens without calling the LLM."""
+
+    tokens_per_step: int = 20
+
+    async def step(self) -> str:
+        for _ in range(self.tokens_per_step):
+            self.token_sink.write("token ")
+            await asyncio.sleep(0)
+        return "streamed"
+
+
+async def consume(
+    max_queued: int, events: int, delay: float, close_timeout: float
+) -> Tuple[float, float]:
+    """Reads `events` events slowly, then breaks; returns read and close times."""
+    agent = TokenFlood(name="flood", max_steps=10_000, output_sink=NullSink())
+    stream = agent.run_stream("go", max_queued=max_queued)
+    start = time.perf_counter()
+    try:
+        seen = 0
+        async for _ in stream:
+            await asyncio.sleep(delay)
+            seen += 1
+            if seen == events:
+                break
+    finally:
+        read = time.perf_counter() - start
+        start = time.perf_counter()
+        # A hung close swallows the timeout's cancellation, so time it instead
+        with suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(stream.aclose(), close_timeout)
+    return read, time.perf_counter() - start
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--queue-sizes", nargs="+", type=int, default=[1, 2, 8, 64])
+    parser.add_argument("--events", type=int, default=20)
+    parser.add_argument("--delay", type=float, default=0.005)
+    parser.add_argument(
+        "--close-timeout",
+        type=float,
+        default=5.0,
+        help="Seconds an early close may take before it counts as hung",
+    )
+    args = parser.parse_args()
+
+    hung = False
+    for max_queued in args.queue_sizes:
+        read, close = await consume(
+            max_queued, args.events, args.delay, args.close_timeout
+        )
+        if close >= args.close_timeout:
+            print(f"max_queued {max_queued:3d}  close hung")
+            hung = True
+            continue
+        print(
+            f"max_queued {max_queued:3d}  {args.events / read:8.1f} events/s"
+            f"  close {close * 1000:7.2f} ms"
+        )
+    return 1 if hung else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,93 @@
+"""Benchmark the docker and process sandbox backends.
+
+Measures sandbox creation, command round trips and file operations for
+each backend through the common sandbox client interface.
+
+Usage:
+    python -m benchmark.sandbox_backends --iterations 50
+    python -m benchmark.sandbox_backends --backends process
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Awaitable, Callable, Dict, List
+
+from app.config import SandboxSettings
+from app.sandbox.client import (
+    BaseSandboxClient,
+    LocalSandboxClient,
+    ProcessSandboxClient,
+)
+
+
+BACKENDS: Dict[str, Callable[[], BaseSandboxClient]] = {
+    "docker": LocalSandboxClient,
+    "process": ProcessSandboxClient,
+}
+
+
+async def timed(iterations: int, operation: Callable[[int], Awaitable]) -> List[float]:
+    """Runs an operation repeatedly and returns per-call durations."""
+    timings = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        await operation(i)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def report(backend: str, label: str, timings: List[float]) -> None:
+    print(
+        f"{backend:<8} {label:<14} mean {statistics.mean(timings) * 1000:9.3f} ms"
+        f"  p50 {statistics.median(timings) * 1000:9.3f} ms"
+        f"  max {max(timings) * 1000:9.3f} ms"
+    )
+
+
+async def bench_backend(backend: str, iterations: int) -> None:
+    client = BACKENDS[backend]()
+
+    start = time.perf_counter()
+    await client.create(SandboxSettings(use_sandbox=True))
+    report(backend, "create", [time.perf_counter() - start])
+
+    try:
+        report(
+            backend,
+            "run_command",
+            await timed(iterations, lambda i: client.run_command(f"echo {i}")),
+        )
+        report(
+            backend,
+            "write_file",
+            await timed(
+                iterations, lambda i: client.write_file(f"bench/{i}.txt", "x" * 1024)
+            ),
+        )
+        report(
+            backend,
+            "read_file",
+            await timed(iterations, lambda i: client.read_file(f"bench/{i}.txt")),
+        )
+    finally:
+        start = time.perf_counter()
+        await client.cleanup()
+        report(backend, "cleanup", [time.perf_counter() - start])
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument(
+        "--backends", nargs="+", choices=list(BACKENDS), default=list(BACKENDS)
+    )
+    args = parser.parse_args()
+
+    for backend in args.backends:
+        await bench_backend(backend, args.iterations)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,107 @@
+"""Benchmark sandbox reset strategies between game sessions.
+
+Compares restoring a snapshot (workdir-only and image restart) against
+deleting and recreating the sandbox.
+
+Usage:
+    python -m benchmark.sandbox_reset --rounds 5
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Awaitable, Callable, List
+
+from app.config import SandboxSettings
+from app.sandbox.core.manager import SandboxManager
+
+
+async def prepare(manager: SandboxManager, sandbox_id: str) -> None:
+    """Sets up the state every game session should start from."""
+    sandbox = await manager.get_sandbox(sandbox_id)
+    await sandbox.write_file("game/rules.txt", "dealer stands on 17\n" * 100)
+    await sandbox.run_command("mkdir -p /opt/game && echo ready > /opt/game/state")
+
+
+async def play(manager: SandboxManager, sandbox_id: str, dirty_image: bool) -> None:
+    """Simulates a game session leaving files behind."""
+    sandbox = await manager.get_sandbox(sandbox_id)
+    for i in range(20):
+        await sandbox.write_file(f"game/round_{i}.json", '{"cards": [10, 7]}')
+    if dirty_image:
+        await sandbox.run_command("echo dirty > /opt/game/state")
+
+
+async def measure(
+    label: str,
+    rounds: int,
+    session: Callable[[], Awaitable[None]],
+    reset: Callable[[], Awaitable[None]],
+) -> List[float]:
+    """Times `reset` after each simulated session."""
+    timings = []
+    for _ in range(rounds):
+        await session()
+        start = time.perf_counter()
+        await reset()
+        timings.append(time.perf_counter() - start)
+    print(
+        f"{label:<24} mean {statistics.mean(timings) * 1000:8.1f} ms"
+        f"  min {min(timings) * 1000:8.1f} ms  max {max(timings) * 1000:8.1f} ms"
+    )
+    return timings
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    config = SandboxSettings(use_sandbox=True)
+    async with SandboxManager() as manager:
+        sandbox_id = await manager.create_sandbox(config)
+        await prepare(manager, sandbox_id)
+        await manager.snapshot_sandbox(sandbox_id)
+
+        async def clean_session():
+            await play(manager, sandbox_id, dirty_image=False)
+
+        async def dirty_session():
+            await play(manager, sandbox_id, dirty_image=True)
+
+        await measure(
+            "snapshot (workdir)",
+            args.rounds,
+            clean_session,
+            lambda: manager.reset_sandbox(sandbox_id, "workdir"),
+        )
+        await measure(
+            "snapshot (image)",
+            args.rounds,
+            clean_session,
+            lambda: manager.reset_sandbox(sandbox_id, "image"),
+        )
+        await measure(
+            "snapshot (auto, dirty)",
+            args.rounds,
+            dirty_session,
+            lambda: manager.reset_sandbox(sandbox_id, "auto"),
+        )
+
+        current = [await manager.create_sandbox(config)]
+        await prepare(manager, current[0])
+
+        async def recreate_session():
+            await play(manager, current[0], dirty_image=True)
+
+        async def recreate():
+            await manager.delete_sandbox(current[0])
+            current[0] = await manager.create_sandbox(config)
+            await prepare(manager, current[0])
+
+        await measure("cleanup + create", args.rounds, recreate_session, recreate)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
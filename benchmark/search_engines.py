@@ -0,0 +1,94 @@
+"""Benchmark search engine throughput under concurrent agents.
+
+Runs the same query workload through each engine's blocking
+`perform_search` (in worker threads, as before) and through
+`perform_search_async`, and reports queries per second.
+
+Usage:
+    python -m benchmark.search_engines --engines bing duckduckgo --agents 8
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, List
+
+from app.tool.search import (
+    BaiduSearchEngine,
+    BingSearchEngine,
+    DuckDuckGoSearchEngine,
+    GoogleSearchEngine,
+    WebSearchEngine,
+)
+
+
+ENGINES: Dict[str, Callable[[], WebSearchEngine]] = {
+    "google": GoogleSearchEngine,
+    "baidu": BaiduSearchEngine,
+    "duckduckgo": DuckDuckGoSearchEngine,
+    "bing": BingSearchEngine,
+}
+
+QUERIES = [
+    "python asyncio tutorial",
+    "blackjack basic strategy",
+    "docker container snapshot",
+    "lxml incremental parsing",
+    "http keep-alive connection pool",
+    "bm25 ranking explained",
+]
+
+
+async def run_workload(
+    search: Callable[[str], Awaitable[List]], agents: int, queries_per_agent: int
+) -> float:
+    """Runs `agents` concurrent workers and returns queries per second."""
+
+    async def agent(offset: int) -> int:
+        done = 0
+        for i in range(queries_per_agent):
+            try:
+                await search(QUERIES[(offset + i) % len(QUERIES)])
+                done += 1
+            except Exception as e:
+                print(f"  query failed: {e}")
+        return done
+
+    start = time.perf_counter()
+    completed = await asyncio.gather(*(agent(i) for i in range(agents)))
+    return sum(completed) / (time.perf_counter() - start)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--engines", nargs="+", choices=list(ENGINES), default=["bing", "duckduckgo"]
+    )
+    parser.add_argument("--agents", type=int, default=4)
+    parser.add_argument("--queries", type=int, default=3, help="Queries per agent")
+    parser.add_argument("--num-results", type=int, default=20)
+    args = parser.parse_args()
+
+    for name in args.engines:
+        engine = ENGINES[name]()
+
+        async def threaded(query: str) -> List:
+            return await asyncio.to_thread(
+                engine.perform_search, query, args.num_results
+            )
+
+        async def native(query: str) -> List:
+            return await engine.perform_search_async(query, args.num_results)
+
+        threaded_qps = await run_workload(threaded, args.agents, args.queries)
+        native_qps = await run_workload(native, args.agents, args.queries)
+        print(
+            f"{name:<12} threaded {threaded_qps:7.2f} q/s"
+            f"  async {native_qps:7.2f} q/s  ({native_qps / threaded_qps:4.2f}x)"
+            if threaded_qps
+            else f"{name:<12} threaded failed  async {native_qps:7.2f} q/s"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
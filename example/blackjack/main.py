@@ -3,12 +3,22 @@ import asyncio
 
 from app.logger import logger
 from app.agent_manager import AgentManager
+from app.output import NullSink, set_default_sink
 
 from example.blackjack.agent import HostAgent, PlayerAgent
 
 
 async def main():
     """Run blackjack example."""
+    parser = argparse.ArgumentParser(description="Run the blackjack example.")
+    parser.add_argument(
+        "--quiet",
+        action="store_true",
+        help="Do not stream agent output to the console (batch runs)",
+    )
+    args = parser.parse_args()
+    if args.quiet:
+        set_default_sink(NullSink())
 
     # Create agents
     host = HostAgent()